@@ -0,0 +1,86 @@
+"""
+Microbenchmark the NumPy array fetch path against pd.read_sql_query for a
+typical chart projection (date, daily_vaccinations) and a wide SELECT *.
+
+The result cache is disabled so both paths hit SQLite on every call.
+
+Usage: python benchmarks/bench_array_fetch.py [days] [repeats]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vaccdash.data_access_module import (  # noqa: E402
+    init_db,
+    load_csv_to_sqlite,
+    query_country,
+    query_country_arrays,
+)
+from vaccdash.query_cache import result_cache  # noqa: E402
+from vaccdash.schema import VACCINATION_COLUMNS  # noqa: E402
+
+
+def make_db(directory, days, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "iso_code": "AAA",
+        "country": "CountryA",
+        "location": "CountryA",
+        "date": pd.date_range("2000-01-01", periods=days).strftime("%Y-%m-%d"),
+        "total_vaccinations": rng.integers(0, 10**9, days),
+        "people_vaccinated": rng.integers(0, 10**9, days),
+        "daily_vaccinations": rng.integers(0, 10**6, days),
+        "total_vaccinations_per_hundred": rng.random(days) * 100,
+        "vaccines": "Moderna, Pfizer/BioNTech",
+        "source_name": "Ministry of Health",
+        "source_website": "https://example.org",
+    })
+    csv_path = os.path.join(directory, "data.csv")
+    db_path = os.path.join(directory, "test.db")
+    df.to_csv(csv_path, index=False)
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path)
+    return db_path
+
+
+def best_of(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(days, repeats):
+    result_cache.enabled = False
+    end = str((pd.Timestamp("2000-01-01") + pd.Timedelta(days=days)).date())
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(make_db(tmp, days))
+        typical = ["date", "daily_vaccinations"]
+        wide = [name for name, _ in VACCINATION_COLUMNS]
+        cases = {
+            "pandas SELECT *": lambda: query_country(conn, "CountryA", "2000-01-01", end),
+            "arrays typical": lambda: query_country_arrays(conn, "CountryA", "2000-01-01", end, columns=typical),
+            "arrays wide": lambda: query_country_arrays(conn, "CountryA", "2000-01-01", end, columns=wide),
+        }
+        print(f"rows={days:,} best of {repeats}")
+        baseline = None
+        for name, func in cases.items():
+            elapsed = best_of(func, repeats)
+            baseline = baseline or elapsed
+            print(f"  {name:18s} {elapsed * 1e3:9.2f}ms  {baseline / elapsed:5.2f}x")
+        conn.close()
+
+
+if __name__ == "__main__":
+    days = int(float(sys.argv[1])) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    main(days, repeats)
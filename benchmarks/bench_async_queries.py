@@ -0,0 +1,91 @@
+"""
+Load test for the async query service: throughput and tail latency of
+query_country at 1, 10 and 100 concurrent clients.
+
+The result cache is disabled so that every request reaches SQLite; pass
+"cached" as the third argument to keep it on. Identical in-flight requests
+are still coalesced by the service.
+
+Usage: python benchmarks/bench_async_queries.py [rows] [requests] [cached]
+"""
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vaccdash.async_queries import AsyncQueryService  # noqa: E402
+from vaccdash.data_access_module import init_db, load_csv_to_sqlite  # noqa: E402
+from vaccdash.query_cache import result_cache  # noqa: E402
+
+COUNTRIES = 200
+CONCURRENCY = [1, 10, 100]
+
+
+def make_db(directory, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    days = rows // COUNTRIES
+    names = [f"Country{i:03d}" for i in range(COUNTRIES)]
+    df = pd.DataFrame({
+        "iso_code": np.repeat([f"C{i:03d}" for i in range(COUNTRIES)], days),
+        "country": np.repeat(names, days),
+        "date": np.tile(pd.date_range("2021-01-01", periods=days).strftime("%Y-%m-%d"), COUNTRIES),
+        "daily_vaccinations": rng.integers(0, 10**6, days * COUNTRIES),
+    })
+    csv_path = os.path.join(directory, "vaccinations.csv")
+    db_path = os.path.join(directory, "vaccinations.db")
+    df.to_csv(csv_path, index=False)
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path)
+    return db_path, names
+
+
+def percentile(values, p):
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+async def run_clients(service, names, clients, requests, seed=0):
+    rng = np.random.default_rng(seed)
+    picks = iter(rng.integers(0, len(names), requests).tolist())
+    latencies = []
+
+    async def client():
+        for pick in picks:
+            start = time.perf_counter()
+            await service.query_country(names[pick], "2021-01-01", "2021-12-31")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+async def main(rows, requests, cached):
+    result_cache.enabled = cached
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path, names = make_db(tmp, rows)
+        print(f"rows={rows:,} requests={requests:,} cache={'on' if cached else 'off'}")
+        for clients in CONCURRENCY:
+            async with AsyncQueryService(db_path, workers=4) as service:
+                elapsed, latencies = await run_clients(service, names, clients, requests)
+                stats = service.stats()
+            print(
+                f"  clients={clients:3d}  {requests / elapsed:8.0f} req/s"
+                f"  p50 {percentile(latencies, 50) * 1e3:7.2f}ms"
+                f"  p95 {percentile(latencies, 95) * 1e3:7.2f}ms"
+                f"  p99 {percentile(latencies, 99) * 1e3:7.2f}ms"
+                f"  coalesced {stats['coalesced']}"
+            )
+
+
+if __name__ == "__main__":
+    rows = int(float(sys.argv[1])) if len(sys.argv) > 1 else 200_000
+    requests = int(float(sys.argv[2])) if len(sys.argv) > 2 else 2000
+    cached = len(sys.argv) > 3 and sys.argv[3] == "cached"
+    asyncio.run(main(rows, requests, cached))
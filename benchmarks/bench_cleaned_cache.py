@@ -0,0 +1,63 @@
+"""
+Benchmark dashboard cold start: read_csv + clean_vaccination_data versus
+opening the columnar cleaned-data cache.
+
+Usage: python benchmarks/bench_cleaned_cache.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vaccdash.cleaned_cache import load_cleaned  # noqa: E402
+from vaccdash.data_cleaning import clean_vaccination_data  # noqa: E402
+
+
+def make_csv(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    countries = np.array([f"Country{i:03d}" for i in range(200)])
+    picks = rng.integers(0, len(countries), rows)
+    df = pd.DataFrame({
+        "country": countries[picks],
+        "iso_code": np.char.add("C", picks.astype(str)),
+        "date": (pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 700, rows), unit="D")).strftime("%Y-%m-%d"),
+        "total_vaccinations": rng.integers(0, 10**8, rows).astype(float),
+        "people_vaccinated": rng.integers(0, 10**8, rows).astype(float),
+        "people_fully_vaccinated": rng.integers(0, 10**8, rows).astype(float),
+        "vaccines": np.array(["Moderna", "Moderna, Pfizer/BioNTech", "Sputnik V"])[rng.integers(0, 3, rows)],
+        "source_website": "https://example.org",
+    })
+    df.to_csv(path, index=False)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "vaccinations.csv")
+        cache_dir = os.path.join(tmp, "cache")
+        make_csv(csv_path, rows)
+
+        _, parse_clean = timed(lambda: clean_vaccination_data(pd.read_csv(csv_path)))
+        _, first = timed(lambda: load_cleaned(csv_path, cache_dir))
+        cached, warm = timed(lambda: load_cleaned(csv_path, cache_dir))
+        _, one_column = timed(lambda: cached.column("total_vaccinations").sum())
+
+        print(f"rows={rows:,}")
+        print(f"  read_csv + clean      {parse_clean:8.3f}s")
+        print(f"  cache miss (build)    {first:8.3f}s")
+        print(f"  cache hit (open)      {warm:8.3f}s")
+        print(f"  open + sum one column {warm + one_column:8.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6)
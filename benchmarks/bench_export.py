@@ -0,0 +1,68 @@
+"""
+Benchmark streaming exports against read_sql_query + DataFrame.to_csv:
+time and peak traced memory for growing extracts. The streaming peak
+should stay flat while the pandas one grows with the number of rows.
+
+Usage: python benchmarks/bench_export.py [countries ...] [--days N]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vaccdash.connection import close_all_pools, get_pool  # noqa: E402
+from vaccdash.export import export_vaccinations  # noqa: E402
+from vaccdash.ingestion import init_db, load_csv_to_sqlite  # noqa: E402
+from vaccdash.synthetic import write_vaccinations_csv  # noqa: E402
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main(sizes, days):
+    for countries in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "vaccinations.csv")
+            db_path = os.path.join(tmp, "vaccinations.db")
+            rows = write_vaccinations_csv(csv_path, countries=countries, days=days, nan_rate=0.05)
+            init_db(db_path)
+            load_csv_to_sqlite(csv_path, db_path, clean=True)
+            out = os.path.join(tmp, "extract")
+            print(f"rows={rows:,}")
+            with get_pool(db_path).connection(read_only=True) as conn:
+                runs = {
+                    "pandas to_csv": lambda: pd.read_sql_query(
+                        "SELECT * FROM vaccinations ORDER BY country, date_day", conn).to_csv(out, index=False),
+                    "export csv": lambda: export_vaccinations(conn, out, fmt="csv"),
+                    "export csv gzip": lambda: export_vaccinations(conn, out, fmt="csv", compression="gzip"),
+                    "export jsonl": lambda: export_vaccinations(conn, out, fmt="jsonl"),
+                }
+                for name, run in runs.items():
+                    elapsed, peak = measure(run)
+                    print(f"  {name:18s} {elapsed:7.2f}s {rows / elapsed:10,.0f} rows/s  peak {peak:7.1f} MiB")
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    days = 500
+    if "--days" in args:
+        position = args.index("--days")
+        days = int(args[position + 1])
+        del args[position:position + 2]
+    main([int(arg) for arg in args] or [20, 100, 400], days)
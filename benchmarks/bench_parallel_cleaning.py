@@ -0,0 +1,62 @@
+"""
+Benchmark clean_parallel against the serial clean_vaccination_data for
+increasing worker counts.
+
+Usage: python benchmarks/bench_parallel_cleaning.py [rows] [max_workers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vaccdash.data_cleaning import clean_vaccination_data  # noqa: E402
+from vaccdash.parallel_cleaning import clean_parallel  # noqa: E402
+
+VACCINES = ["Moderna", "Moderna, Pfizer/BioNTech", "Oxford/AstraZeneca, Sinovac", "Sputnik V", "Johnson&Johnson"]
+
+
+def make_frame(rows, countries=200, seed=0):
+    rng = np.random.default_rng(seed)
+    iso = np.array([f"C{i:03d}" for i in range(countries)])[rng.integers(0, countries, rows)]
+    dates = pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 900, rows), unit="D")
+    figures = rng.integers(0, 10**8, (rows, 3)).astype(float)
+    figures[rng.random((rows, 3)) < 0.2] = np.nan
+    return pd.DataFrame({
+        "country": iso,
+        "iso_code": iso,
+        "date": dates.strftime("%Y-%m-%d"),
+        "total_vaccinations": figures[:, 0],
+        "people_vaccinated": figures[:, 1],
+        "people_fully_vaccinated": figures[:, 2],
+        "vaccines": np.array(VACCINES)[rng.integers(0, len(VACCINES), rows)],
+        "source_website": np.where(rng.random(rows) < 0.01, "https://twitter.com/x", "https://example.org"),
+    })
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(rows, max_workers):
+    df = make_frame(rows)
+    expected, serial = timed(lambda: clean_vaccination_data(df))
+    print(f"rows={rows:,} cpus={os.cpu_count()}")
+    print(f"  serial             {serial:8.3f}s")
+    workers = 1
+    while workers <= max_workers:
+        result, elapsed = timed(lambda: clean_parallel(df, workers=workers))
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"  {workers:2d} workers         {elapsed:8.3f}s  speedup {serial / elapsed:5.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    rows = int(float(sys.argv[1])) if len(sys.argv) > 1 else 2 * 10**6
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    main(rows, max_workers)
@@ -0,0 +1,66 @@
+"""
+Benchmark headless batch rendering of the daily vaccinations chart for
+every country: cold, from the render cache, and with several processes.
+
+Usage: python benchmarks/bench_rendering.py [countries] [days] [workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vaccdash.data_access_module import init_db, load_csv_to_sqlite  # noqa: E402
+from vaccdash.rendering import render_country_charts  # noqa: E402
+
+
+def make_db(directory, countries, days, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"Country {i:03d}" for i in range(countries)]
+    df = pd.DataFrame({
+        "iso_code": np.repeat([f"C{i:03d}" for i in range(countries)], days),
+        "country": np.repeat(names, days),
+        "date": np.tile(pd.date_range("2021-01-01", periods=days).strftime("%Y-%m-%d"), countries),
+        "daily_vaccinations": rng.integers(0, 10**6, days * countries),
+    })
+    csv_path = os.path.join(directory, "vaccinations.csv")
+    db_path = os.path.join(directory, "vaccinations.db")
+    df.to_csv(csv_path, index=False)
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path)
+    return db_path, names
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(countries, days, workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path, names = make_db(tmp, countries, days)
+        cache_dir = os.path.join(tmp, "cache")
+        end = str((pd.Timestamp("2021-01-01") + pd.Timedelta(days=days - 1)).date())
+
+        def render(**kwargs):
+            return lambda: render_country_charts(db_path, names, "2021-01-01", end, **kwargs)
+
+        print(f"countries={countries} days={days}")
+        print(f"  1 process, cold        {timed(render()):7.2f}s")
+        if workers > 1:
+            print(f"  {workers} processes, cold      {timed(render(workers=workers)):7.2f}s")
+        timed(render(cache_dir=cache_dir))
+        print(f"  cached                 {timed(render(cache_dir=cache_dir)):7.2f}s")
+        print(f"  svg, 1 process         {timed(render(fmt='svg')):7.2f}s")
+
+
+if __name__ == "__main__":
+    countries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+    main(countries, days, workers)
@@ -0,0 +1,140 @@
+"""
+Load generator for the HTTP data service (vaccdash.service).
+
+Starts the service on a free local port and runs concurrent keep-alive
+clients over a mix of series, country, vaccine and source requests,
+reporting requests/s and p50/p99 latency for:
+  - uncached: response cache disabled, every request runs its query
+  - cached:   responses served from the in-process cache
+  - gzip:     cached, with Accept-Encoding: gzip
+  - 304:      conditional requests revalidated with If-None-Match
+
+Usage: python benchmarks/bench_service.py [requests] [clients] [--db PATH]
+Without --db a synthetic database of 100 countries x 500 days is used.
+"""
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vaccdash.ingestion import init_db, load_csv_to_sqlite  # noqa: E402
+from vaccdash.service import make_server  # noqa: E402
+from vaccdash.synthetic import write_vaccinations_csv  # noqa: E402
+
+
+def make_db(directory, countries=100, days=500):
+    csv_path = os.path.join(directory, "vaccinations.csv")
+    db_path = os.path.join(directory, "vaccinations.db")
+    write_vaccinations_csv(csv_path, countries=countries, days=days, nan_rate=0.05)
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path, clean=True)
+    return db_path
+
+
+def request_paths(server, count=50) -> list:
+    """
+    A mix of endpoints over the countries listed by /vaccines/<name>.
+    """
+    conn = http.client.HTTPConnection(*server.server_address[:2])
+    conn.request("GET", "/vaccines")
+    vaccines = [entry["vaccine"] for entry in json.loads(conn.getresponse().read())]
+    conn.request("GET", "/vaccines/" + vaccines[0].replace(" ", "%20"))
+    countries = [entry["country"] for entry in json.loads(conn.getresponse().read())]
+    conn.close()
+
+    paths = ["/sources", "/vaccines"]
+    for i in range(count):
+        country = countries[i % len(countries)].replace(" ", "%20")
+        paths.append(f"/series/{country}?start=2021-01-01&end=2022-05-15&window=7")
+        paths.append(f"/series/{country}?start=2021-01-01&end=2022-05-15&period=week")
+        paths.append(f"/countries/{country}?start=2021-03-01&end=2021-03-31&format=csv")
+    return paths
+
+
+def client(server, paths, requests, headers, revalidate, latencies):
+    conn = http.client.HTTPConnection(*server.server_address[:2])
+    etags = {}
+    for i in range(requests):
+        path = paths[i % len(paths)]
+        sent = dict(headers)
+        if revalidate and path in etags:
+            sent["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        conn.request("GET", path, headers=sent)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        etags[path] = response.getheader("ETag")
+    conn.close()
+
+
+def load(server, paths, requests, clients, headers=None, revalidate=False):
+    latencies = []
+    threads = [
+        threading.Thread(target=client, args=(server, paths[i::clients] or paths, requests // clients,
+                                              headers or {}, revalidate, latencies))
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def serve(db_path, **kwargs):
+    server = make_server(db_path, port=0, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop(server):
+    server.shutdown()
+    server.server_close()
+    server.RequestHandlerClass.service.close()
+
+
+def main(requests, clients, db_path):
+    print(f"requests={requests} clients={clients} cpus={os.cpu_count()}")
+    scenarios = [
+        ("uncached", {"cache_entries": 0}, {}, False),
+        ("cached", {}, {}, False),
+        ("gzip", {}, {"Accept-Encoding": "gzip"}, False),
+        ("304", {}, {}, True),
+    ]
+    for name, options, headers, revalidate in scenarios:
+        server = serve(db_path, workers=clients, **options)
+        try:
+            paths = request_paths(server)
+            # Warm the cache (and the page cache) before measuring
+            load(server, paths, len(paths), 1, headers)
+            rate, p50, p99 = load(server, paths, requests, clients, headers, revalidate)
+        finally:
+            stop(server)
+        print(f"  {name:10s} {rate:9.0f} req/s  p50 {p50:7.2f}ms  p99 {p99:7.2f}ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = None
+    if "--db" in args:
+        position = args.index("--db")
+        db_path = args[position + 1]
+        del args[position:position + 2]
+    requests = int(args[0]) if args else 2000
+    clients = int(args[1]) if len(args) > 1 else 4
+    if db_path is not None:
+        main(requests, clients, db_path)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            main(requests, clients, make_db(tmp))
@@ -0,0 +1,52 @@
+"""
+Measure import time of the vaccdash entry points in fresh interpreters,
+and which heavy dependencies each one pulls in.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+MODULES = [
+    "vaccdash.data_access_module",
+    "vaccdash.queries",
+    "vaccdash.ingestion",
+    "vaccdash.plotting",
+]
+
+HEAVY = ["numpy", "pandas", "matplotlib"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def import_time(module):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def main(runs):
+    print(f"import time over {runs} fresh interpreters")
+    for module in MODULES:
+        results = [import_time(module) for _ in range(runs)]
+        times = [result["seconds"] * 1e3 for result in results]
+        loaded = ", ".join(results[0]["loaded"]) or "-"
+        print(f"  {module:30s} min {min(times):7.1f}ms  median {statistics.median(times):7.1f}ms  loads: {loaded}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,245 @@
+"""
+End-to-end benchmark suite on synthetic data (vaccdash.synthetic).
+
+Measures CSV ingest rows/s (whole-file and streaming), the time of each
+stage of clean_vaccination_data and of its data-quality validation, query
+latency percentiles and peak traced memory, and stores the results as
+JSON. Given a baseline file it flags every metric that got worse by more
+than the tolerance and exits with status 1.
+
+Usage:
+    python benchmarks/bench_suite.py [--countries N] [--days N] [--repeat N] [--output results.json]
+                                     [--baseline baseline.json] [--tolerance 0.2]
+    python benchmarks/bench_suite.py --compare results.json baseline.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vaccdash import queries  # noqa: E402
+from vaccdash.aggregates import source_distribution  # noqa: E402
+from vaccdash.connection import close_all_pools, get_pool  # noqa: E402
+from vaccdash.data_cleaning import clean_vaccination_data  # noqa: E402
+from vaccdash.ingestion import init_db, load_csv_to_sqlite  # noqa: E402
+from vaccdash.query_cache import result_cache  # noqa: E402
+from vaccdash.synthetic import write_vaccinations_csv  # noqa: E402
+from vaccdash.validation import QualityReport  # noqa: E402
+
+# Metrics whose name ends like this are better when higher; all others
+# (seconds, milliseconds, megabytes) are better when lower.
+HIGHER_IS_BETTER = ("rows_per_s",)
+
+
+def peak_mb(func) -> float:
+    """
+    Peak memory traced by tracemalloc while func runs, in MiB. Run apart
+    from the timed runs, as tracing slows allocation down.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def bench_ingest(workdir, csv_path, rows, repeat) -> dict:
+    counter = itertools.count()
+
+    def fresh_db():
+        db_path = os.path.join(workdir, f"ingest-{next(counter)}.db")
+        init_db(db_path)
+        return db_path
+
+    metrics = {}
+    for name, kwargs in [("ingest", {}), ("ingest_stream", {"chunksize": 50_000}),
+                         ("ingest_clean", {"chunksize": 50_000, "clean": True})]:
+        times = []
+        for _ in range(repeat):
+            db_path = fresh_db()
+            start = time.perf_counter()
+            load_csv_to_sqlite(csv_path, db_path, **kwargs)
+            times.append(time.perf_counter() - start)
+        metrics[f"{name}.rows_per_s"] = rows / statistics.median(times)
+        db_path = fresh_db()
+        metrics[f"{name}.peak_mb"] = peak_mb(lambda: load_csv_to_sqlite(csv_path, db_path, **kwargs))
+    return metrics
+
+
+def bench_clean(df, repeat) -> dict:
+    runs = []
+    for _ in range(repeat):
+        reports = []
+        clean_vaccination_data(df, hooks=[reports.append])
+        runs.append(reports)
+    metrics = {"clean.total_s": statistics.median(sum(report.seconds for report in run) for run in runs)}
+    for i, report in enumerate(runs[0]):
+        metrics[f"clean.stage.{report.stage}_s"] = statistics.median(run[i].seconds for run in runs)
+
+    # Validation work done between the stages, on top of clean.total_s
+    checks = []
+    for _ in range(repeat):
+        quality = QualityReport()
+        clean_vaccination_data(df, quality=quality)
+        checks.append(quality.seconds)
+    metrics["clean.validation_s"] = statistics.median(checks)
+
+    reports = []
+    metrics["clean.peak_mb"] = peak_mb(lambda: clean_vaccination_data(df, hooks=[reports.append]))
+    for report in reports:
+        metrics[f"clean.stage.{report.stage}.peak_mb"] = report.peak_bytes / 2**20
+    return metrics
+
+
+def bench_queries(db_path, df, iterations) -> dict:
+    """
+    Latency percentiles of the dashboard queries over `iterations` calls
+    each, cycling through the countries. The result cache is cleared
+    before every call so that each one reaches SQLite.
+    """
+    countries = df["country"].unique().tolist()
+    iso_codes = df["iso_code"].unique().tolist()
+    dates = sorted(df["date"].unique())
+    start, end = dates[len(dates) // 4], dates[3 * len(dates) // 4]
+    vaccine = df["vaccines"].iloc[0].split(", ")[0]
+    calls = {
+        "query_country": lambda conn, i: queries.query_country(conn, countries[i % len(countries)], start, end),
+        "query_country_by_ISO": lambda conn, i: queries.query_country_by_ISO(conn, iso_codes[i % len(iso_codes)],
+                                                                             start, end),
+        "query_countries": lambda conn, i: queries.query_countries(conn, countries[i % len(countries):][:10],
+                                                                   start, end),
+        "query_country_arrays": lambda conn, i: queries.query_country_arrays(conn, countries[i % len(countries)],
+                                                                             start, end),
+        "count_countries_using_vaccine": lambda conn, i: queries.count_countries_using_vaccine(conn, vaccine),
+        "source_distribution": lambda conn, i: source_distribution(conn),
+    }
+
+    metrics = {}
+    # Read-only, like the dashboard serving path
+    with get_pool(db_path).connection(read_only=True) as conn:
+        for name, call in calls.items():
+            durations = []
+            for i in range(iterations):
+                result_cache.clear()
+                start_ns = time.perf_counter_ns()
+                call(conn, i)
+                durations.append((time.perf_counter_ns() - start_ns) / 1e6)
+            for p in (50, 95, 99):
+                metrics[f"query.{name}.p{p}_ms"] = float(np.percentile(durations, p, method="inverted_cdf"))
+    return metrics
+
+
+def run_suite(countries, days, repeat, iterations, seed=0) -> dict:
+    config = {"countries": countries, "days": days, "repeat": repeat, "iterations": iterations,
+              "duplicate_rate": 0.01, "nan_rate": 0.05, "social_rate": 0.02, "seed": seed}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "vaccinations.csv")
+        rows = write_vaccinations_csv(csv_path, countries=countries, days=days, duplicate_rate=config["duplicate_rate"],
+                                      nan_rate=config["nan_rate"], social_rate=config["social_rate"], seed=seed)
+        df = pd.read_csv(csv_path)
+        metrics = {}
+        metrics.update(bench_ingest(tmp, csv_path, rows, repeat))
+        metrics.update(bench_clean(df, repeat))
+        db_path = os.path.join(tmp, "queries.db")
+        init_db(db_path)
+        load_csv_to_sqlite(csv_path, db_path, clean=True)
+        metrics.update(bench_queries(db_path, df, iterations))
+        close_all_pools()
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "config": dict(config, rows=rows),
+        "metrics": metrics,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    (metric, baseline, current, relative change) for every metric that got
+    worse than the baseline by more than tolerance (0.2 = 20%).
+    """
+    regressions = []
+    for name, current in results["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None or base <= 0:
+            continue
+        change = (current - base) / base
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        if worse > tolerance:
+            regressions.append((name, base, current, change))
+    return regressions
+
+
+def report(results: dict, baseline=None) -> None:
+    config = results["config"]
+    print(f"rows={config['rows']:,} countries={config['countries']} days={config['days']} "
+          f"cpus={results['meta']['cpus']}")
+    for name, value in results["metrics"].items():
+        line = f"  {name:50s} {value:12.3f}"
+        if baseline is not None and baseline["metrics"].get(name):
+            line += f"  {(value - baseline['metrics'][name]) / baseline['metrics'][name]:+8.1%}"
+        print(line)
+
+
+def check(results: dict, baseline: dict, tolerance: float) -> int:
+    if results["config"] != baseline["config"]:
+        print("warning: the baseline was measured with a different configuration")
+    regressions = compare(results, baseline, tolerance)
+    for name, base, current, change in regressions:
+        print(f"REGRESSION {name}: {base:.3f} -> {current:.3f} ({change:+.1%})")
+    if not regressions:
+        print(f"no regressions beyond {tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--countries", type=int, default=100)
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per ingest/clean benchmark")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per query benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="flag regressions against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--compare", nargs=2, metavar=("RESULTS", "BASELINE"),
+                        help="compare two saved results files without running anything")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        results, baseline = (json.load(open(path)) for path in args.compare)
+        report(results, baseline)
+        return check(results, baseline, args.tolerance)
+
+    results = run_suite(args.countries, args.days, args.repeat, args.iterations, args.seed)
+    baseline = json.load(open(args.baseline)) if args.baseline else None
+    report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    return check(results, baseline, args.tolerance) if baseline is not None else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from vaccdash import rollups
+from vaccdash.schema import table_columns
+
+# Full-table equivalent of rollup_source_counts, served by the source_name index
+SOURCE_DISTRIBUTION_SQL = "SELECT source_name, COUNT(*) as count FROM vaccinations GROUP BY source_name"
+
+
+def vaccine_columns(conn) -> list:
+    """
+    The vaccine_* flag columns stored in the vaccinations table, in table order.
+    """
+    return [name for name, _ in table_columns(conn, "vaccinations") if name.startswith("vaccine_")]
+
+
+def source_distribution(conn) -> pd.DataFrame:
+    """
+    Number of records per source_name, read from the rollup_source_counts
+    summary table maintained on ingest.
+    """
+    return rollups.source_counts(conn)
+
+
+def vaccine_totals(conn) -> pd.Series:
+    """
+    Number of records flagged for each vaccine_* column, largest first.
+
+    The sums are computed inside SQLite in a single pass, so only one
+    number per manufacturer is returned instead of the whole table. Returns
+    an empty Series when the table has no vaccine_* columns.
+    """
+    cols = vaccine_columns(conn)
+    if not cols:
+        return pd.Series(dtype="int64")
+    sums = ", ".join(f'TOTAL("{col}")' for col in cols)
+    row = conn.execute(f"SELECT {sums} FROM vaccinations").fetchone()
+    totals = pd.Series([int(value) for value in row], index=cols, dtype="int64")
+    return totals.sort_values(ascending=False)
@@ -0,0 +1,77 @@
+import numpy as np
+
+from vaccdash.schema import table_columns
+
+# Returned for every column of a projection, by declared SQLite type.
+# Missing values become NaN (numbers), NaT (dates) or None (text).
+DTYPES = {"INTEGER": "float64", "REAL": "float64", "TEXT": "object"}
+
+
+def column_types(conn, columns=None, table="vaccinations") -> dict:
+    """
+    NumPy dtype for each requested column, validated against the table so
+    that only real column names are ever interpolated into SQL.
+
+    'date' is read through the integer date_day column and returned as
+    datetime64[D]; vaccine_* flags are returned as bool. Defaults to every
+    ordinary column of the table.
+    """
+    declared = dict(table_columns(conn, table))
+    columns = list(declared) if columns is None else list(columns)
+    unknown = [col for col in columns if col not in declared]
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(unknown)}")
+    types = {}
+    for col in columns:
+        if col == "date":
+            types[col] = "datetime64[D]"
+        elif col.startswith("vaccine_"):
+            types[col] = "bool"
+        else:
+            types[col] = DTYPES.get(declared[col].upper(), "object")
+    return types
+
+
+def select_list(types: dict) -> str:
+    return ", ".join("date_day" if col == "date" else f'"{col}"' for col in types)
+
+
+def rows_to_arrays(rows, types: dict) -> dict:
+    """
+    Transpose cursor rows into one typed array per column.
+    """
+    if not rows:
+        return {col: np.empty(0, dtype=dtype) for col, dtype in types.items()}
+    arrays = {}
+    for (col, dtype), values in zip(types.items(), zip(*rows)):
+        if dtype == "datetime64[D]":
+            arrays[col] = np.array(values, dtype="float64").astype(dtype)
+        elif dtype == "object":
+            arrays[col] = np.array(values, dtype=object)
+        else:
+            arrays[col] = np.array(values, dtype=dtype)
+    return arrays
+
+
+def fetch_arrays(conn, sql: str, params, types: dict) -> dict:
+    """
+    Run a query whose select list is select_list(types) and return its
+    result as a dict of column name -> NumPy array.
+    """
+    return rows_to_arrays(conn.execute(sql, params).fetchall(), types)
+
+
+def iter_arrays(conn, sql: str, params, types: dict, batch_size=10_000):
+    """
+    Like fetch_arrays, but yield the result in dicts of at most batch_size
+    rows so that long ranges can be streamed in bounded memory.
+    """
+    cursor = conn.execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows_to_arrays(rows, types)
+    finally:
+        cursor.close()
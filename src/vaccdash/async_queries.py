@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from vaccdash import queries
+from vaccdash.aggregates import source_distribution, vaccine_totals
+from vaccdash.connection import ConnectionPool
+
+logger = logging.getLogger("async_queries")
+
+
+class QueryCancelled(Exception):
+    """
+    Raised inside a reader thread when a query is abandoned before it runs.
+    """
+
+
+class _InFlight:
+    """
+    One execution shared by every coroutine awaiting the same query. The
+    reader thread publishes the connection it runs on so that the last
+    waiter to give up can interrupt it.
+    """
+
+    def __init__(self):
+        self.future = None
+        self.waiters = 0
+        self.conn = None
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def stop(self) -> None:
+        """
+        Keep the query from starting, or interrupt it if it is running.
+        Safe to call from any thread.
+        """
+        with self.lock:
+            self.cancelled = True
+            if self.conn is not None:
+                self.conn.interrupt()
+
+    def cancel(self) -> None:
+        self.stop()
+        self.future.cancel()
+
+
+def _share(result):
+    """
+    Give each coalesced waiter its own shallow copy of a frame or list, so
+    that adding columns to one caller's result does not affect the others.
+    """
+    if isinstance(result, dict):
+        return {key: _share(value) for key, value in result.items()}
+    if hasattr(result, "copy") and hasattr(result, "columns"):
+        return result.copy(deep=False)
+    if isinstance(result, list):
+        return list(result)
+    return result
+
+
+class AsyncQueryService:
+    """
+    asyncio front end for the dashboard queries.
+
+    Queries run on a dedicated pool of reader threads, each using a
+    read-only connection from its own ConnectionPool of the same size, so
+    the event loop never blocks on SQLite. Concurrent calls to the same
+    function with the same arguments are coalesced into one execution.
+
+    Every call accepts a timeout (falling back to the service default).
+    When a caller times out or is cancelled it stops waiting; once no
+    caller is left the query is dropped if it has not started yet, or
+    interrupted with sqlite3's Connection.interrupt() if it is running.
+    """
+
+    def __init__(self, db_path, workers=4, timeout=None, pragmas=None):
+        self.timeout = timeout
+        self._pool = ConnectionPool(db_path, size=workers, pragmas=pragmas)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vaccdash-reader")
+        self._inflight = {}
+        self._stats = {"executed": 0, "coalesced": 0, "timeouts": 0, "cancelled": 0, "interrupted": 0}
+
+    def _execute(self, entry, func, args, kwargs):
+        with self._pool.connection(read_only=True) as conn:
+            with entry.lock:
+                if entry.cancelled:
+                    raise QueryCancelled(func.__name__)
+                entry.conn = conn
+            try:
+                return func(conn, *args, **kwargs)
+            finally:
+                with entry.lock:
+                    entry.conn = None
+
+    def _key(self, func, args, kwargs):
+        key = (func, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    async def run(self, func, *args, timeout=None, coalesce=True, **kwargs):
+        """
+        Await func(conn, *args, **kwargs) executed on a reader thread.
+        """
+        key = self._key(func, args, kwargs) if coalesce else None
+        entry = self._inflight.get(key) if key is not None else None
+        if entry is None:
+            entry = _InFlight()
+            loop = asyncio.get_running_loop()
+            entry.future = loop.run_in_executor(self._executor, self._execute, entry, func, args, kwargs)
+            self._stats["executed"] += 1
+            if key is not None:
+                self._inflight[key] = entry
+                entry.future.add_done_callback(lambda _, key=key, entry=entry: self._forget(key, entry))
+        else:
+            self._stats["coalesced"] += 1
+
+        timeout = self.timeout if timeout is None else timeout
+        entry.waiters += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(entry.future), timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            self._abandon(key, entry)
+            raise
+        except asyncio.CancelledError:
+            self._stats["cancelled"] += 1
+            self._abandon(key, entry)
+            raise
+        finally:
+            entry.waiters -= 1
+        return _share(result)
+
+    def _forget(self, key, entry) -> None:
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+
+    def _abandon(self, key, entry) -> None:
+        # Called before this waiter is subtracted from entry.waiters
+        if entry.waiters > 1 or entry.future.done():
+            return
+        if entry.conn is not None:
+            self._stats["interrupted"] += 1
+            logger.info("Interrupting abandoned query")
+        entry.cancel()
+        if key is not None:
+            self._forget(key, entry)
+
+    def stats(self) -> dict:
+        return dict(self._stats, in_flight=len(self._inflight))
+
+    async def query_country_by_ISO(self, iso_code, start_date, end_date, timeout=None):
+        return await self.run(queries.query_country_by_ISO, iso_code, start_date, end_date, timeout=timeout)
+
+    async def query_country(self, country, start_date, end_date, timeout=None):
+        return await self.run(queries.query_country, country, start_date, end_date, timeout=timeout)
+
+    async def query_countries(self, countries, start_date, end_date, as_dict=False, timeout=None):
+        return await self.run(queries.query_countries, tuple(countries), start_date, end_date,
+                              as_dict=as_dict, timeout=timeout)
+
+    async def query_countries_by_ISO(self, iso_codes, start_date, end_date, as_dict=False, timeout=None):
+        return await self.run(queries.query_countries_by_ISO, tuple(iso_codes), start_date, end_date,
+                              as_dict=as_dict, timeout=timeout)
+
+    async def count_countries_using_vaccine(self, vaccine_name, timeout=None):
+        return await self.run(queries.count_countries_using_vaccine, vaccine_name, timeout=timeout)
+
+    async def countries_using_vaccine(self, vaccine_name, timeout=None):
+        return await self.run(queries.countries_using_vaccine, vaccine_name, timeout=timeout)
+
+    async def list_vaccines(self, timeout=None):
+        return await self.run(queries.list_vaccines, timeout=timeout)
+
+    async def source_distribution(self, timeout=None):
+        return await self.run(source_distribution, timeout=timeout)
+
+    async def vaccine_totals(self, timeout=None):
+        return await self.run(vaccine_totals, timeout=timeout)
+
+    def close(self) -> None:
+        """
+        Stop the reader threads, dropping queued queries, and close their
+        connections.
+        """
+        for entry in list(self._inflight.values()):
+            entry.stop()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,47 @@
+# Chart drawing shared by the interactive pyplot functions (vaccdash.plotting)
+# and headless batch rendering (vaccdash.rendering). Each function draws on an
+# Axes it is given and never touches pyplot's global state.
+
+FIGSIZES = {
+    "source_distribution": (8, 8),
+    "daily_vaccinations": (10, 6),
+    "vaccine_split": (8, 8),
+}
+
+
+def draw_source_distribution(ax, df) -> None:
+    """
+    Pie chart of the number of records per source_name.
+    """
+    ax.pie(df['count'], labels=df['source_name'], autopct='%1.1f%%', startangle=140)
+    ax.set_title('Distribution of Data Sources')
+
+
+def draw_daily_vaccinations(ax, series, country, start_date, end_date) -> None:
+    """
+    Line chart of a {"date", "value"} series from vaccdash.timeseries.
+    """
+    ax.plot(series['date'], series['value'], marker='o')
+    ax.set_title(f'Daily Vaccinations in {country} from {start_date} to {end_date}')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Daily Vaccinations')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid()
+
+
+def vaccine_split_labels(vaccine_counts) -> list:
+    total = vaccine_counts.sum()
+    return [
+        f"{col.replace('vaccine_', '').replace('_', ' ')} ({count/total:.1%})"
+        for col, count in zip(vaccine_counts.index, vaccine_counts)
+    ]
+
+
+def draw_vaccine_split(ax, vaccine_counts) -> None:
+    """
+    Pie chart of vaccine_totals with the labels and percentages in the legend.
+    """
+    wedges, _ = ax.pie(vaccine_counts, labels=None, startangle=140)
+    ax.set_title('Split of Vaccinations by Vaccine Type')
+    ax.legend(wedges, vaccine_split_labels(vaccine_counts), title="Vaccine Type",
+              loc="center left", bbox_to_anchor=(1, 0.5))
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from vaccdash import data_cleaning
+
+logger = logging.getLogger("cleaned_cache")
+
+CACHE_FORMAT_VERSION = 2
+HASH_BLOCK_SIZE = 1024 * 1024
+MANIFEST = "manifest.json"
+SOURCES_INDEX = "sources.json"
+
+
+def _hash_file(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(csv_path, cache_dir) -> str:
+    """
+    SHA-256 of the CSV contents. The hash is remembered together with the
+    file's size and mtime, so an unchanged file is not re-read on every start.
+    """
+    csv_path = Path(csv_path).resolve()
+    stat = csv_path.stat()
+    index_path = Path(cache_dir) / SOURCES_INDEX
+    index = json.loads(index_path.read_text()) if index_path.exists() else {}
+    entry = index.get(str(csv_path))
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    sha256 = _hash_file(csv_path)
+    index[str(csv_path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+    index_path.write_text(json.dumps(index, indent=1))
+    return sha256
+
+
+def options_digest(options) -> str:
+    """
+    Short hash of the clean_vaccination_data keyword arguments an entry was
+    cleaned with ("" for the defaults).
+    """
+    if not options:
+        return ""
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def cache_key(csv_path, cache_dir, options=None) -> str:
+    """
+    Cache entry name: content hash of the source plus the cleaner and
+    on-disk format versions and the cleaning options, so a changed file,
+    cleaner or option misses the cache.
+    """
+    sha256 = source_fingerprint(csv_path, cache_dir)
+    key = f"{sha256[:32]}-c{data_cleaning.CLEANER_VERSION}-f{CACHE_FORMAT_VERSION}"
+    digest = options_digest(options)
+    return f"{key}-o{digest}" if digest else key
+
+
+# pandas nullable arrays, stored as their values plus a separate null mask
+MASKED_ARRAYS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+
+def write_columns(frame: pd.DataFrame, directory) -> None:
+    """
+    Store each column of a frame as its own .npy file plus a manifest.
+
+    Numeric and bool columns are written as-is, datetimes as int64 ticks,
+    nullable integer/float/boolean columns as their values plus a null mask
+    and string columns as int32 category codes with the categories in the
+    manifest, so every column can later be memory-mapped on its own. The
+    manifest keeps each column's dtype and the frame's attrs (e.g. the
+    vaccine_bits of a compact frame).
+    """
+    directory = Path(directory)
+    columns = []
+    for position, name in enumerate(frame.columns):
+        series = frame[name]
+        entry = {"name": name, "file": f"{position}.npy", "dtype": str(series.dtype)}
+        if isinstance(series.array, MASKED_ARRAYS):
+            entry["kind"] = "masked"
+            entry["mask"] = f"{position}.mask.npy"
+            values = series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0)
+            np.save(directory / entry["mask"], series.isna().to_numpy())
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            entry["kind"] = "datetime"
+            values = series.to_numpy().view("int64")
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            entry["kind"] = "numeric"
+            values = series.to_numpy()
+        else:
+            entry["kind"] = "category"
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, categories = pd.factorize(series)
+            entry["categories"] = categories.tolist()
+            values = codes.astype("int32")
+        np.save(directory / entry["file"], values)
+        columns.append(entry)
+    manifest = {"rows": len(frame), "columns": columns, "attrs": frame.attrs}
+    (directory / MANIFEST).write_text(json.dumps(manifest))
+
+
+class CachedFrame:
+    """
+    Read-only view of a cached cleaned frame. Columns are memory-mapped
+    lazily, the first time they are asked for.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.manifest = json.loads((self.directory / MANIFEST).read_text())
+        self._entries = {entry["name"]: entry for entry in self.manifest["columns"]}
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    @property
+    def attrs(self) -> dict:
+        return dict(self.manifest.get("attrs", {}))
+
+    @property
+    def columns(self) -> list:
+        return [entry["name"] for entry in self.manifest["columns"]]
+
+    def column(self, name, categorical=False) -> pd.Series:
+        """
+        Load one column. Numeric, bool, nullable and datetime columns are
+        zero-copy views of the mapped files. String columns come back as
+        categoricals when categorical=True, otherwise in their original dtype.
+        """
+        entry = self._entries[name]
+        values = np.load(self.directory / entry["file"], mmap_mode="r")
+        if entry["kind"] == "masked":
+            mask = np.load(self.directory / entry["mask"], mmap_mode="r")
+            array_type = pd.api.types.pandas_dtype(entry["dtype"]).construct_array_type()
+            return pd.Series(array_type(values, mask), name=name, copy=False)
+        if entry["kind"] == "datetime":
+            return pd.Series(values.view(entry["dtype"]), name=name, copy=False)
+        if entry["kind"] == "numeric":
+            return pd.Series(values, name=name, copy=False)
+        series = pd.Series(pd.Categorical.from_codes(values, entry["categories"]), name=name)
+        return series if categorical else series.astype(entry["dtype"])
+
+    def to_frame(self, columns=None, categorical=False) -> pd.DataFrame:
+        columns = self.columns if columns is None else columns
+        frame = pd.DataFrame({name: self.column(name, categorical) for name in columns})
+        frame.attrs.update(self.attrs)
+        return frame
+
+
+def _prune_stale(cache_dir, csv_path, keep, options) -> None:
+    # Entries for the same file cleaned with other options are not stale
+    for entry in Path(cache_dir).iterdir():
+        manifest = entry / MANIFEST
+        if entry.name == keep or not manifest.exists():
+            continue
+        manifest = json.loads(manifest.read_text())
+        if manifest.get("source") == str(Path(csv_path).resolve()) and manifest.get("options", "") == options:
+            logger.info("Removing stale cleaned-data cache %s", entry.name)
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def load_cleaned(csv_path, cache_dir, **options) -> CachedFrame:
+    """
+    Return the cleaned contents of csv_path, from the columnar cache if a
+    matching entry exists, otherwise by reading and cleaning the CSV and
+    caching the result. options are keyword arguments for
+    clean_vaccination_data (e.g. compact=True) and must be JSON-serializable.
+
+    Entries are keyed by the CSV content hash, CLEANER_VERSION and the
+    options, so edits to the file or to the cleaner are picked up
+    automatically; older entries for the same file and options are removed
+    when a new one is written.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    key = cache_key(csv_path, cache_dir, options)
+    target = cache_dir / key
+    if (target / MANIFEST).exists():
+        return CachedFrame(target)
+
+    logger.info("Cleaned-data cache miss for %s; parsing and cleaning", csv_path)
+    cleaned = data_cleaning.clean_vaccination_data(pd.read_csv(csv_path), **options)
+    staging = Path(tempfile.mkdtemp(dir=cache_dir, prefix=".staging-"))
+    try:
+        write_columns(cleaned, staging)
+        manifest = json.loads((staging / MANIFEST).read_text())
+        manifest["source"] = str(Path(csv_path).resolve())
+        manifest["options"] = options_digest(options)
+        (staging / MANIFEST).write_text(json.dumps(manifest))
+        os.replace(staging, target)
+    except OSError:
+        # Another process published the same entry first
+        shutil.rmtree(staging, ignore_errors=True)
+        if not (target / MANIFEST).exists():
+            raise
+    _prune_stale(cache_dir, csv_path, keep=key, options=options_digest(options))
+    return CachedFrame(target)
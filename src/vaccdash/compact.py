@@ -0,0 +1,140 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("compact")
+
+# Repeated strings stored as categorical codes
+CATEGORY_COLUMNS = ["iso_code", "country", "location", "vaccines", "source_name", "source_website"]
+
+# Whole-number counts stored as nullable integers
+COUNT_COLUMNS = [
+    "total_vaccinations",
+    "people_vaccinated",
+    "people_fully_vaccinated",
+    "daily_vaccinations_raw",
+    "daily_vaccinations",
+]
+
+MASK_COLUMN = "vaccine_mask"
+
+# frame.attrs key listing the vaccine_* column packed into each mask bit
+MASK_BITS = "vaccine_bits"
+
+_MASK_DTYPES = [(8, np.uint8), (16, np.uint16), (32, np.uint32), (64, np.uint64)]
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def count_dtype(series: pd.Series):
+    """
+    Nullable Int32 for whole-number counts, Int64 when a value does not fit
+    in 32 bits (e.g. cumulative totals of the largest countries), or None
+    when the column holds fractions and must stay float.
+    """
+    values = series.dropna().to_numpy(dtype="float64")
+    if not np.all(np.mod(values, 1) == 0):
+        return None
+    if len(values) and (values.min() < INT32_MIN or values.max() > INT32_MAX):
+        return "Int64"
+    return "Int32"
+
+
+def _vaccine_columns(frame: pd.DataFrame) -> list:
+    return [col for col in frame.columns if col.startswith("vaccine_") and col != MASK_COLUMN]
+
+
+def pack_vaccine_flags(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace the boolean vaccine_* columns with one unsigned integer column,
+    bit i set when the i-th of them is True. The column names, in bit
+    order, are kept in frame.attrs["vaccine_bits"]. Frames with more than
+    64 manufacturers are returned unchanged.
+    """
+    names = _vaccine_columns(frame)
+    if not names:
+        return frame
+    dtype = next((dtype for bits, dtype in _MASK_DTYPES if len(names) <= bits), None)
+    if dtype is None:
+        logger.warning("%d vaccine columns do not fit in a 64-bit mask; leaving them unpacked", len(names))
+        return frame
+
+    mask = np.zeros(len(frame), dtype=dtype)
+    for bit, name in enumerate(names):
+        mask |= frame[name].to_numpy(dtype=bool).astype(dtype) << dtype(bit)
+    position = frame.columns.get_loc(names[0])
+    packed = frame.drop(columns=names)
+    packed.insert(position, MASK_COLUMN, mask)
+    packed.attrs[MASK_BITS] = names
+    return packed
+
+
+def vaccine_bits(frame: pd.DataFrame, names=None) -> list:
+    names = names if names is not None else frame.attrs.get(MASK_BITS)
+    if names is None:
+        raise ValueError(f"frame has no {MASK_BITS!r} attribute; pass the packed column names")
+    return list(names)
+
+
+def vaccine_flag(frame: pd.DataFrame, column: str, names=None) -> pd.Series:
+    """
+    The boolean vaccine_* column `column` read back from the mask.
+    """
+    bits = vaccine_bits(frame, names)
+    if column not in bits:
+        raise KeyError(column)
+    mask = frame[MASK_COLUMN].to_numpy()
+    flags = (mask >> mask.dtype.type(bits.index(column))) & 1
+    return pd.Series(flags.astype(bool), index=frame.index, name=column)
+
+
+def unpack_vaccine_flags(frame: pd.DataFrame, names=None) -> pd.DataFrame:
+    """
+    Inverse of pack_vaccine_flags: restore one boolean column per bit.
+    """
+    if MASK_COLUMN not in frame.columns:
+        return frame
+    bits = vaccine_bits(frame, names)
+    position = frame.columns.get_loc(MASK_COLUMN)
+    unpacked = frame.drop(columns=[MASK_COLUMN])
+    for offset, name in enumerate(bits):
+        unpacked.insert(position + offset, name, vaccine_flag(frame, name, bits))
+    unpacked.attrs.pop(MASK_BITS, None)
+    return unpacked
+
+
+def compact_frame(frame: pd.DataFrame, pack_vaccines=True) -> pd.DataFrame:
+    """
+    Memory-optimized copy of a cleaned frame: categorical string columns,
+    nullable integer counts and, optionally, the vaccine flags packed into
+    a bitmask column.
+    """
+    conversions = {}
+    for col in CATEGORY_COLUMNS:
+        if col in frame.columns:
+            conversions[col] = "category"
+    for col in COUNT_COLUMNS:
+        if col in frame.columns:
+            dtype = count_dtype(frame[col])
+            if dtype is not None:
+                conversions[col] = dtype
+    compact = frame.astype(conversions)
+    return pack_vaccine_flags(compact) if pack_vaccines else compact
+
+
+def memory_report(frame: pd.DataFrame, compact=None) -> pd.DataFrame:
+    """
+    Deep memory usage in bytes per column of a frame and its compact
+    layout, with a total row and a bytes-per-row row.
+    """
+    if compact is None:
+        compact = compact_frame(frame)
+    report = pd.DataFrame({
+        "standard": frame.memory_usage(index=False, deep=True),
+        "compact": compact.memory_usage(index=False, deep=True),
+    }).fillna(0).astype("int64")
+    report = report.reindex(list(frame.columns) + [col for col in compact.columns if col not in frame.columns])
+    report.loc["total"] = report.sum()
+    report.loc["per_row"] = report.loc["total"] // max(len(frame), 1)
+    return report
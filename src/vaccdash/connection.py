@@ -0,0 +1,155 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Applied to every connection when it is opened. journal_mode is persistent in
+# the database file and can only be changed by a writable connection.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negative values are KiB, i.e. 64 MiB
+}
+
+WRITE_ONLY_PRAGMAS = {"journal_mode"}
+
+
+def file_id(path):
+    """
+    (st_dev, st_ino) of a file, or None if it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of warm SQLite connections to one database file.
+
+    Read-only and read-write connections are pooled separately and each kind
+    is capped at `size` concurrent checkouts; callers block (up to `timeout`
+    seconds) once the cap is reached. Idle connections are reused most
+    recently returned first, so their page cache and prepared statement
+    cache (`cached_statements`) stay warm across dashboard requests.
+
+    file_id is the identity of the database file the connections were
+    opened on, recorded with the first connection.
+    """
+
+    def __init__(self, db_path, size=4, pragmas=None, cached_statements=256, timeout=5.0):
+        self.db_path = os.fspath(db_path)
+        self.size = size
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._idle = {False: queue.LifoQueue(), True: queue.LifoQueue()}
+        self._slots = {False: threading.BoundedSemaphore(size), True: threading.BoundedSemaphore(size)}
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.file_id = None
+
+    def _open(self, read_only: bool) -> sqlite3.Connection:
+        if read_only:
+            target, uri = Path(self.db_path).resolve().as_uri() + "?mode=ro", True
+        else:
+            target, uri = self.db_path, False
+        conn = sqlite3.connect(
+            target,
+            uri=uri,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        for name, value in self.pragmas.items():
+            if read_only and name in WRITE_ONLY_PRAGMAS:
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._all.append(conn)
+            if self.file_id is None:
+                self.file_id = file_id(self.db_path)
+        return conn
+
+    def stale(self) -> bool:
+        """
+        True once the database file the pool opened has been deleted or
+        replaced, so that its connections no longer reach the file at
+        db_path.
+        """
+        return self.file_id is not None and file_id(self.db_path) != self.file_id
+
+    @contextmanager
+    def connection(self, read_only=False):
+        """
+        Check a connection out of the pool for the duration of a with block.
+        Any transaction left open when the block exits is rolled back before
+        the connection is returned.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        if not self._slots[read_only].acquire(timeout=self.timeout):
+            raise TimeoutError(f"No pooled connection to {self.db_path} became available")
+        try:
+            try:
+                conn = self._idle[read_only].get_nowait()
+            except queue.Empty:
+                conn = self._open(read_only)
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle[read_only].put(conn)
+        finally:
+            self._slots[read_only].release()
+
+    def close(self):
+        """
+        Close every connection opened by the pool.
+        """
+        self._closed = True
+        with self._lock:
+            connections, self._all = self._all, []
+        for conn in connections:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, **kwargs) -> ConnectionPool:
+    """
+    Return the shared pool for a database file, creating it on first use.
+    Keyword arguments are passed to ConnectionPool when it is created.
+    A pool whose file was deleted or replaced since is closed and replaced.
+    """
+    key = str(Path(db_path).resolve())
+    stale = None
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.stale():
+            stale, pool = pool, None
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path, **kwargs)
+    if stale is not None:
+        stale.close()
+    return pool
+
+
+def close_all_pools():
+    """
+    Close and forget every shared pool, e.g. at shutdown or between tests.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
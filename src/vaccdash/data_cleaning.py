@@ -1,55 +1,319 @@
+import bisect
+import time
+import tracemalloc
+from dataclasses import dataclass
+
 import pandas as pd
+import numpy as np
 import logging
+
+from vaccdash.compact import compact_frame
+from vaccdash.derived_metrics import fully_vaccinated_ratio
+
 logger = logging.getLogger("data_cleaning")
 
-def clean_vaccination_data(df: pd.DataFrame) -> pd.DataFrame:
+# Bump whenever clean_vaccination_data changes its output, so that cached
+# cleaned data (see vaccdash.cleaned_cache) is recomputed.
+CLEANER_VERSION = 1
+
+VACCINATION_COLS = ["total_vaccinations", "people_vaccinated", "people_fully_vaccinated"]
+
+
+def vaccine_column_name(vaccine: str) -> str:
     """
-    Convert the 'date' column to datetime and sort records
-    by iso_code then date.
+    Return the boolean column name used for a single vaccine manufacturer.
+    """
+    return f"vaccine_{vaccine.replace('/', '_').replace(' ', '_')}"
+
+
+def tokenize_vaccines(vaccines: pd.Series):
     """
-    cleaned = df.copy()
+    Factorize the 'vaccines' column and split each distinct string once.
 
-    # Convert date to datetime
-    cleaned["date"] = pd.to_datetime(cleaned["date"], errors="coerce")
+    Returns (codes, tokens): codes maps every row to an entry of tokens
+    (-1 for missing values) and tokens holds the manufacturer set of each
+    distinct vaccines string.
+    """
+    codes, uniques = pd.factorize(vaccines)
+    tokens = [set(value.split(", ")) for value in uniques]
+    return codes, tokens
 
-    # Sort by iso_code then date
-    cleaned = cleaned.sort_values(["iso_code", "date"]).reset_index(drop=True)
 
+def manufacturer_vocabulary(vaccines: pd.Series) -> list:
+    """
+    Return the sorted list of distinct manufacturers in the 'vaccines' column.
+    """
+    _, tokens = tokenize_vaccines(vaccines)
+    return sorted(set().union(*tokens))
+
+
+def vaccine_indicator_columns(vaccines: pd.Series, vocabulary=None) -> dict:
+    """
+    Build one boolean array per manufacturer in a single pass.
+
+    The column is tokenized once into a (distinct strings x manufacturers)
+    indicator table, which is then gathered by the factorized row codes, so
+    the cost no longer grows with rows x manufacturers string splits.
+    Columns are returned in vocabulary order (sorted when not given).
+    """
+    codes, tokens = tokenize_vaccines(vaccines)
+    if vocabulary is None:
+        vocabulary = sorted(set().union(*tokens))
+    position = {vaccine: i for i, vaccine in enumerate(vocabulary)}
+
+    # One extra all-False row so that missing values (code -1) gather False
+    table = np.zeros((len(vocabulary), len(tokens) + 1), dtype=bool)
+    for code, manufacturers in enumerate(tokens):
+        for vaccine in manufacturers:
+            if vaccine in position:
+                table[position[vaccine], code] = True
+
+    return {
+        vaccine_column_name(vaccine): table[i][codes]
+        for i, vaccine in enumerate(vocabulary)
+    }
+
+
+@dataclass
+class StageReport:
+    """
+    What one cleaning stage did: wall time, rows in and out, and the change
+    in the size of the frame in bytes (shallow: the characters of strings
+    are not counted). peak_bytes is the most memory allocated at once
+    during the stage, only known while tracemalloc is tracing.
+    """
+    stage: str
+    seconds: float
+    rows_in: int
+    rows_out: int
+    memory_delta: int
+    peak_bytes: int | None = None
+
+
+def _parse_dates(df: pd.DataFrame, options: dict) -> pd.DataFrame:
+    logger.info("Converting dates to datetime")
+    return df.assign(date=pd.to_datetime(df["date"], format=options["date_format"], errors="coerce"))
+
+
+def _sort(df: pd.DataFrame, options: dict) -> pd.DataFrame:
+    logger.info("Sorting records by iso_code then date")
+    return df.sort_values(["iso_code", "date"]).reset_index(drop=True)
+
+
+def _drop_missing(df: pd.DataFrame, options: dict) -> pd.DataFrame:
     #Drop rows where all vaccination columns are NaN. If only one or two columns are NaN, we keep the record.
     logger.info("Dropping records with all vaccination data missing")
-    vaccination_cols = ["total_vaccinations", "people_vaccinated", "people_fully_vaccinated"]
-    cleaned = cleaned.dropna(subset=vaccination_cols, how='all').reset_index(drop=True)
+    return df.dropna(subset=VACCINATION_COLS, how='all').reset_index(drop=True)
 
+
+def _split_manufacturers(df: pd.DataFrame, options: dict) -> pd.DataFrame:
     # Split vaccine manufacturers into separate boolean columns (AI enhancement)
     logger.info("Splitting vaccine manufacturers into separate boolean columns")
-    if "vaccines" in cleaned.columns:
-        unique_vaccines = set()
-        for vaccines in cleaned["vaccines"].dropna():
-            for vaccine in vaccines.split(", "):
-                unique_vaccines.add(vaccine)
+    if "vaccines" not in df.columns:
+        return df
+    return df.assign(**vaccine_indicator_columns(df["vaccines"], options["vocabulary"]))
 
-        for vaccine in sorted(unique_vaccines):
-            col_name = f"vaccine_{vaccine.replace('/', '_').replace(' ', '_')}"
-            cleaned[col_name] = cleaned["vaccines"].apply(lambda x: vaccine in x.split(", ") if pd.notna(x) else False)
 
+def _dedupe(df: pd.DataFrame, options: dict) -> pd.DataFrame:
     # Remove duplicate records based on iso_code and date, keeping the first occurrence
     logger.info("Removing duplicate records based on iso_code and date")
-    cleaned = cleaned.drop_duplicates(subset=["iso_code", "date"], keep="first").reset_index(drop=True)
+    return df.drop_duplicates(subset=["iso_code", "date"], keep="first").reset_index(drop=True)
+
 
+def _ratio(df: pd.DataFrame, options: dict) -> pd.DataFrame:
     # Calculate the ratio of people fully vaccinated to total vaccinations
     # Skip rows where total_vaccinations is NaN or 0
     logger.info("Calculating fully vaccinated ratio")
-    cleaned["fully_vaccinated_ratio"] = cleaned.apply(
-        lambda row: row["people_fully_vaccinated"] / row["total_vaccinations"]
-        if pd.notna(row["total_vaccinations"]) and row["total_vaccinations"] != 0
-        else None,
-        axis=1
-    )
+    return df.assign(fully_vaccinated_ratio=fully_vaccinated_ratio(df))
+
+
+def _filter_sources(df: pd.DataFrame, options: dict) -> pd.DataFrame:
     logger.info("Dropping records that have facebook or twitter as source_websites")
-    if "source_website" in cleaned.columns:
-        cleaned = cleaned[~cleaned["source_website"].str.contains("facebook|twitter", case=False, na=False)].reset_index(drop=True)
+    if "source_website" not in df.columns:
+        return df
+    # A few distinct websites repeat over every row, so match each one once
+    codes, websites = pd.factorize(df["source_website"])
+    social = pd.Series(websites).str.contains("facebook|twitter", case=False, na=False).to_numpy()
+    dropped = np.append(social, False)[codes]
+    return df[~dropped].reset_index(drop=True)
+
+
+def _compact(df: pd.DataFrame, options: dict) -> pd.DataFrame:
+    logger.info("Converting to the compact layout")
+    return compact_frame(df)
+
+
+# Every stage takes the frame and the cleaning options and returns a new frame
+STAGES = {
+    "date_parse": _parse_dates,
+    "sort": _sort,
+    "nan_drop": _drop_missing,
+    "manufacturer_split": _split_manufacturers,
+    "dedupe": _dedupe,
+    "ratio": _ratio,
+    "source_filter": _filter_sources,
+    "compact": _compact,
+}
+
+DEFAULT_STAGES = ("date_parse", "sort", "nan_drop", "manufacturer_split", "dedupe", "ratio", "source_filter")
+
+# Drops duplicates and social media sources before the manufacturer split
+# and the ratio, so those run on fewer rows. The result is the same as with
+# DEFAULT_STAGES when the vocabulary is given; otherwise manufacturers only
+# named by the dropped rows get no vaccine_* column.
+FILTER_FIRST_STAGES = ("date_parse", "sort", "nan_drop", "dedupe", "source_filter", "manufacturer_split", "ratio")
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    # Shallow, as measuring strings deeply costs more than most stages
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+def clean_vaccination_data(df: pd.DataFrame, vocabulary=None, date_format=None, compact=False,
+                           stages=None, hooks=(), quality=None) -> pd.DataFrame:
+    """
+    Convert the 'date' column to datetime and sort records
+    by iso_code then date.
+
+    The cleaning runs as a pipeline of the named STAGES, DEFAULT_STAGES
+    unless `stages` gives another order or leaves some out. Each hook is
+    called with a StageReport after every stage; memory is only measured
+    when there are hooks.
+
+    vocabulary and date_format let a caller cleaning the data in pieces
+    (see vaccdash.parallel_cleaning) fix the manufacturer columns and the
+    date format that would otherwise be inferred from df itself. With
+    compact=True the result uses the memory-optimized layout of
+    vaccdash.compact (categorical strings, nullable integer counts and a
+    vaccine_mask bitmask instead of the vaccine_* columns).
+
+    quality, a vaccdash.validation.QualityReport, is filled with the
+    data-quality findings of its rules and the rows each stage dropped,
+    checked between the stages rather than in a separate pass.
+    """
+    names = DEFAULT_STAGES if stages is None else tuple(stages)
+    unknown = [name for name in names if name not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown cleaning stages: {', '.join(unknown)}")
+    if compact and "compact" not in names:
+        names += ("compact",)
+    options = {"vocabulary": vocabulary, "date_format": date_format}
+
+    cleaned = df if quality is None else quality.start(df)
+    size = _frame_bytes(cleaned) if hooks else 0
+    tracing = bool(hooks) and tracemalloc.is_tracing()
+    for name in names:
+        rows_in = len(cleaned)
+        if tracing:
+            tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+        stage_input = cleaned
+        start = time.perf_counter()
+        cleaned = STAGES[name](cleaned, options)
+        elapsed = time.perf_counter() - start
+        if quality is not None:
+            quality.observe(name, stage_input, cleaned)
+        if hooks:
+            after = _frame_bytes(cleaned)
+            peak = tracemalloc.get_traced_memory()[1] - traced if tracing else None
+            report = StageReport(name, elapsed, rows_in, len(cleaned), after - size, peak)
+            size = after
+            for hook in hooks:
+                hook(report)
+    if quality is not None:
+        cleaned = quality.finish(cleaned)
     logger.info("Data cleaning complete")
 
-    return cleaned
+    return cleaned.copy(deep=False) if cleaned is df else cleaned
+
+
+def _is_vaccine_column(name) -> bool:
+    return isinstance(name, str) and name.startswith("vaccine_")
+
+
+def _partition_bounds(iso: pd.Series, keys: pd.Series):
+    """
+    [lo, hi) row ranges of the given iso_codes in a frame sorted by
+    iso_code, found by binary search. Missing iso_codes sort last.
+    """
+    valid = bisect.bisect_left(range(len(iso)), True, key=lambda i: pd.isna(iso.iat[i]))
+    head = iso.iloc[:valid]
+    missing = keys.isna().to_numpy()
+    present = keys[~missing]
+    lo = np.full(len(keys), valid)
+    hi = np.full(len(keys), len(iso))
+    lo[~missing] = head.searchsorted(present, side="left")
+    hi[~missing] = head.searchsorted(present, side="right")
+    return lo, hi
+
+
+def clean_incremental(baseline: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean newly arrived raw rows against an already-cleaned baseline.
+
+    The result equals clean_vaccination_data(pd.concat([history, delta]))
+    where baseline = clean_vaccination_data(history). Only the delta is
+    tokenized, sorted and filtered; the iso_code partitions it touches are
+    located in the baseline by binary search. When the new dates of a
+    partition all fall after its last stored date (the usual daily feed)
+    the rows are simply spliced in after it; otherwise that partition is
+    re-sorted and de-duplicated together with the delta, history rows
+    winning as in a full re-clean. A new manufacturer adds a vaccine_*
+    column, False for every baseline row.
+
+    Rows of the history removed by the source filter are not in the
+    baseline, so a delta row repeating one of their (iso_code, date) keys
+    is kept here where a full re-clean would drop it.
+    """
+    if baseline.empty:
+        return clean_vaccination_data(delta)
+
+    new = delta.copy()
+    new["date"] = pd.to_datetime(new["date"], errors="coerce")
+    new = new.dropna(subset=VACCINATION_COLS, how="all")
+    if "vaccines" in new.columns:
+        new = new.assign(**vaccine_indicator_columns(new["vaccines"]))
+
+    known = [col for col in baseline.columns if _is_vaccine_column(col)]
+    added = [col for col in new.columns if _is_vaccine_column(col) and col not in known]
+    vaccine_cols = sorted(known + added) if added else known
+    raw_cols = [col for col in baseline.columns if not _is_vaccine_column(col) and col != "fully_vaccinated_ratio"]
+    raw_cols += [col for col in new.columns if not _is_vaccine_column(col) and col not in raw_cols]
+    columns = raw_cols + vaccine_cols + ["fully_vaccinated_ratio"]
+
+    def align(frame):
+        missing = {col: False for col in vaccine_cols if col not in frame.columns}
+        return frame.assign(**missing).reindex(columns=columns)
+
+    # Affected partitions, in the order clean_vaccination_data sorts them
+    keys = new["iso_code"].drop_duplicates().sort_values(na_position="last", ignore_index=True)
+    lo, hi = _partition_bounds(baseline["iso_code"], keys)
+    stored = baseline["date"].to_numpy()
+    last = np.where(lo < hi, stored[np.maximum(hi - 1, 0)], np.datetime64("NaT"))
+    first = new.groupby("iso_code", dropna=False)["date"].min().reindex(keys).to_numpy()
+    overlap = (lo < hi) & ~(first > last)
+    lo = np.where(overlap, lo, hi)
+
+    # Re-clean the delta together with the partitions it overlaps
+    reread = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)] + [np.arange(0)])
+    patch = pd.concat([align(baseline.take(reread)), align(new)], ignore_index=True)
+    patch = patch.sort_values(["iso_code", "date"], kind="stable")
+    patch = patch.drop_duplicates(subset=["iso_code", "date"], keep="first")
+    patch["fully_vaccinated_ratio"] = fully_vaccinated_ratio(patch)
+    if "source_website" in patch.columns:
+        patch = patch[~patch["source_website"].str.contains("facebook|twitter", case=False, na=False)]
+    patch = patch.reset_index(drop=True)
+    patch_lo, patch_hi = _partition_bounds(patch["iso_code"], keys)
 
+    # Row order of the merged frame: baseline rows, with each affected
+    # partition's [lo, hi) range replaced by its re-cleaned rows
+    offset = len(baseline)
+    order, start = [], 0
+    for a, b, pa, pb in zip(lo, hi, patch_lo, patch_hi):
+        order += [np.arange(start, a), np.arange(offset + pa, offset + pb)]
+        start = b
+    order.append(np.arange(start, offset))
 
+    logger.info("Incrementally cleaned %d new records into %d partitions", len(new), len(keys))
+    merged = pd.concat([align(baseline), patch], ignore_index=True)
+    return merged.take(np.concatenate(order)).reset_index(drop=True)
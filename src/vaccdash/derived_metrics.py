@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+
+def safe_ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    """
+    Divide two columns element-wise, returning NaN wherever the
+    denominator is NaN or 0 instead of raising or producing inf.
+    """
+    valid = denominator.notna() & (denominator != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = numerator / denominator
+    return ratio.where(valid).astype("float64")
+
+
+def per_hundred(values: pd.Series, population: pd.Series) -> pd.Series:
+    """
+    Recompute a per-hundred metric (e.g. total_vaccinations_per_hundred)
+    from absolute values and population, masking missing or zero population.
+    """
+    return safe_ratio(values, population) * 100
+
+
+def daily_delta(values: pd.Series, groups: pd.Series) -> pd.Series:
+    """
+    Day-over-day difference of a cumulative metric within each group
+    (e.g. iso_code). The frame must already be sorted by group then date;
+    the first record of each group is NaN.
+    """
+    return values.groupby(groups, sort=False).diff()
+
+
+def fully_vaccinated_ratio(df: pd.DataFrame) -> pd.Series:
+    """
+    Ratio of people fully vaccinated to total vaccinations.
+    """
+    return safe_ratio(df["people_fully_vaccinated"], df["total_vaccinations"])
@@ -0,0 +1,226 @@
+import argparse
+import contextlib
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import time
+
+from vaccdash.array_fetch import column_types, select_list
+from vaccdash.connection import get_pool
+from vaccdash.schema import day_number
+
+logger = logging.getLogger("export")
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+COMPRESSIONS = ("gzip", "zstd")
+
+# File suffixes recognised by the command line
+SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet", ".gz": "gzip", ".zst": "zstd"}
+
+DEFAULT_BATCH_SIZE = 10_000
+
+# Parquet column types for the dtypes of vaccdash.array_fetch.column_types
+ARROW_TYPES = {"float64": "float64", "bool": "bool_", "object": "string", "datetime64[D]": "date32"}
+
+
+class CsvWriter:
+    def __init__(self, stream, types, compression):
+        self.text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        self.writer = csv.writer(self.text)
+        self.writer.writerow(types)
+
+    def write(self, rows) -> None:
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        # Leave the underlying stream to the caller
+        self.text.flush()
+        self.text.detach()
+
+
+class JsonlWriter:
+    def __init__(self, stream, types, compression):
+        self.stream = stream
+        self.columns = list(types)
+
+    def write(self, rows) -> None:
+        lines = "".join(json.dumps(dict(zip(self.columns, row))) + "\n" for row in rows)
+        self.stream.write(lines.encode("utf-8"))
+
+    def close(self) -> None:
+        pass
+
+
+class ParquetWriter:
+    """
+    Writes each batch as a row group of one Parquet file, with column types
+    from the declared SQLite types. Needs pyarrow; compression is applied
+    by Parquet itself.
+    """
+
+    def __init__(self, stream, types, compression):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from error
+        self.pa = pa
+        self.flags = [dtype == "bool" for dtype in types.values()]
+        self.schema = pa.schema([(col, getattr(pa, ARROW_TYPES[dtype])()) for col, dtype in types.items()])
+        self.writer = pq.ParquetWriter(stream, self.schema, compression=compression or "none")
+
+    def write(self, rows) -> None:
+        arrays = []
+        for values, field, flag in zip(zip(*rows), self.schema, self.flags):
+            if flag:
+                values = [None if value is None else bool(value) for value in values]
+            arrays.append(self.pa.array(values, type=field.type))
+        self.writer.write_batch(self.pa.record_batch(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+def _compressed(stream, compression, stack):
+    if compression == "gzip":
+        # mtime=0 keeps the output identical across runs
+        return stack.enter_context(gzip.GzipFile(fileobj=stream, mode="wb", mtime=0))
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as error:
+            raise ImportError("zstd compression needs zstandard: pip install zstandard") from error
+        return stack.enter_context(zstandard.ZstdCompressor().stream_writer(stream, closefd=False))
+    return stream
+
+
+def export_sql(key, values, start_date, end_date, types, fmt):
+    """
+    SELECT statement and parameters of an extract, in (key, date) order so
+    that SQLite streams it from the (key, date_day) index without sorting.
+    """
+    if key not in ("country", "iso_code"):
+        raise ValueError("key must be 'country' or 'iso_code'")
+    # Parquet stores dates as dates; the text formats keep the stored ISO text
+    columns = select_list(types) if fmt == "parquet" else ", ".join(f'"{col}"' for col in types)
+    where, params = [], []
+    if values is not None:
+        values = list(dict.fromkeys(values))
+        where.append(f"{key} IN ({', '.join('?' * len(values))})")
+        params += values
+    if start_date is not None:
+        where.append("date_day >= ?")
+        params.append(day_number(start_date))
+    if end_date is not None:
+        where.append("date_day <= ?")
+        params.append(day_number(end_date, end=True))
+    sql = f"SELECT {columns} FROM vaccinations"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + f" ORDER BY {key}, date_day", params
+
+
+def export_vaccinations(conn, out, fmt="csv", key="country", values=None, start_date=None, end_date=None,
+                        columns=None, compression=None, batch_size=DEFAULT_BATCH_SIZE) -> int:
+    """
+    Write the vaccinations rows whose `key` is one of `values` (every row
+    when None), optionally between two dates, to `out`: a path or a binary
+    file-like object, which is left open. Returns the number of rows.
+
+    Rows are fetched from the cursor batch_size at a time and written as
+    they arrive, so memory use depends on batch_size and not on the size
+    of the extract. `columns` limits the extract to some columns, in that
+    order. compression is "gzip" or "zstd" (needs zstandard); for Parquet
+    (needs pyarrow) it is the codec used inside the file.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {FORMATS}")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {COMPRESSIONS}")
+    types = column_types(conn, columns)
+    sql, params = export_sql(key, values, start_date, end_date, types, fmt)
+
+    start = time.perf_counter()
+    rows = 0
+    to_path = isinstance(out, (str, os.PathLike))
+    try:
+        with contextlib.ExitStack() as stack:
+            stream = stack.enter_context(open(out, "wb")) if to_path else out
+            if fmt != "parquet":
+                stream = _compressed(stream, compression, stack)
+            writer = WRITERS[fmt](stream, types, compression)
+            cursor = conn.execute(sql, params)
+            try:
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    writer.write(batch)
+                    rows += len(batch)
+                    # Release the batch before the next one is fetched
+                    del batch
+            finally:
+                cursor.close()
+            writer.close()
+    except BaseException:
+        # Do not leave a truncated extract behind
+        if to_path and os.path.exists(out):
+            os.remove(out)
+        raise
+    logger.info("Exported %d rows as %s in %.2fs", rows, fmt, time.perf_counter() - start)
+    return rows
+
+
+def _infer(out):
+    """
+    Format and compression implied by an output file name, e.g.
+    extract.jsonl.gz -> ("jsonl", "gzip").
+    """
+    root, suffix = os.path.splitext(os.fspath(out))
+    compression = SUFFIXES.get(suffix) if SUFFIXES.get(suffix) in COMPRESSIONS else None
+    if compression is not None:
+        root, suffix = os.path.splitext(root)
+    fmt = SUFFIXES.get(suffix)
+    return (fmt if fmt in FORMATS else None), compression
+
+
+# python -m vaccdash.export DB OUT [--country NAME ...] [--start DATE] [--columns a,b] ...
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m vaccdash.export", description="Stream a vaccinations extract.")
+    parser.add_argument("db", help="SQLite database")
+    parser.add_argument("out", help="output file, or - for standard output")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the output suffix, else csv")
+    parser.add_argument("--country", action="append", help="repeat for several countries")
+    parser.add_argument("--iso-code", action="append", help="repeat for several ISO codes")
+    parser.add_argument("--start", help="first date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="last date (YYYY-MM-DD)")
+    parser.add_argument("--columns", help="comma-separated columns, default all")
+    parser.add_argument("--compression", choices=COMPRESSIONS, help="default: from the output suffix")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    if args.country and args.iso_code:
+        parser.error("give either --country or --iso-code")
+
+    fmt, compression = _infer(args.out) if args.out != "-" else (None, None)
+    key, values = ("iso_code", args.iso_code) if args.iso_code else ("country", args.country)
+    out = sys.stdout.buffer if args.out == "-" else args.out
+    with get_pool(args.db).connection(read_only=True) as conn:
+        rows = export_vaccinations(
+            conn, out, fmt=args.format or fmt or "csv", key=key, values=values, start_date=args.start,
+            end_date=args.end, columns=args.columns.split(",") if args.columns else None,
+            compression=args.compression or compression, batch_size=args.batch_size,
+        )
+    print(f"{rows} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,403 @@
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from vaccdash.connection import get_pool
+from vaccdash.data_cleaning import clean_vaccination_data
+from vaccdash.schema import (
+    bump_data_version, dirty_derived_tables, is_without_rowid, mark_derived_dirty, migrate,
+    refresh_if_dirty, set_bulk_load, table_exists,
+)
+from vaccdash.rollups import rebuild_rollups, update_rollups
+from vaccdash.vaccine_usage import rebuild_vaccine_usage, record_usage
+
+logger = logging.getLogger("ingestion")
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# A chunk is held as the parsed frame, the cleaned copy and the row tuples
+# handed to executemany, so budget roughly three times its frame size.
+CHUNK_MEMORY_FACTOR = 3
+PROBE_ROWS = 1_000
+
+# Unique key of the vaccinations table
+KEY_COLUMNS = ["iso_code", "date"]
+
+# Staged rows whose key is already stored, which INSERT OR IGNORE would skip
+STAGED_STORED_SQL = """
+    DELETE FROM temp.staged_chunk
+    WHERE EXISTS (
+        SELECT 1 FROM "{table}" AS stored
+        WHERE stored.iso_code = staged_chunk.iso_code AND stored.date = staged_chunk.date
+    )
+    """
+
+# Tables derived from vaccinations that ingestion keeps up to date as it writes
+DERIVED_MAINTAINERS = {
+    "vaccine_usage": record_usage,
+    "rollups": update_rollups,
+}
+
+# Full rebuilds of the same tables, for when they are marked dirty
+DERIVED_REBUILDERS = {
+    "vaccine_usage": rebuild_vaccine_usage,
+    "rollups": rebuild_rollups,
+}
+
+VACCINATION_COLS = ["total_vaccinations", "people_vaccinated", "people_fully_vaccinated"]
+
+# Day number standing for a missing date (NaT as int64)
+NO_DAY = np.iinfo("int64").min
+
+
+@dataclass
+class IngestStats:
+    """
+    Counters reported by a streaming ingestion run.
+    """
+    rows_read: int = 0
+    rows_written: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+
+class ChunkCleaner:
+    """
+    Runs clean_vaccination_data on successive chunks of one CSV while
+    keeping de-duplication on (iso_code, date) correct across chunk
+    boundaries: the first occurrence in file order wins, exactly as when
+    the whole file is cleaned at once.
+
+    The (iso_code, day number) keys already seen are spilled to a private
+    temporary SQLite database, so memory does not grow with the file. Only
+    the last day seen per iso_code is kept in memory: rows after it cannot
+    be repeats, so in a file sorted by date the keys are never looked up.
+
+    Every vaccine_* column seen so far is carried forward, so chunks that
+    do not mention a manufacturer get False for it rather than a missing
+    column.
+    """
+
+    def __init__(self):
+        # An empty filename is a temporary on-disk database, deleted on close
+        self._seen = sqlite3.connect("")
+        self._seen.execute("PRAGMA journal_mode = OFF")
+        self._seen.execute("PRAGMA synchronous = OFF")
+        self._seen.execute("CREATE TABLE seen (iso_code TEXT, day INTEGER, PRIMARY KEY (iso_code, day)) WITHOUT ROWID")
+        self._seen.execute("CREATE TABLE probe (position INTEGER PRIMARY KEY, iso_code TEXT, day INTEGER)")
+        self._last_day = {}
+        self.vaccine_columns = []
+
+    @staticmethod
+    def _keys(iso_codes: pd.Series, dates: pd.Series):
+        # Missing dates become the smallest int64 and take part in the keys,
+        # as drop_duplicates treats them as equal
+        iso = iso_codes.fillna("").to_numpy(dtype=object)
+        days = pd.to_datetime(dates, errors="coerce").to_numpy().astype("datetime64[D]").view("int64")
+        return iso, days
+
+    def _repeated(self, iso, days) -> np.ndarray:
+        codes, uniques = pd.factorize(iso)
+        last = np.array([self._last_day.get(code, NO_DAY) for code in uniques] + [NO_DAY], dtype="int64")
+        candidates = np.flatnonzero(days <= last[codes])
+        repeated = np.zeros(len(days), dtype=bool)
+        if len(candidates):
+            self._seen.execute("DELETE FROM probe")
+            self._seen.executemany(
+                "INSERT INTO probe VALUES (?, ?, ?)",
+                zip(candidates.tolist(), iso[candidates].tolist(), days[candidates].tolist()),
+            )
+            found = [row[0] for row in self._seen.execute(
+                "SELECT position FROM probe JOIN seen USING (iso_code, day)"
+            )]
+            repeated[found] = True
+        return repeated
+
+    def _remember(self, iso, days) -> None:
+        self._seen.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)", zip(iso.tolist(), days.tolist()))
+        latest = pd.Series(days).groupby(iso).max()
+        for code, day in zip(latest.index.tolist(), latest.tolist()):
+            if day > self._last_day.get(code, NO_DAY):
+                self._last_day[code] = day
+
+    def clean(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        # Keys of every row that survives the in-chunk de-duplication, including
+        # rows later removed by the source filter, shadow later duplicates.
+        # Rows dropped for missing vaccination data never take part.
+        kept = chunk.dropna(subset=VACCINATION_COLS, how="all")
+        chunk_keys = self._keys(kept["iso_code"], kept["date"])
+        cleaned = clean_vaccination_data(chunk)
+
+        if self._last_day:
+            repeated = self._repeated(*self._keys(cleaned["iso_code"], cleaned["date"]))
+            if repeated.any():
+                cleaned = cleaned[~repeated].reset_index(drop=True)
+        self._remember(*chunk_keys)
+
+        for col in cleaned.columns:
+            if col.startswith("vaccine_") and col not in self.vaccine_columns:
+                self.vaccine_columns.append(col)
+        missing = {col: False for col in self.vaccine_columns if col not in cleaned.columns}
+        if missing:
+            cleaned = cleaned.assign(**missing)
+        return cleaned
+
+    def close(self) -> None:
+        self._seen.close()
+
+
+def chunksize_for_memory(csv_path, max_memory_mb: float) -> int:
+    """
+    Pick a chunk size whose working set stays under max_memory_mb, based on
+    the in-memory size of the first rows of the file.
+    """
+    probe = pd.read_csv(csv_path, nrows=PROBE_ROWS)
+    if probe.empty:
+        return DEFAULT_CHUNKSIZE
+    bytes_per_row = probe.memory_usage(deep=True).sum() / len(probe)
+    budget = max_memory_mb * 1024 * 1024
+    return max(1, int(budget / (bytes_per_row * CHUNK_MEMORY_FACTOR)))
+
+
+def _sqlite_type(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(series):
+        return "REAL"
+    return "TEXT"
+
+
+def _ensure_columns(conn, table: str, chunk: pd.DataFrame) -> None:
+    """
+    Create the table from the chunk if it does not exist yet, otherwise add
+    any columns the chunk has that the table lacks.
+    """
+    existing = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+    if not existing:
+        cols = ", ".join(f'"{col}" {_sqlite_type(chunk[col])}' for col in chunk.columns)
+        conn.execute(f'CREATE TABLE "{table}" ({cols})')
+        return
+    for col in chunk.columns:
+        if col not in existing:
+            definition = f'"{col}" {_sqlite_type(chunk[col])}'
+            if col.startswith("vaccine_"):
+                # Rows written before this manufacturer appeared did not use it
+                definition += " NOT NULL DEFAULT 0"
+            conn.execute(f'ALTER TABLE "{table}" ADD COLUMN {definition}')
+
+
+def _to_rows(chunk: pd.DataFrame):
+    """
+    Convert a chunk into plain Python tuples that sqlite3 can bind: NaN/NaT
+    become NULL and datetimes are written as ISO dates like the raw CSV.
+    """
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        if pd.api.types.is_datetime64_any_dtype(chunk[col]):
+            chunk[col] = chunk[col].dt.strftime("%Y-%m-%d")
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def _drop_unkeyed(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Leave out rows missing iso_code or date, which the primary key of a
+    WITHOUT ROWID table cannot hold (INSERT OR IGNORE would skip them
+    without a trace).
+    """
+    unkeyed = chunk.reindex(columns=["iso_code", "date"]).isna().any(axis=1)
+    if unkeyed.any():
+        logger.warning("Skipping %d rows without iso_code or date: the WITHOUT ROWID table cannot store them",
+                       int(unkeyed.sum()))
+        chunk = chunk[~unkeyed]
+    return chunk
+
+
+def _stage(conn, chunk: pd.DataFrame) -> None:
+    """
+    Load a chunk into temp.staged_chunk, with each row's position in _pos.
+    The table is only recreated when the columns change, so consecutive
+    chunks of one file reuse it.
+    """
+    columns = ["_pos", *chunk.columns]
+    if [row[1] for row in conn.execute("PRAGMA temp.table_info(staged_chunk)")] != columns:
+        conn.execute("DROP TABLE IF EXISTS temp.staged_chunk")
+        cols = ", ".join(f'"{col}"' for col in chunk.columns)
+        conn.execute(f"CREATE TEMP TABLE staged_chunk (_pos INTEGER PRIMARY KEY, {cols})")
+    else:
+        conn.execute("DELETE FROM temp.staged_chunk")
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(f"INSERT INTO temp.staged_chunk VALUES ({placeholders})",
+                     ((pos, *row) for pos, row in enumerate(_to_rows(chunk))))
+
+
+def _insert_staged(conn, chunk: pd.DataFrame, table: str):
+    """
+    Insert the rows of chunk whose (iso_code, date) is neither stored yet
+    nor repeated earlier in the chunk, with one INSERT ... SELECT from the
+    staging table. Returns the number of rows written and those rows, or
+    None in their place if some staged rows were still ignored (e.g. by a
+    NOT NULL constraint) and the new rows are not known exactly.
+    """
+    keyed = set(KEY_COLUMNS) <= set(chunk.columns)
+    if keyed:
+        repeated = chunk.duplicated(KEY_COLUMNS) & chunk[KEY_COLUMNS].notna().all(axis=1)
+        chunk = chunk[~repeated.to_numpy()]
+    _stage(conn, chunk)
+    if keyed:
+        stored = conn.execute(STAGED_STORED_SQL.format(table=table)).rowcount
+        if stored:
+            positions = [row[0] for row in conn.execute("SELECT _pos FROM temp.staged_chunk ORDER BY _pos")]
+            chunk = chunk.iloc[positions]
+    cols = ", ".join(f'"{col}"' for col in chunk.columns)
+    inserted = conn.execute(
+        f'INSERT OR IGNORE INTO "{table}" ({cols}) SELECT {cols} FROM temp.staged_chunk ORDER BY _pos'
+    ).rowcount
+    return inserted, (chunk if inserted == len(chunk) else None)
+
+
+def insert_chunk(conn, chunk: pd.DataFrame, table: str = "vaccinations") -> int:
+    """
+    Bulk-insert one chunk inside a single transaction using executemany with
+    a prepared INSERT statement. Rows whose (iso_code, date) already exists
+    are skipped, so the first occurrence is kept, as are rows missing either
+    when the table is WITHOUT ROWID. Returns the number of rows written.
+
+    Into a vaccinations table with derived tables, the chunk goes through a
+    temporary staging table instead, so that the rows actually inserted are
+    known and the derived tables can be updated from them.
+    """
+    if chunk.empty:
+        return 0
+    with conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        _ensure_columns(conn, table, chunk)
+        if is_without_rowid(conn, table):
+            chunk = _drop_unkeyed(chunk)
+        if not (table == "vaccinations" and table_exists(conn, "derived_state")):
+            cols = ", ".join(f'"{col}"' for col in chunk.columns)
+            placeholders = ", ".join("?" for _ in chunk.columns)
+            sql = f'INSERT OR IGNORE INTO "{table}" ({cols}) VALUES ({placeholders})'
+            return conn.executemany(sql, _to_rows(chunk)).rowcount
+        # Derived tables and the data version are maintained once per chunk
+        # below, so the per-row triggers are switched off for the bulk insert
+        # and back on before the transaction commits.
+        set_bulk_load(conn, True)
+        inserted, rows = _insert_staged(conn, chunk, table)
+        set_bulk_load(conn, False)
+        # A chunk of rows that were all already stored changes nothing, so
+        # cached results keyed on the data version stay valid
+        if inserted > 0:
+            _maintain_derived(conn, rows)
+    return inserted
+
+
+def _maintain_derived(conn, rows) -> None:
+    """
+    Update derived tables from the rows that were just inserted, in the same
+    transaction, and bump the data version. Tables that were already dirty
+    are left for their next reader to rebuild, and so is every table when
+    rows is None (the inserted rows are not known).
+    """
+    bump_data_version(conn)
+    if rows is None:
+        mark_derived_dirty(conn)
+        return
+    dirty = dirty_derived_tables(conn)
+    for name, maintain in DERIVED_MAINTAINERS.items():
+        if name not in dirty:
+            maintain(conn, rows)
+
+
+def refresh_derived(conn) -> None:
+    """
+    Rebuild every derived table marked dirty, on a writable connection, so
+    that readers (read-only connections included) find them current rather
+    than falling back to scanning vaccinations.
+    """
+    if not table_exists(conn, "derived_state"):
+        return
+    for name, rebuild in DERIVED_REBUILDERS.items():
+        refresh_if_dirty(conn, name, rebuild)
+
+
+def stream_csv_to_sqlite(csv_path, conn, chunksize=None, clean=False, max_memory_mb=None,
+                         table="vaccinations") -> IngestStats:
+    """
+    Stream a CSV into SQLite in bounded chunks instead of loading it whole.
+
+    Each chunk is optionally cleaned with clean_vaccination_data (with
+    de-duplication carried across chunks) and written in its own
+    transaction. When max_memory_mb is given the chunk size is derived from
+    it, so peak memory no longer grows with the size of the file.
+    """
+    if max_memory_mb is not None:
+        chunksize = chunksize_for_memory(csv_path, max_memory_mb)
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    cleaner = ChunkCleaner() if clean else None
+
+    stats = IngestStats()
+    start = time.perf_counter()
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            stats.rows_read += len(chunk)
+            if cleaner is not None:
+                chunk = cleaner.clean(chunk)
+            stats.rows_written += insert_chunk(conn, chunk, table)
+            stats.chunks += 1
+    finally:
+        if cleaner is not None:
+            cleaner.close()
+    if table == "vaccinations":
+        refresh_derived(conn)
+    stats.seconds = time.perf_counter() - start
+
+    logger.info(
+        "Ingested %d rows (%d written) in %d chunks, %.0f rows/s",
+        stats.rows_read, stats.rows_written, stats.chunks, stats.rows_per_second,
+    )
+    return stats
+
+
+def init_db(db_path, without_rowid=False):
+    """
+    Create the vaccinations table with its indexes, or migrate an existing
+    database to the current schema (see vaccdash.schema). Derived tables
+    of a migrated database are built from its rows.
+    """
+    with get_pool(db_path).connection() as conn:
+        migrate(conn, without_rowid=without_rowid)
+        refresh_derived(conn)
+
+
+def load_csv_to_sqlite(csv_path, db_path, chunksize=None, clean=False, max_memory_mb=None):
+    """
+    Append a CSV to the vaccinations table.
+
+    By default the whole file is read and written in one go. Passing
+    chunksize, max_memory_mb or clean=True switches to streaming ingestion:
+    the file is read in bounded chunks, optionally cleaned, and each chunk is
+    bulk-inserted in its own transaction. Streaming returns an IngestStats
+    with the rows/s achieved. Either way, derived tables left dirty are
+    rebuilt before returning.
+    """
+    if chunksize is not None or max_memory_mb is not None or clean:
+        with get_pool(db_path).connection() as conn:
+            migrate(conn)
+            return stream_csv_to_sqlite(csv_path, conn, chunksize=chunksize, clean=clean,
+                                        max_memory_mb=max_memory_mb)
+
+    df = pd.read_csv(csv_path)
+    with get_pool(db_path).connection() as conn:
+        migrate(conn)
+        insert_chunk(conn, df)
+        refresh_derived(conn)
@@ -0,0 +1,222 @@
+import csv
+import functools
+import json
+import logging
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger("instrumentation")
+
+FIELDNAMES = ["function", "sql", "params", "duration_ms", "rows", "bytes", "timestamp", "cached"]
+
+
+@dataclass
+class QueryRecord:
+    """
+    One instrumented call: the SQL sqlite3 actually executed (with bound
+    values expanded), the Python arguments, wall time and result size.
+    Calls answered from a result cache run no SQL and have cached=True.
+    """
+    function: str
+    sql: str
+    params: str
+    duration_ns: int
+    rows: int
+    bytes: int
+    timestamp: float
+    cached: bool = False
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1e6
+
+    def as_row(self) -> dict:
+        row = asdict(self)
+        del row["duration_ns"]
+        row["duration_ms"] = self.duration_ms
+        return row
+
+
+def result_size(result):
+    """
+    Return (rows, bytes) for a query result: a DataFrame, a dict of NumPy
+    column arrays, a sequence of rows or a scalar.
+
+    Sizes are shallow: a DataFrame counts rows times the item size of its
+    column dtypes (8 bytes per reference for strings and other objects),
+    which costs microseconds, whereas memory_usage visits every column and
+    deep=True every string.
+    """
+    if isinstance(result, dict) and all(hasattr(value, "nbytes") for value in result.values()):
+        rows = len(next(iter(result.values()), ()))
+        return rows, sum(value.nbytes for value in result.values())
+    if hasattr(result, "dtypes") and hasattr(result, "columns"):
+        width = sum(getattr(dtype, "itemsize", None) or 8 for dtype in result.dtypes)
+        return len(result), len(result) * width
+    if isinstance(result, (list, tuple)):
+        return len(result), sum(sys.getsizeof(item) for item in result)
+    if result is None:
+        return 0, 0
+    return 1, sys.getsizeof(result)
+
+
+class QueryRecorder:
+    """
+    Collects QueryRecords in a bounded ring buffer and keeps a bounded
+    window of durations per function for latency percentiles. Nothing is
+    written anywhere until export() is called with a sink.
+    """
+
+    def __init__(self, capacity=1000, window=1000):
+        self.records = deque(maxlen=capacity)
+        self._window = window
+        self._durations = defaultdict(lambda: deque(maxlen=self._window))
+        self._lock = threading.Lock()
+
+    def record(self, record: QueryRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            self._durations[record.function].append(record.duration_ns)
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return list(self.records)
+
+    def percentiles(self) -> dict:
+        """
+        Per-function call count and p50/p95/p99 latency in milliseconds over
+        the most recent `window` calls (nearest-rank percentiles).
+        """
+        with self._lock:
+            windows = {name: sorted(values) for name, values in self._durations.items()}
+        stats = {}
+        for name, values in windows.items():
+            def rank(p):
+                return values[max(0, math.ceil(p / 100 * len(values)) - 1)] / 1e6
+            stats[name] = {"count": len(values), "p50": rank(50), "p95": rank(95), "p99": rank(99)}
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self._durations.clear()
+
+    def export(self, sink) -> None:
+        sink.write(self.snapshot())
+
+
+# File sinks overwrite their file on every export unless append=True.
+class CsvSink:
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+
+    def write(self, records) -> None:
+        header = not (self.append and os.path.exists(self.path) and os.path.getsize(self.path))
+        with open(self.path, "a" if self.append else "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+            if header:
+                writer.writeheader()
+            for record in records:
+                writer.writerow(record.as_row())
+
+
+class JsonlSink:
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+
+    def write(self, records) -> None:
+        with open(self.path, "a" if self.append else "w") as jsonfile:
+            for record in records:
+                jsonfile.write(json.dumps(record.as_row()) + "\n")
+
+
+class LoggingSink:
+    def __init__(self, log=logger, level=logging.INFO):
+        self.log = log
+        self.level = level
+
+    def write(self, records) -> None:
+        for record in records:
+            self.log.log(
+                self.level, "%s %.3fms rows=%d bytes=%d%s sql=%s",
+                record.function, record.duration_ms, record.rows, record.bytes,
+                " cached" if record.cached else "", record.sql,
+            )
+
+
+# Statements traced per connection. sqlite3 allows one trace callback per
+# connection, so nested instrumented calls share it through this registry.
+_collectors = {}
+_collectors_lock = threading.Lock()
+
+
+def _start_trace(conn) -> list:
+    statements = []
+    with _collectors_lock:
+        active = _collectors.setdefault(id(conn), [])
+        active.append(statements)
+        if len(active) == 1:
+            def trace(sql, active=active):
+                for collected in active:
+                    collected.append(sql)
+            conn.set_trace_callback(trace)
+    return statements
+
+
+def _stop_trace(conn, statements) -> None:
+    with _collectors_lock:
+        active = _collectors[id(conn)]
+        active.remove(statements)
+        if not active:
+            del _collectors[id(conn)]
+            conn.set_trace_callback(None)
+
+
+default_recorder = QueryRecorder()
+
+
+def make_record(function, statements, args, kwargs, result, duration_ns, cached=False) -> QueryRecord:
+    rows, size = result_size(result)
+    return QueryRecord(
+        function=function,
+        sql=";\n".join(statements),
+        params=repr(args + tuple(kwargs.values())),
+        duration_ns=duration_ns,
+        rows=rows,
+        bytes=size,
+        timestamp=time.time(),
+        cached=cached,
+    )
+
+
+def instrumented(recorder=None):
+    """
+    Decorator for query functions whose first argument is a sqlite3
+    connection. Each call is timed with perf_counter_ns and the statements
+    executed are captured through the connection's trace callback.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(conn, *args, **kwargs):
+            target = recorder or default_recorder
+            traced = isinstance(conn, sqlite3.Connection)
+            statements = _start_trace(conn) if traced else []
+            start = time.perf_counter_ns()
+            try:
+                result = func(conn, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                if traced:
+                    _stop_trace(conn, statements)
+            target.record(make_record(func.__name__, statements, args, kwargs, result, elapsed))
+            return result
+        return wrapper
+    return decorator
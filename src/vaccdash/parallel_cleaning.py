@@ -0,0 +1,102 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from vaccdash.compact import compact_frame
+from vaccdash.data_cleaning import (FILTER_FIRST_STAGES, VACCINATION_COLS, clean_vaccination_data,
+                                    manufacturer_vocabulary)
+
+logger = logging.getLogger("parallel_cleaning")
+
+
+def shared_vocabulary(df: pd.DataFrame):
+    """
+    Manufacturers of the rows clean_vaccination_data keeps after dropping
+    records with no vaccination figures, or None without a vaccines column.
+    """
+    if "vaccines" not in df.columns:
+        return None
+    kept = df[VACCINATION_COLS].notna().any(axis=1)
+    return manufacturer_vocabulary(df.loc[kept, "vaccines"])
+
+
+def shared_date_format(dates: pd.Series):
+    """
+    The format pd.to_datetime would infer for the whole column, taken from
+    its first non-missing string as pandas does.
+    """
+    first = dates.first_valid_index()
+    if first is None or not isinstance(dates[first], str):
+        return None
+    return guess_datetime_format(dates[first])
+
+
+def country_shards(iso_codes: pd.Series, shards: int) -> list:
+    """
+    Split row positions into at most `shards` groups of whole countries.
+
+    Countries are assigned in sorted order (missing iso_code last) to
+    contiguous, roughly equal-sized groups, so concatenating the cleaned
+    shards in order reproduces the (iso_code, date) sort of the serial
+    path. Within a shard rows keep their input order, which keeps the
+    first of any duplicate (iso_code, date) rows.
+    """
+    codes, _ = pd.factorize(iso_codes, sort=True, use_na_sentinel=False)
+    if len(codes) == 0:
+        return []
+    sizes = np.bincount(codes)
+    # A country starts a new shard once the rows before it pass a multiple of len / shards
+    bounds = np.searchsorted(np.cumsum(sizes), np.arange(1, shards) * len(codes) / shards) + 1
+    shard_of_country = np.zeros(len(sizes), dtype=np.int64)
+    shard_of_country[bounds[bounds < len(sizes)]] = 1
+    shard_of_country = np.cumsum(shard_of_country)
+    rows = shard_of_country[codes]
+    order = np.argsort(rows, kind="stable")
+    splits = np.searchsorted(rows[order], np.arange(1, rows.max() + 1))
+    return [rows for rows in np.split(order, splits) if len(rows)]
+
+
+def _clean_shard(args):
+    shard, vocabulary, date_format = args
+    # The vocabulary is fixed, so splitting after the filters gives the same result
+    return clean_vaccination_data(shard, vocabulary=vocabulary, date_format=date_format, stages=FILTER_FIRST_STAGES)
+
+
+def clean_parallel(df: pd.DataFrame, workers=None, shards=None, executor=None, compact=False) -> pd.DataFrame:
+    """
+    clean_vaccination_data sharded by iso_code across a process pool.
+
+    The manufacturer vocabulary and date format are decided once for the
+    whole input, then each shard of whole countries is cleaned
+    independently and the results are concatenated in shard order. The
+    output is identical to clean_vaccination_data(df).
+
+    workers defaults to os.cpu_count(); shards defaults to workers. Pass an
+    existing concurrent.futures executor to reuse its processes. With a
+    single worker and no executor everything runs in this process.
+    compact=True converts the concatenated result, so that categorical
+    columns share one set of categories across shards.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shards or workers
+    vocabulary = shared_vocabulary(df)
+    date_format = shared_date_format(df["date"])
+    pieces = country_shards(df["iso_code"], shards)
+    if not pieces:
+        return clean_vaccination_data(df, vocabulary=vocabulary, date_format=date_format, compact=compact)
+
+    tasks = [(df.take(rows), vocabulary, date_format) for rows in pieces]
+    logger.info("Cleaning %d records in %d shards on %d workers", len(df), len(tasks), workers)
+    if executor is not None:
+        cleaned = list(executor.map(_clean_shard, tasks))
+    elif workers == 1:
+        cleaned = [_clean_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cleaned = list(pool.map(_clean_shard, tasks))
+    result = pd.concat(cleaned, ignore_index=True)
+    return compact_frame(result) if compact else result
@@ -0,0 +1,67 @@
+from vaccdash.aggregates import source_distribution, vaccine_totals
+from vaccdash.charts import FIGSIZES, draw_daily_vaccinations, draw_source_distribution, draw_vaccine_split
+from vaccdash.connection import get_pool
+from vaccdash import timeseries
+
+# matplotlib.pyplot is imported inside each plot function: it is slow to
+# import and selects a GUI backend, which headless workers never need.
+
+# Line charts are downsampled to at most this many points, so drawing cost
+# depends on the chart rather than on the length of the date range.
+MAX_POINTS = 1000
+
+
+def plot_source_distribution(db_path):
+    """
+    Creates a pie chart showing the distribution of data sources in the vaccinations table.
+    """
+    import matplotlib.pyplot as plt
+
+    with get_pool(db_path).connection(read_only=True) as conn:
+        df = source_distribution(conn)
+
+    fig, ax = plt.subplots(figsize=FIGSIZES["source_distribution"])
+    draw_source_distribution(ax, df)
+    fig.tight_layout()
+    plt.show()
+
+
+def plot_daily_vaccinations(db_path, country, start_date, end_date, period="day", window=None,
+                            max_points=MAX_POINTS):
+    """
+    Plots daily vaccinations for a given country over a specified date range.
+    period="week" or "month" plots period totals instead, window plots a
+    rolling mean over that many days, and lines longer than max_points
+    points are downsampled (None keeps every point). Missing days show as
+    gaps either way.
+    """
+    import matplotlib.pyplot as plt
+
+    with get_pool(db_path).connection(read_only=True) as conn:
+        series = timeseries.series(conn, country, start_date, end_date, period=period, window=window,
+                                   max_points=max_points)
+
+    fig, ax = plt.subplots(figsize=FIGSIZES["daily_vaccinations"])
+    draw_daily_vaccinations(ax, series, country, start_date, end_date)
+    fig.tight_layout()
+    plt.show()
+
+
+def plot_vaccine_split(db_path):
+    """
+    Creates a pie chart showing the split of vaccinations by vaccine type,
+    with all labels and percentages in the legend.
+    """
+    import matplotlib.pyplot as plt
+
+    with get_pool(db_path).connection(read_only=True) as conn:
+        vaccine_counts = vaccine_totals(conn)
+
+    if vaccine_counts.empty:
+        print("No split vaccine columns found.")
+        return
+
+    fig, ax = plt.subplots(figsize=FIGSIZES["vaccine_split"])
+    draw_vaccine_split(ax, vaccine_counts)
+    fig.tight_layout()
+    plt.show()
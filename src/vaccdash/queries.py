@@ -0,0 +1,222 @@
+import numpy as np
+
+from vaccdash.array_fetch import column_types, fetch_arrays, iter_arrays, select_list
+from vaccdash.instrumentation import CsvSink, default_recorder, instrumented
+from vaccdash.query_cache import result_cache
+from vaccdash.schema import day_number, table_columns
+
+# pandas and the cleaning code behind vaccine_usage are imported on first
+# use, so that importing the query functions stays cheap.
+
+# Timing and SQL of every decorated query call, kept in a bounded ring buffer.
+# Nothing is written to disk unless export_query_log_to_csv() is called.
+query_recorder = default_recorder
+log_query_time = instrumented(query_recorder)
+
+
+def export_query_log_to_csv(filename="query_log.csv"):
+    query_recorder.export(CsvSink(filename))
+
+
+# Range predicates use the integer date_day so that the (iso_code, date_day)
+# and (country, date_day) indexes serve both the filter and the ordering.
+# {columns} is every stored column, leaving out the generated date_day.
+# Results are memoized in result_cache until the next write to vaccinations;
+# the cache sits outside the instrumentation, so hits are recorded as cached
+# without paying for a traced call.
+QUERY_COUNTRY_BY_ISO_SQL = """
+    SELECT {columns} FROM vaccinations
+    WHERE iso_code = ? AND date_day BETWEEN ? AND ?
+    ORDER BY date_day
+    """
+
+QUERY_COUNTRY_SQL = """
+    SELECT {columns} FROM vaccinations
+    WHERE country = ? AND date_day BETWEEN ? AND ?
+    ORDER BY date_day
+    """
+
+
+def stored_columns(conn, alias=None) -> str:
+    """
+    Select list of the stored vaccinations columns (PRAGMA table_info does
+    not list the generated date_day).
+    """
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(f'{prefix}"{name}"' for name, _ in table_columns(conn, "vaccinations"))
+
+
+cached_query = result_cache.memoize(query_recorder)
+
+
+def _read_sql(conn, sql, params):
+    import pandas as pd
+
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+@cached_query
+@log_query_time
+def query_country_by_ISO(conn, iso_code, start_date, end_date):
+    sql = QUERY_COUNTRY_BY_ISO_SQL.format(columns=stored_columns(conn))
+    return _read_sql(conn, sql, [iso_code, day_number(start_date), day_number(end_date, end=True)])
+
+
+@cached_query
+@log_query_time
+def query_country(conn, country, start_date, end_date):
+    sql = QUERY_COUNTRY_SQL.format(columns=stored_columns(conn))
+    return _read_sql(conn, sql, [country, day_number(start_date), day_number(end_date, end=True)])
+
+
+# Array variants skip pandas: only the requested columns are selected and
+# the cursor rows are converted straight to typed NumPy arrays.
+QUERY_ARRAYS_SQL = """
+    SELECT {columns} FROM vaccinations
+    WHERE {key} = ? AND date_day BETWEEN ? AND ?
+    ORDER BY date_day
+    """
+
+
+def _array_query(conn, key, value, start_date, end_date, columns):
+    types = column_types(conn, columns)
+    sql = QUERY_ARRAYS_SQL.format(columns=select_list(types), key=key)
+    return sql, [value, day_number(start_date), day_number(end_date, end=True)], types
+
+
+@log_query_time
+def query_country_arrays(conn, country, start_date, end_date, columns=None):
+    """
+    Same rows as query_country as a dict of column name -> NumPy array,
+    limited to `columns` (all columns by default). Numbers are float64 with
+    NaN for missing values and 'date' is datetime64[D].
+    """
+    return fetch_arrays(conn, *_array_query(conn, "country", country, start_date, end_date, columns))
+
+
+@log_query_time
+def query_country_by_ISO_arrays(conn, iso_code, start_date, end_date, columns=None):
+    """
+    ISO-code equivalent of query_country_arrays.
+    """
+    return fetch_arrays(conn, *_array_query(conn, "iso_code", iso_code, start_date, end_date, columns))
+
+
+def iter_country_arrays(conn, country, start_date, end_date, columns=None, batch_size=10_000):
+    """
+    Stream query_country_arrays in dicts of at most batch_size rows.
+    """
+    sql, params, types = _array_query(conn, "country", country, start_date, end_date, columns)
+    return iter_arrays(conn, sql, params, types, batch_size=batch_size)
+
+
+# Batch variants fetch every requested series in one statement, cached like
+# the single queries. Up to BATCH_IN_LIMIT keys are bound as an IN list;
+# longer lists are loaded into a temporary table and joined.
+BATCH_IN_LIMIT = 250
+
+QUERY_BATCH_IN_SQL = """
+    SELECT {columns} FROM vaccinations
+    WHERE {key} IN ({placeholders}) AND date_day BETWEEN ? AND ?
+    ORDER BY {key}, date_day
+    """
+
+QUERY_BATCH_JOIN_SQL = """
+    SELECT {columns} FROM temp.batch_keys AS k
+    JOIN vaccinations AS v ON v.{key} = k.key
+    WHERE v.date_day BETWEEN ? AND ?
+    ORDER BY v.{key}, v.date_day
+    """
+
+
+@cached_query
+@log_query_time
+def fetch_batch(conn, key, values, start_date, end_date):
+    """
+    Records whose `key` column ("country" or "iso_code") is one of `values`,
+    between two dates, as one long frame ordered by key then date.
+    """
+    if key not in ("country", "iso_code"):
+        raise ValueError("key must be 'country' or 'iso_code'")
+    values = list(dict.fromkeys(values))
+    days = [day_number(start_date), day_number(end_date, end=True)]
+    if len(values) <= BATCH_IN_LIMIT:
+        sql = QUERY_BATCH_IN_SQL.format(columns=stored_columns(conn), key=key,
+                                        placeholders=", ".join("?" * len(values)))
+        return _read_sql(conn, sql, values + days)
+
+    started = not conn.in_transaction
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_keys (key TEXT PRIMARY KEY)")
+    try:
+        conn.executemany("INSERT INTO temp.batch_keys (key) VALUES (?)", [(value,) for value in values])
+        sql = QUERY_BATCH_JOIN_SQL.format(columns=stored_columns(conn, alias="v"), key=key)
+        return _read_sql(conn, sql, days)
+    finally:
+        conn.execute("DELETE FROM temp.batch_keys")
+        if started and conn.in_transaction:
+            conn.commit()
+
+
+def split_by_key(frame, key, values):
+    """
+    Split a long batch result sorted by `key` into one frame per requested
+    value, in request order. The parts are slices of the long frame, so no
+    row data is copied; values with no rows get an empty frame.
+    """
+    keys = frame[key].to_numpy()
+    bounds = {}
+    if len(keys):
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+        bounds = {keys[a]: (a, b) for a, b in zip(starts, ends)}
+    return {
+        value: frame.iloc[slice(*bounds.get(value, (0, 0)))].reset_index(drop=True)
+        for value in dict.fromkeys(values)
+    }
+
+
+def query_countries(conn, countries, start_date, end_date, as_dict=False):
+    """
+    Records for several countries between two dates in one query, as a long
+    frame ordered by country then date, or with as_dict=True a dict of
+    per-country frames equal to what query_country returns.
+    """
+    frame = fetch_batch(conn, "country", countries, start_date, end_date)
+    return split_by_key(frame, "country", countries) if as_dict else frame
+
+
+def query_countries_by_ISO(conn, iso_codes, start_date, end_date, as_dict=False):
+    """
+    ISO-code equivalent of query_countries.
+    """
+    frame = fetch_batch(conn, "iso_code", iso_codes, start_date, end_date)
+    return split_by_key(frame, "iso_code", iso_codes) if as_dict else frame
+
+
+@log_query_time
+def count_countries_using_vaccine(conn, vaccine_name):
+    """
+    Returns the number of distinct countries that use the specified vaccine.
+    Matches whole manufacturer names through the vaccine_usage index.
+    """
+    from vaccdash import vaccine_usage
+
+    return vaccine_usage.count_countries(conn, vaccine_name)
+
+@log_query_time
+def countries_using_vaccine(conn, vaccine_name):
+    """
+    Returns the sorted list of countries that use the specified vaccine.
+    """
+    from vaccdash import vaccine_usage
+
+    return vaccine_usage.countries(conn, vaccine_name)
+
+@log_query_time
+def list_vaccines(conn):
+    """
+    Returns the sorted list of vaccine manufacturers in the database.
+    """
+    from vaccdash import vaccine_usage
+
+    return vaccine_usage.vaccines(conn)
@@ -0,0 +1,158 @@
+import functools
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from vaccdash.instrumentation import make_record
+from vaccdash.schema import data_state
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Collapse whitespace so that the same query written with different
+    indentation shares a cache entry.
+    """
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def frame_bytes(frame) -> int:
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def database_identity(conn):
+    """
+    Identify the database a connection points at: its file path, or the
+    connection itself for in-memory databases.
+    """
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return path or ("memory", id(conn))
+    return ("memory", id(conn))
+
+
+class QueryResultCache:
+    """
+    LRU/TTL cache of query results keyed on (database, normalized SQL,
+    parameters).
+
+    Each entry remembers the database data_state (random database id and
+    data_version) it was read at; once any write to vaccinations bumps the
+    version (e.g. load_csv_to_sqlite appending rows), or the database is
+    rebuilt at the same path, the entry is treated as a miss and dropped.
+    The cache is bounded both by entry count and by the in-memory size of
+    the cached frames. Databases without a data_state are never cached.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _drop(self, key, reason):
+        _, _, _, size = self._entries.pop(key)
+        self._bytes -= size
+        self._stats[reason] += 1
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_version, stored_at, _ = entry
+                if entry_version != version:
+                    self._drop(key, "invalidations")
+                elif self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                    self._drop(key, "expirations")
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, version, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key, "invalidations")
+            self._entries[key] = (value, version, time.monotonic(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)), "evictions")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+    def read_sql_query(self, conn, sql, params=()):
+        """
+        pd.read_sql_query with caching, keyed on the normalized SQL. Callers
+        get a shallow copy, so adding or replacing columns on the result does
+        not affect the cached frame.
+        """
+        import pandas as pd
+
+        version = data_state(conn) if self.enabled else None
+        if version is None:
+            return pd.read_sql_query(sql, conn, params=list(params))
+
+        key = (database_identity(conn), version[0], normalize_sql(sql), tuple(params))
+        result = self.get(key, version)
+        if result is None:
+            result = pd.read_sql_query(sql, conn, params=list(params))
+            self.put(key, version, result, frame_bytes(result))
+        return result.copy(deep=False)
+
+    def memoize(self, recorder=None):
+        """
+        Decorator caching a query function that takes a connection first
+        and returns a DataFrame, keyed on (database, function, arguments).
+
+        Apply it outside @instrumented: a hit then skips the instrumented
+        call altogether, and the cache's own statements (data_state,
+        database_list) never appear in a record's SQL. Hits are recorded in
+        `recorder` with cached=True, no SQL and their own latency.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(conn, *args, **kwargs):
+                start = time.perf_counter_ns()
+                version = data_state(conn) if self.enabled else None
+                if version is None:
+                    return func(conn, *args, **kwargs)
+                key = (database_identity(conn), version[0], func.__name__, _hashable(args),
+                       _hashable(sorted(kwargs.items())))
+                result = self.get(key, version)
+                if result is None:
+                    result = func(conn, *args, **kwargs)
+                    self.put(key, version, result, frame_bytes(result))
+                    return result.copy(deep=False)
+                result = result.copy(deep=False)
+                if recorder is not None:
+                    elapsed = time.perf_counter_ns() - start
+                    recorder.record(make_record(func.__name__, (), args, kwargs, result, elapsed, cached=True))
+                return result
+            return wrapper
+        return decorator
+
+
+result_cache = QueryResultCache()
@@ -0,0 +1,230 @@
+import pandas as pd
+
+from vaccdash.schema import refresh_if_dirty
+
+EPOCH = pd.Timestamp("1970-01-01")
+
+# Monday-based weeks (1970-01-01 was a Thursday) and calendar months, both
+# identified by the day number of their first day.
+PERIOD_START_SQL = {
+    "week": "date_day - ((date_day + 3) % 7)",
+    "month": "date_day - CAST(strftime('%d', date) AS INTEGER) + 1",
+}
+
+FULL_SOURCE_COUNTS_SQL = """
+    SELECT IFNULL(source_name, '') AS source_name, COUNT(*) AS count
+    FROM vaccinations GROUP BY source_name
+    """
+
+FULL_PERIODS_SQL = """
+    SELECT ? AS period, iso_code, {start} AS period_start,
+           IFNULL(SUM(daily_vaccinations), 0) AS daily_vaccinations,
+           IFNULL(SUM(daily_vaccinations_raw), 0) AS daily_vaccinations_raw
+    FROM vaccinations
+    WHERE iso_code IS NOT NULL AND date_day IS NOT NULL
+    GROUP BY iso_code, period_start
+    """
+
+# Served by the (iso_code, date_day) index, newest first, for one country
+LATEST_SQL = """
+    SELECT :iso,
+        (SELECT country FROM vaccinations WHERE iso_code = :iso ORDER BY date_day DESC LIMIT 1),
+        (SELECT date FROM vaccinations WHERE iso_code = :iso ORDER BY date_day DESC LIMIT 1),
+        (SELECT total_vaccinations FROM vaccinations
+         WHERE iso_code = :iso AND total_vaccinations IS NOT NULL ORDER BY date_day DESC LIMIT 1),
+        (SELECT people_vaccinated FROM vaccinations
+         WHERE iso_code = :iso AND people_vaccinated IS NOT NULL ORDER BY date_day DESC LIMIT 1),
+        (SELECT people_fully_vaccinated FROM vaccinations
+         WHERE iso_code = :iso AND people_fully_vaccinated IS NOT NULL ORDER BY date_day DESC LIMIT 1)
+    """
+
+UPSERT_SOURCE_SQL = """
+    INSERT INTO rollup_source_counts (source_name, count) VALUES (?, ?)
+    ON CONFLICT (source_name) DO UPDATE SET count = count + excluded.count
+    """
+
+UPSERT_PERIOD_SQL = """
+    INSERT INTO rollup_country_periods
+        (period, iso_code, period_start, daily_vaccinations, daily_vaccinations_raw)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (period, iso_code, period_start) DO UPDATE SET
+        daily_vaccinations = daily_vaccinations + excluded.daily_vaccinations,
+        daily_vaccinations_raw = daily_vaccinations_raw + excluded.daily_vaccinations_raw
+    """
+
+REPLACE_LATEST_SQL = "INSERT OR REPLACE INTO rollup_country_latest VALUES (?, ?, ?, ?, ?, ?)"
+
+LATEST_COLUMNS = ["iso_code", "country", "date", "total_vaccinations", "people_vaccinated", "people_fully_vaccinated"]
+PERIOD_COLUMNS = ["period", "iso_code", "period_start", "daily_vaccinations", "daily_vaccinations_raw"]
+
+
+def _chunk_periods(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per (period, iso_code, period_start) sums of an ingested chunk, with the
+    period starts derived the same way as PERIOD_START_SQL.
+    """
+    dates = pd.to_datetime(frame["date"], format="ISO8601", errors="coerce")
+    day = (dates - EPOCH).dt.days
+    starts = {
+        "week": day - ((day + 3) % 7),
+        "month": day - dates.dt.day + 1,
+    }
+    parts = []
+    for period, start in starts.items():
+        part = pd.DataFrame({
+            "period": period,
+            "iso_code": frame["iso_code"],
+            "period_start": start,
+            "daily_vaccinations": frame["daily_vaccinations"],
+            "daily_vaccinations_raw": frame["daily_vaccinations_raw"],
+        }).dropna(subset=["iso_code", "period_start"])
+        parts.append(part.groupby(["period", "iso_code", "period_start"], as_index=False).sum(min_count=0))
+    sums = pd.concat(parts, ignore_index=True)
+    sums["period_start"] = sums["period_start"].astype("int64")
+    return sums
+
+
+def _plain(values):
+    """
+    Convert numpy scalars to Python numbers, keeping integral sums as ints.
+    """
+    return [
+        int(value) if isinstance(value, float) and value.is_integer() else
+        value.item() if hasattr(value, "item") else value
+        for value in values
+    ]
+
+
+def _refresh_latest(conn, iso_codes) -> None:
+    rows = [conn.execute(LATEST_SQL, {"iso": iso}).fetchone() for iso in iso_codes]
+    conn.executemany(REPLACE_LATEST_SQL, rows)
+
+
+def update_rollups(conn, chunk: pd.DataFrame) -> None:
+    """
+    Apply a freshly ingested chunk to the rollups, touching only the
+    sources, countries and periods it contains.
+
+    Source counts and period sums are updated by adding the chunk's own
+    totals; latest totals are re-read for the affected countries through
+    the (iso_code, date_day) index. Ingestion only passes the rows that
+    were actually inserted, so the deltas are exact.
+    """
+    frame = chunk.reindex(columns=["iso_code", "country", "date", "source_name",
+                                   "daily_vaccinations", "daily_vaccinations_raw"])
+
+    sources = frame["source_name"].fillna("").value_counts(sort=False)
+    conn.executemany(UPSERT_SOURCE_SQL, [(name, int(count)) for name, count in sources.items()])
+
+    periods = _chunk_periods(frame)
+    conn.executemany(UPSERT_PERIOD_SQL, [_plain(row) for row in periods.itertuples(index=False, name=None)])
+
+    _refresh_latest(conn, frame["iso_code"].dropna().unique().tolist())
+
+
+def _full_source_counts(conn) -> pd.DataFrame:
+    return pd.read_sql_query(FULL_SOURCE_COUNTS_SQL, conn)
+
+
+def _full_periods(conn) -> pd.DataFrame:
+    parts = [
+        pd.read_sql_query(FULL_PERIODS_SQL.format(start=start), conn, params=[period])
+        for period, start in PERIOD_START_SQL.items()
+    ]
+    return pd.concat(parts, ignore_index=True)
+
+
+def _full_latest(conn) -> pd.DataFrame:
+    iso_codes = [row[0] for row in conn.execute(
+        "SELECT DISTINCT iso_code FROM vaccinations WHERE iso_code IS NOT NULL ORDER BY iso_code"
+    )]
+    rows = [conn.execute(LATEST_SQL, {"iso": iso}).fetchone() for iso in iso_codes]
+    return pd.DataFrame(rows, columns=LATEST_COLUMNS)
+
+
+def rebuild_rollups(conn) -> None:
+    """
+    Recompute every rollup table from the vaccinations table.
+    """
+    for table in ("rollup_source_counts", "rollup_country_periods", "rollup_country_latest"):
+        conn.execute(f"DELETE FROM {table}")
+    conn.executemany(UPSERT_SOURCE_SQL, [_plain(row) for row in _full_source_counts(conn).itertuples(index=False, name=None)])
+    conn.executemany(UPSERT_PERIOD_SQL, [_plain(row) for row in _full_periods(conn).itertuples(index=False, name=None)])
+    _refresh_latest(conn, _full_latest(conn)["iso_code"].tolist())
+
+
+def _fresh(conn) -> bool:
+    return refresh_if_dirty(conn, "rollups", rebuild_rollups)
+
+
+def source_counts(conn) -> pd.DataFrame:
+    """
+    Number of records per source_name, ordered by source_name.
+    """
+    if _fresh(conn):
+        counts = pd.read_sql_query("SELECT source_name, count FROM rollup_source_counts ORDER BY source_name", conn)
+    else:
+        counts = _full_source_counts(conn)
+    counts["source_name"] = counts["source_name"].replace("", None)
+    return counts
+
+
+def latest_totals(conn) -> pd.DataFrame:
+    """
+    Most recent non-missing cumulative totals for every country.
+    """
+    if not _fresh(conn):
+        return _full_latest(conn)
+    return pd.read_sql_query(f"SELECT {', '.join(LATEST_COLUMNS)} FROM rollup_country_latest ORDER BY iso_code", conn)
+
+
+def period_totals(conn, period="week", iso_code=None) -> pd.DataFrame:
+    """
+    Daily vaccinations summed per country and week or month. period_start
+    is the day number of the first day of the period.
+    """
+    if period not in PERIOD_START_SQL:
+        raise ValueError(f"period must be one of {sorted(PERIOD_START_SQL)}")
+    if not _fresh(conn):
+        sums = _full_periods(conn)
+        sums = sums[sums["period"] == period]
+        if iso_code is not None:
+            sums = sums[sums["iso_code"] == iso_code]
+        return sums.sort_values(["iso_code", "period_start"]).reset_index(drop=True)
+    query = f"SELECT {', '.join(PERIOD_COLUMNS)} FROM rollup_country_periods WHERE period = ?"
+    params = [period]
+    if iso_code is not None:
+        query += " AND iso_code = ?"
+        params.append(iso_code)
+    return pd.read_sql_query(query + " ORDER BY iso_code, period_start", conn, params=params)
+
+
+def check_rollups(conn) -> list:
+    """
+    Compare every rollup table with a full recomputation from vaccinations.
+    Returns a list of human-readable mismatches; empty means consistent.
+    """
+    checks = [
+        ("rollup_source_counts", ["source_name"], _full_source_counts(conn),
+         "SELECT source_name, count FROM rollup_source_counts"),
+        ("rollup_country_periods", ["period", "iso_code", "period_start"], _full_periods(conn),
+         f"SELECT {', '.join(PERIOD_COLUMNS)} FROM rollup_country_periods"),
+        ("rollup_country_latest", ["iso_code"], _full_latest(conn),
+         f"SELECT {', '.join(LATEST_COLUMNS)} FROM rollup_country_latest"),
+    ]
+    problems = []
+    for table, keys, expected, query in checks:
+        stored = pd.read_sql_query(query, conn)
+        merged = expected.merge(stored, on=keys, how="outer", suffixes=("_expected", "_stored"), indicator="presence")
+        for row in merged.itertuples(index=False):
+            row = row._asdict()
+            key = tuple(row[k] for k in keys)
+            if row["presence"] != "both":
+                where = "missing from" if row["presence"] == "left_only" else "unexpected in"
+                problems.append(f"{table}: {key} {where} rollup")
+                continue
+            for col in expected.columns.difference(keys):
+                want, have = row[f"{col}_expected"], row[f"{col}_stored"]
+                if not (want == have or (pd.isna(want) and pd.isna(have))):
+                    problems.append(f"{table}: {key} {col} is {have!r}, expected {want!r}")
+    return problems
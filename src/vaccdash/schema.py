@@ -0,0 +1,405 @@
+import calendar
+import datetime
+import logging
+import re
+import sqlite3
+
+logger = logging.getLogger("schema")
+
+# Bumped whenever a migration is appended to MIGRATIONS; stored in PRAGMA user_version
+SCHEMA_VERSION = 6
+
+VACCINATION_COLUMNS = [
+    ("iso_code", "TEXT"),
+    ("country", "TEXT"),
+    ("location", "TEXT"),
+    ("date", "TEXT"),
+    ("total_vaccinations", "INTEGER"),
+    ("people_vaccinated", "INTEGER"),
+    ("people_fully_vaccinated", "INTEGER"),
+    ("daily_vaccinations_raw", "INTEGER"),
+    ("daily_vaccinations", "INTEGER"),
+    ("total_vaccinations_per_hundred", "REAL"),
+    ("people_vaccinated_per_hundred", "REAL"),
+    ("people_fully_vaccinated_per_hundred", "REAL"),
+    ("daily_vaccinations_per_million", "REAL"),
+    ("vaccines", "TEXT"),
+    ("source_name", "TEXT"),
+    ("source_website", "TEXT"),
+]
+
+# Days since 1970-01-01, derived from the ISO date text so that every insert
+# path (including plain DataFrame.to_sql) gets a sortable integer key.
+DATE_DAY_EXPR = "CAST(julianday(date) - 2440587.5 AS INTEGER)"
+
+INDEXES = {
+    "idx_vaccinations_iso_day": "vaccinations (iso_code, date_day)",
+    "idx_vaccinations_country_day": "vaccinations (country, date_day)",
+    # Covers the per-source GROUP BY used for the source distribution chart
+    "idx_vaccinations_source": "vaccinations (source_name)",
+}
+
+EPOCH = datetime.date(1970, 1, 1)
+
+# YYYY, YYYY-MM or YYYY-MM-DD, optionally followed by a time of day
+ISO_DATE = re.compile(r"(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?(?:[T ].*)?")
+
+
+def day_number(value, end=False) -> int:
+    """
+    Convert an ISO date string, date or datetime to the integer day number
+    stored in vaccinations.date_day.
+
+    A partial date ("2021" or "2021-03") stands for its first day, or with
+    end=True for its last, so that a range bound covers the whole year or
+    month. Other strings raise ValueError.
+    """
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    elif not isinstance(value, datetime.date):
+        match = ISO_DATE.fullmatch(str(value).strip())
+        try:
+            if match is None:
+                raise ValueError("not an ISO date")
+            year, month, day = match.groups()
+            year = int(year)
+            month = int(month) if month else (12 if end else 1)
+            if day:
+                day = int(day)
+            else:
+                day = calendar.monthrange(year, month)[1] if end else 1
+            value = datetime.date(year, month, day)
+        except ValueError as error:
+            raise ValueError(f"Invalid date {value!r}: expected YYYY-MM-DD, YYYY-MM or YYYY") from error
+    return (value - EPOCH).days
+
+
+def table_columns(conn, table: str) -> list:
+    """
+    Return (name, declared type) for the ordinary columns of a table.
+    """
+    return [(row[1], row[2]) for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def is_without_rowid(conn, table: str) -> bool:
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row is not None and row[0].rstrip().upper().endswith("WITHOUT ROWID")
+
+
+def table_exists(conn, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def vaccinations_ddl(columns=None, without_rowid=False, table="vaccinations") -> str:
+    """
+    CREATE TABLE statement for the vaccinations table.
+
+    Extra columns (e.g. vaccine_* flags written by the cleaner) can be passed
+    in columns; they are kept after the standard ones. (iso_code, date) is
+    unique, mirroring the de-duplication done by clean_vaccination_data, and
+    becomes the primary key when the table is stored WITHOUT ROWID. A
+    primary key cannot hold NULL, so a WITHOUT ROWID table cannot store
+    rows missing iso_code or date; ingestion skips them with a warning.
+    """
+    columns = columns or VACCINATION_COLUMNS
+    lines = [f'    "{name}" {col_type}'.rstrip() for name, col_type in columns]
+    lines.append(f"    date_day INTEGER GENERATED ALWAYS AS ({DATE_DAY_EXPR}) VIRTUAL")
+    if without_rowid:
+        lines.append("    PRIMARY KEY (iso_code, date)")
+    else:
+        lines.append("    UNIQUE (iso_code, date)")
+    suffix = " WITHOUT ROWID" if without_rowid else ""
+    body = ",\n".join(lines)
+    return f'CREATE TABLE IF NOT EXISTS "{table}" (\n{body}\n){suffix}'
+
+
+def create_indexes(conn) -> None:
+    for name, target in INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def _migrate_v1(conn, without_rowid):
+    """
+    Typed, indexed vaccinations table. An existing unindexed table is
+    rebuilt in place; rows are copied in insertion order with INSERT OR
+    IGNORE so the first of any duplicate (iso_code, date) rows is kept.
+    """
+    if not table_exists(conn, "vaccinations"):
+        conn.execute(vaccinations_ddl(without_rowid=without_rowid))
+        create_indexes(conn)
+        return
+
+    columns = table_columns(conn, "vaccinations")
+    names = [name for name, _ in columns]
+    missing = [col for col in VACCINATION_COLUMNS if col[0] not in names]
+    logger.info("Migrating existing vaccinations table to the indexed schema")
+    conn.execute("ALTER TABLE vaccinations RENAME TO vaccinations_old")
+    conn.execute(vaccinations_ddl(columns + missing, without_rowid=without_rowid))
+    col_list = ", ".join(f'"{name}"' for name in names)
+    conn.execute(
+        f"INSERT OR IGNORE INTO vaccinations ({col_list}) "
+        f"SELECT {col_list} FROM vaccinations_old ORDER BY rowid"
+    )
+    conn.execute("DROP TABLE vaccinations_old")
+    create_indexes(conn)
+
+
+# Any write to vaccinations bumps the data version used to invalidate cached
+# results. Writes that do not go through the ingestion path also leave every
+# derived table dirty; it is rebuilt from vaccinations on next use. The
+# ingestion path maintains both itself, once per chunk, and sets the meta
+# bulk_load flag for the duration of the insert so that the triggers skip
+# its rows without being dropped (which would change the schema and
+# invalidate every prepared statement).
+DERIVED_TRIGGERS = {
+    "vaccinations_insert_marks_derived": "AFTER INSERT ON vaccinations",
+    "vaccinations_update_marks_derived": "AFTER UPDATE ON vaccinations",
+    "vaccinations_delete_marks_derived": "AFTER DELETE ON vaccinations",
+}
+
+
+TRIGGER_WHEN = "(SELECT value FROM meta WHERE key = 'bulk_load') IS NOT 1"
+
+TRIGGER_BODY = (
+    "UPDATE derived_state SET dirty = 1 WHERE dirty = 0; "
+    "UPDATE meta SET value = value + 1 WHERE key = 'data_version';"
+)
+
+
+def create_derived_triggers(conn) -> None:
+    for name, event in DERIVED_TRIGGERS.items():
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {name} {event} WHEN {TRIGGER_WHEN} BEGIN {TRIGGER_BODY} END"
+        )
+
+
+def drop_derived_triggers(conn) -> None:
+    for name in DERIVED_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def register_derived_table(conn, name: str) -> None:
+    """
+    Track a table derived from vaccinations. It starts clean while
+    vaccinations is empty, and dirty otherwise so that it gets built from
+    what is already stored (see vaccdash.ingestion.refresh_derived).
+    """
+    conn.execute(
+        "INSERT OR IGNORE INTO derived_state (name, dirty) "
+        "VALUES (?, EXISTS (SELECT 1 FROM vaccinations))",
+        (name,),
+    )
+
+
+def dirty_derived_tables(conn) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM derived_state WHERE dirty = 1")}
+
+
+def mark_derived_clean(conn, names) -> None:
+    conn.executemany("UPDATE derived_state SET dirty = 0 WHERE name = ?", [(name,) for name in names])
+
+
+def mark_derived_dirty(conn) -> None:
+    conn.execute("UPDATE derived_state SET dirty = 1 WHERE dirty = 0")
+
+
+def refresh_if_dirty(conn, name: str, rebuild) -> bool:
+    """
+    Rebuild a derived table with rebuild(conn) if it is marked dirty.
+    Returns False when it is stale but the connection is read-only, in
+    which case callers should answer from vaccinations directly.
+
+    The rebuild runs in a savepoint: on its own it is committed, but inside
+    a transaction the caller has open it becomes part of that transaction
+    and is committed or rolled back with it.
+    """
+    if name not in dirty_derived_tables(conn):
+        return True
+    logger.info("Rebuilding %s from the vaccinations table", name)
+    conn.execute("SAVEPOINT refresh_derived")
+    try:
+        rebuild(conn)
+        mark_derived_clean(conn, [name])
+    except sqlite3.OperationalError as exc:
+        conn.execute("ROLLBACK TO refresh_derived")
+        conn.execute("RELEASE refresh_derived")
+        if "readonly" not in str(exc):
+            raise
+        logger.warning("%s is stale and the connection is read-only; reading vaccinations", name)
+        return False
+    except BaseException:
+        conn.execute("ROLLBACK TO refresh_derived")
+        conn.execute("RELEASE refresh_derived")
+        raise
+    conn.execute("RELEASE refresh_derived")
+    return True
+
+
+def _migrate_v2(conn, without_rowid):
+    """
+    Normalized vaccine_usage(country, iso_code, vaccine) side table, one row
+    per distinct manufacturer used by a country, plus the dirty-flag
+    bookkeeping shared by all derived tables.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS derived_state (
+            name TEXT PRIMARY KEY,
+            dirty INTEGER NOT NULL DEFAULT 1
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS vaccine_usage (
+            country TEXT,
+            iso_code TEXT,
+            vaccine TEXT NOT NULL,
+            UNIQUE (vaccine, country, iso_code)
+        )
+        """
+    )
+    create_derived_triggers(conn)
+    register_derived_table(conn, "vaccine_usage")
+
+
+def data_version(conn):
+    """
+    Counter bumped by every write to vaccinations, or None if the database
+    predates it.
+    """
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+DATA_STATE_SQL = (
+    "SELECT (SELECT value FROM meta WHERE key = 'database_id'), "
+    "(SELECT value FROM meta WHERE key = 'data_version')"
+)
+
+
+def data_state(conn):
+    """
+    (database_id, data_version) read in one statement, or None if the
+    database predates either. The data version alone restarts at 0 in every
+    new database; together with the random id it tells a database rebuilt
+    at the same path apart from the one it replaced.
+    """
+    try:
+        row = conn.execute(DATA_STATE_SQL).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return None if None in row else row
+
+
+def bump_data_version(conn) -> None:
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+
+
+def set_bulk_load(conn, active: bool) -> None:
+    """
+    Turn the derived-table triggers off (active=True) or back on. Only set
+    inside a transaction that clears it again before committing.
+    """
+    conn.execute("UPDATE meta SET value = ? WHERE key = 'bulk_load'", (int(active),))
+
+
+def _migrate_v3(conn, without_rowid):
+    """
+    meta(key, value) table holding the data_version counter, incremented by
+    the vaccinations triggers.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)")
+    drop_derived_triggers(conn)
+    create_derived_triggers(conn)
+
+
+def _migrate_v4(conn, without_rowid):
+    """
+    Rollup tables maintained incrementally on ingest (see vaccdash.rollups).
+    Country rollups are keyed by iso_code; a missing source_name is stored
+    as '' so that it can take part in the primary key.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rollup_source_counts (
+            source_name TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rollup_country_latest (
+            iso_code TEXT PRIMARY KEY,
+            country TEXT,
+            date TEXT,
+            total_vaccinations INTEGER,
+            people_vaccinated INTEGER,
+            people_fully_vaccinated INTEGER
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rollup_country_periods (
+            period TEXT NOT NULL,
+            iso_code TEXT NOT NULL,
+            period_start INTEGER NOT NULL,
+            daily_vaccinations INTEGER NOT NULL,
+            daily_vaccinations_raw INTEGER NOT NULL,
+            PRIMARY KEY (period, iso_code, period_start)
+        )
+        """
+    )
+    register_derived_table(conn, "rollups")
+
+
+def _migrate_v5(conn, without_rowid):
+    """
+    meta bulk_load flag, and derived-table triggers that do nothing while it
+    is set (see set_bulk_load).
+    """
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('bulk_load', 0)")
+    drop_derived_triggers(conn)
+    create_derived_triggers(conn)
+
+
+def _migrate_v6(conn, without_rowid):
+    """
+    Random meta database_id, set once when the database is created (or
+    first migrated), see data_state.
+    """
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('database_id', lower(hex(randomblob(16))))")
+
+
+MIGRATIONS = [_migrate_v1, _migrate_v2, _migrate_v3, _migrate_v4, _migrate_v5, _migrate_v6]
+
+
+def schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, without_rowid=False) -> int:
+    """
+    Bring a database up to SCHEMA_VERSION, creating it if empty.
+
+    Each pending migration runs in its own transaction together with the
+    user_version bump, so an interrupted migration can simply be re-run.
+    without_rowid only applies when the vaccinations table is (re)built.
+    Returns the resulting schema version.
+    """
+    version = schema_version(conn)
+    for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        with conn:
+            conn.execute("BEGIN")
+            step(conn, without_rowid)
+            conn.execute(f"PRAGMA user_version = {target}")
+    return schema_version(conn)
@@ -0,0 +1,303 @@
+import argparse
+import csv
+import email.utils
+import gzip
+import hashlib
+import io
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import numpy as np
+
+from vaccdash import queries, timeseries
+from vaccdash.aggregates import source_distribution
+from vaccdash.array_fetch import column_types
+from vaccdash.connection import ConnectionPool
+from vaccdash.export import export_sql
+from vaccdash.query_cache import QueryResultCache
+from vaccdash.schema import data_state
+
+logger = logging.getLogger("service")
+
+# Responses smaller than this are sent uncompressed
+MIN_GZIP_BYTES = 512
+
+# Data states whose first-seen time is remembered for Last-Modified
+MODIFIED_HISTORY = 64
+
+CONTENT_TYPES = {"json": "application/json", "csv": "text/csv; charset=utf-8"}
+
+
+def _floats(values) -> list:
+    return [None if math.isnan(value) else value for value in values.tolist()]
+
+
+def series_records(conn, country, params) -> list:
+    """
+    /series/<country>: timeseries.series as {"date", "value"} records.
+    """
+    points = timeseries.series(
+        conn, country, params["start"], params["end"],
+        column=params.get("column", "daily_vaccinations"),
+        period=params.get("period", "day"),
+        window=int(params["window"]) if "window" in params else None,
+        max_points=int(params.get("max_points", 1000)),
+        key=params.get("key", "country"),
+    )
+    dates = np.datetime_as_string(points["date"], unit="D").tolist()
+    return [{"date": date, "value": value} for date, value in zip(dates, _floats(points["value"]))]
+
+
+def country_records(conn, country, params) -> list:
+    """
+    /countries/<country>: the stored rows of one country, optionally
+    between two dates and limited to some columns.
+    """
+    columns = params["columns"].split(",") if "columns" in params else None
+    types = column_types(conn, columns)
+    sql, args = export_sql(params.get("key", "country"), [country], params.get("start"), params.get("end"),
+                           types, "csv")
+    names = list(types)
+    return [dict(zip(names, row)) for row in conn.execute(sql, args)]
+
+
+def vaccine_records(conn, name, params) -> list:
+    """
+    /vaccines: every manufacturer with its number of countries, or
+    /vaccines/<name>: the countries using one manufacturer.
+    """
+    if name is None:
+        return [{"vaccine": vaccine, "countries": queries.count_countries_using_vaccine(conn, vaccine)}
+                for vaccine in queries.list_vaccines(conn)]
+    return [{"country": country} for country in queries.countries_using_vaccine(conn, name)]
+
+
+def source_records(conn, name, params) -> list:
+    """
+    /sources: number of records per source_name.
+    """
+    counts = source_distribution(conn)
+    return [{"source_name": source, "count": int(count)}
+            for source, count in zip(counts["source_name"].tolist(), counts["count"].tolist())]
+
+
+# First path segment -> (handler, whether the second segment is required)
+ROUTES = {
+    "series": (series_records, True),
+    "countries": (country_records, True),
+    "vaccines": (vaccine_records, False),
+    "sources": (source_records, False),
+}
+
+
+def encode(records: list, fmt: str) -> bytes:
+    if fmt == "json":
+        return json.dumps(records, separators=(",", ":")).encode("utf-8")
+    text = io.StringIO()
+    if records:
+        writer = csv.DictWriter(text, fieldnames=list(records[0]), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(records)
+    return text.getvalue().encode("utf-8")
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """
+    Weak comparison, as If-None-Match requires: the gzip and identity
+    variants of a response share a validator.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    base = etag[:-1]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate in (etag, base + '-gzip"'):
+            return True
+    return False
+
+
+class DataService:
+    """
+    The dashboard queries behind HTTP-style requests, independent of any
+    server: handle() takes a path and request headers and returns the
+    status, response headers and body.
+
+    Responses are cached per request in a QueryResultCache and carry an
+    ETag and Last-Modified derived from the database data_state (random
+    database id and data_version), so that any write to vaccinations, or
+    a rebuild of the database, invalidates them. A matching
+    If-None-Match (or, without one, If-Modified-Since) is answered with
+    304 before any query runs. Clients sending Accept-Encoding: gzip get
+    compressed bodies, compressed once per cached response.
+    """
+
+    def __init__(self, db_path, workers=8, cache_entries=1024, cache_bytes=64 * 1024 * 1024):
+        self.pool = ConnectionPool(db_path, size=workers)
+        self.cache = QueryResultCache(max_entries=cache_entries, max_bytes=cache_bytes)
+        self.cache.enabled = cache_entries > 0
+        self._modified = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _last_modified(self, state) -> float:
+        # When this service first saw the data state; a restart only makes
+        # clients revalidate once. Only the latest states are remembered.
+        with self._lock:
+            modified = self._modified.setdefault(state, math.floor(time.time()))
+            self._modified.move_to_end(state)
+            while len(self._modified) > MODIFIED_HISTORY:
+                self._modified.popitem(last=False)
+            return modified
+
+    def _pool(self) -> ConnectionPool:
+        # A database deleted or rebuilt at the same path gets a new pool; the
+        # old one is left to requests still using it
+        with self._lock:
+            if self.pool.stale():
+                self.pool = ConnectionPool(self.pool.db_path, size=self.pool.size)
+            return self.pool
+
+    def handle(self, path: str, headers) -> tuple:
+        url = urlsplit(path)
+        segments = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        params = dict(parse_qsl(url.query))
+        fmt = params.pop("format", "json")
+        if not segments or segments[0] not in ROUTES or len(segments) > 2 or fmt not in CONTENT_TYPES:
+            return self._error(404, "Not found")
+        handler, needs_name = ROUTES[segments[0]]
+        name = segments[1] if len(segments) == 2 else None
+        if needs_name and name is None:
+            return self._error(404, "Not found")
+
+        with self._pool().connection(read_only=True) as conn:
+            state = data_state(conn)
+            key = (url.path, tuple(sorted(params.items())), fmt)
+            response = {"Content-Type": CONTENT_TYPES[fmt], "Vary": "Accept-Encoding"}
+            if state is not None:
+                database_id, version = state
+                key = (database_id, *key)
+                digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+                etag = f'"{database_id[:16]}-{version}-{digest}"'
+                modified = self._last_modified(state)
+                response["ETag"] = etag
+                response["Last-Modified"] = email.utils.formatdate(modified, usegmt=True)
+                response["Cache-Control"] = "no-cache"
+                if self._not_modified(headers, etag, modified):
+                    return 304, response, b""
+
+            entry = self.cache.get(key, state) if self.cache.enabled and state is not None else None
+            if entry is None:
+                try:
+                    body = encode(handler(conn, name, params), fmt)
+                except (KeyError, ValueError, TypeError) as error:
+                    return self._error(400, f"Bad request: {error}")
+                entry = {"body": body, "gzip": None}
+                if self.cache.enabled and state is not None:
+                    self.cache.put(key, state, entry, len(body))
+
+        body = entry["body"]
+        if len(body) >= MIN_GZIP_BYTES and "gzip" in headers.get("Accept-Encoding", ""):
+            if entry["gzip"] is None:
+                entry["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+            body = entry["gzip"]
+            response["Content-Encoding"] = "gzip"
+            if "ETag" in response:
+                response["ETag"] = response["ETag"][:-1] + '-gzip"'
+        return 200, response, body
+
+    @staticmethod
+    def _not_modified(headers, etag, modified) -> bool:
+        if_none_match = headers.get("If-None-Match")
+        if if_none_match is not None:
+            return _matches(if_none_match, etag)
+        since = headers.get("If-Modified-Since")
+        if since is None:
+            return False
+        try:
+            return email.utils.parsedate_to_datetime(since).timestamp() >= modified
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _error(status, message) -> tuple:
+        body = json.dumps({"error": message}).encode("utf-8")
+        return status, {"Content-Type": CONTENT_TYPES["json"]}, body
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive between requests. Headers and body
+    # are written separately, so without TCP_NODELAY each response with a
+    # body waits for the client's delayed ACK (~40ms).
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service = None
+
+    def _respond(self, send_body: bool) -> None:
+        try:
+            status, headers, body = self.service.handle(self.path, self.headers)
+        except Exception:
+            logger.exception("Failed to serve %s", self.path)
+            status, headers, body = DataService._error(500, "Internal server error")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def make_server(db_path, host="127.0.0.1", port=8050, **kwargs) -> ThreadingHTTPServer:
+    """
+    A ThreadingHTTPServer serving a DataService for db_path; port=0 picks
+    a free port (see server.server_address). Keyword arguments go to
+    DataService.
+    """
+    handler = type("DataRequestHandler", (RequestHandler,), {"service": DataService(db_path, **kwargs)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# python -m vaccdash.service DB [--host HOST] [--port PORT] [--workers N]
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m vaccdash.service", description="Serve dashboard data over HTTP.")
+    parser.add_argument("db", help="SQLite database")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=8, help="pooled read-only connections")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.db, args.host, args.port, workers=args.workers)
+    host, port = server.server_address[:2]
+    print(f"Serving {args.db} on http://{host}:{port}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
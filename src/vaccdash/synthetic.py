@@ -0,0 +1,136 @@
+import string
+
+import numpy as np
+import pandas as pd
+
+# Column order of the country_vaccinations.csv file the dashboard loads
+COLUMNS = [
+    "country", "iso_code", "date", "total_vaccinations", "people_vaccinated", "people_fully_vaccinated",
+    "daily_vaccinations_raw", "daily_vaccinations", "total_vaccinations_per_hundred",
+    "people_vaccinated_per_hundred", "people_fully_vaccinated_per_hundred", "daily_vaccinations_per_million",
+    "vaccines", "source_name", "source_website",
+]
+
+# Manufacturer -> relative share of countries using it
+MANUFACTURERS = {
+    "Pfizer/BioNTech": 0.35,
+    "Oxford/AstraZeneca": 0.25,
+    "Moderna": 0.15,
+    "Sinopharm/Beijing": 0.1,
+    "Johnson&Johnson": 0.07,
+    "Sputnik V": 0.05,
+    "Sinovac": 0.03,
+}
+
+SOURCES = [
+    ("Ministry of Health", "https://www.health.example.gov/covid"),
+    ("World Health Organization", "https://covid19.who.int/"),
+    ("Government website", "https://www.gov.example/vaccination-data"),
+]
+
+# Sources removed by clean_vaccination_data
+SOCIAL_SOURCES = [
+    ("Ministry of Health", "https://twitter.com/health_example"),
+    ("Government website", "https://www.facebook.com/gov.example"),
+]
+
+# Columns that can be blanked at random by nan_rate
+SPARSE_COLUMNS = COLUMNS[3:12]
+
+
+def iso_codes(count: int) -> list:
+    """
+    Distinct three-letter codes AAA, AAB, ... for synthetic countries.
+    """
+    letters = string.ascii_uppercase
+    return [letters[i // 676 % 26] + letters[i // 26 % 26] + letters[i % 26] for i in range(count)]
+
+
+def _vaccine_mixes(rng, countries: int, manufacturers: dict, per_country: int) -> np.ndarray:
+    names = list(manufacturers)
+    weights = np.array([manufacturers[name] for name in names], dtype="float64")
+    weights /= weights.sum()
+    mixes = []
+    for _ in range(countries):
+        size = rng.integers(1, min(per_country, len(names)) + 1)
+        chosen = rng.choice(len(names), size=size, replace=False, p=weights)
+        mixes.append(", ".join(sorted(names[i] for i in chosen)))
+    return np.array(mixes, dtype=object)
+
+
+def generate_vaccinations(countries=50, days=365, manufacturers=None, per_country=3, duplicate_rate=0.0,
+                          nan_rate=0.0, social_rate=0.0, start_date="2021-01-01", seed=0) -> pd.DataFrame:
+    """
+    A deterministic, country_vaccinations.csv-shaped DataFrame of
+    countries x days rows (plus duplicates), sorted by country then date.
+
+    Every country gets a population, a vaccination campaign that ramps up
+    over time and a fixed mix of up to per_country manufacturers drawn
+    from `manufacturers` (name -> relative share, MANUFACTURERS by
+    default). Cumulative figures are consistent with the daily ones.
+
+    duplicate_rate is the fraction of rows repeated (with the same
+    iso_code and date) right after the original, nan_rate the fraction of
+    numeric cells left blank, and social_rate the fraction of countries
+    whose source is a twitter/facebook page. The same arguments always
+    produce the same frame.
+    """
+    rng = np.random.default_rng(seed)
+    manufacturers = MANUFACTURERS if manufacturers is None else manufacturers
+    codes = iso_codes(countries)
+    rows = countries * days
+
+    population = rng.integers(10**5, 10**8, countries).astype("float64")
+    campaign = np.minimum(np.arange(days) / 60.0, 1.0)
+    rate = rng.uniform(0.001, 0.01, countries)
+    daily = np.floor(population[:, None] * rate[:, None] * campaign[None, :]
+                     * rng.uniform(0.7, 1.3, (countries, days)))
+    total = np.cumsum(daily, axis=1)
+    people = np.floor(total * 0.6)
+    fully = np.floor(total * 0.4)
+    smoothed = pd.DataFrame(daily.T).rolling(7, min_periods=1).mean().to_numpy().T.round()
+    per_hundred = 100.0 / population[:, None]
+
+    social = rng.random(countries) < social_rate
+    source = rng.integers(0, len(SOURCES), countries)
+    pairs = [SOCIAL_SOURCES[i % len(SOCIAL_SOURCES)] if is_social else SOURCES[i]
+             for i, is_social in zip(source, social)]
+    source_name = np.array([name for name, _ in pairs], dtype=object)
+    source_website = np.array([website for _, website in pairs], dtype=object)
+
+    dates = pd.date_range(start_date, periods=days).strftime("%Y-%m-%d")
+    frame = pd.DataFrame({
+        "country": np.repeat([f"Country {code}" for code in codes], days),
+        "iso_code": np.repeat(codes, days),
+        "date": np.tile(dates, countries),
+        "total_vaccinations": total.ravel(),
+        "people_vaccinated": people.ravel(),
+        "people_fully_vaccinated": fully.ravel(),
+        "daily_vaccinations_raw": daily.ravel(),
+        "daily_vaccinations": smoothed.ravel(),
+        "total_vaccinations_per_hundred": (total * per_hundred).round(2).ravel(),
+        "people_vaccinated_per_hundred": (people * per_hundred).round(2).ravel(),
+        "people_fully_vaccinated_per_hundred": (fully * per_hundred).round(2).ravel(),
+        "daily_vaccinations_per_million": (smoothed * per_hundred * 10**4).round(0).ravel(),
+        "vaccines": np.repeat(_vaccine_mixes(rng, countries, manufacturers, per_country), days),
+        "source_name": np.repeat(source_name, days),
+        "source_website": np.repeat(source_website, days),
+    }, columns=COLUMNS)
+
+    if nan_rate > 0 and rows:
+        frame[SPARSE_COLUMNS] = frame[SPARSE_COLUMNS].mask(rng.random((rows, len(SPARSE_COLUMNS))) < nan_rate)
+
+    if duplicate_rate > 0 and rows:
+        repeats = np.where(rng.random(rows) < duplicate_rate, 2, 1)
+        frame = frame.loc[frame.index.repeat(repeats)].reset_index(drop=True)
+    return frame
+
+
+def write_vaccinations_csv(path, **kwargs) -> int:
+    """
+    Write generate_vaccinations(**kwargs) to a CSV file and return the
+    number of rows written.
+    """
+    frame = generate_vaccinations(**kwargs)
+    frame.to_csv(path, index=False)
+    return len(frame)
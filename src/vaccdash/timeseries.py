@@ -0,0 +1,206 @@
+import numpy as np
+
+from vaccdash.array_fetch import column_types
+from vaccdash.queries import log_query_time
+from vaccdash.rollups import PERIOD_START_SQL
+from vaccdash.schema import day_number
+
+KEYS = ("country", "iso_code")
+
+AGGREGATES = {"sum": "SUM", "mean": "AVG", "min": "MIN", "max": "MAX"}
+
+DAILY_SQL = """
+    SELECT date_day, "{column}" FROM vaccinations
+    WHERE {key} = ? AND date_day BETWEEN ? AND ?
+    ORDER BY date_day
+    """
+
+# Periods are labelled by the day number of their first day, as in the rollups
+RESAMPLE_SQL = """
+    SELECT {start} AS period_start, {func}("{column}") FROM vaccinations
+    WHERE {key} = ? AND date_day BETWEEN ? AND ?
+    GROUP BY period_start
+    ORDER BY period_start
+    """
+
+# Calendar-day window over the (key, date_day) index; the rows before start
+# are read only to fill the first windows.
+ROLLING_SQL = """
+    SELECT date_day, value FROM (
+        SELECT date_day, AVG("{column}") OVER (
+            ORDER BY date_day RANGE BETWEEN {preceding} PRECEDING AND CURRENT ROW
+        ) AS value
+        FROM vaccinations
+        WHERE {key} = ? AND date_day BETWEEN ? AND ?
+    )
+    WHERE date_day >= ?
+    ORDER BY date_day
+    """
+
+
+def _check(conn, column, key):
+    if key not in KEYS:
+        raise ValueError(f"key must be one of {KEYS}")
+    if column_types(conn, [column])[column] != "float64":
+        raise ValueError(f"{column} is not a numeric column")
+
+
+def _series(rows) -> dict:
+    """
+    (day number, value) rows as {"date": datetime64[D], "value": float64}.
+    """
+    if not rows:
+        return {"date": np.empty(0, dtype="datetime64[D]"), "value": np.empty(0)}
+    days, values = zip(*rows)
+    return {
+        "date": np.array(days, dtype="int64").astype("datetime64[D]"),
+        "value": np.array(values, dtype="float64"),
+    }
+
+
+@log_query_time
+def daily(conn, value, start_date, end_date, column="daily_vaccinations", key="country") -> dict:
+    """
+    One point per stored day for the country (or iso_code) `value`.
+    """
+    _check(conn, column, key)
+    sql = DAILY_SQL.format(column=column, key=key)
+    return _series(conn.execute(sql, (value, day_number(start_date), day_number(end_date, end=True))).fetchall())
+
+
+@log_query_time
+def resample(conn, value, start_date, end_date, period="week", column="daily_vaccinations",
+             how="sum", key="country") -> dict:
+    """
+    Aggregate a column per Monday-based week or calendar month inside
+    SQLite. Each point is dated at the first day of its period; the first
+    and last periods only cover the part inside the requested range.
+    """
+    _check(conn, column, key)
+    if period not in PERIOD_START_SQL:
+        raise ValueError(f"period must be one of {sorted(PERIOD_START_SQL)}")
+    if how not in AGGREGATES:
+        raise ValueError(f"how must be one of {sorted(AGGREGATES)}")
+    sql = RESAMPLE_SQL.format(start=PERIOD_START_SQL[period], func=AGGREGATES[how], column=column, key=key)
+    return _series(conn.execute(sql, (value, day_number(start_date), day_number(end_date, end=True))).fetchall())
+
+
+@log_query_time
+def rolling_mean(conn, value, start_date, end_date, window=7, column="daily_vaccinations", key="country") -> dict:
+    """
+    Mean of the non-missing values over the last `window` calendar days
+    (including the current one), computed with a SQL window function.
+    """
+    _check(conn, column, key)
+    if window < 1:
+        raise ValueError("window must be at least 1 day")
+    first, last = day_number(start_date), day_number(end_date, end=True)
+    sql = ROLLING_SQL.format(column=column, key=key, preceding=int(window) - 1)
+    return _series(conn.execute(sql, (value, first - window + 1, last, first)).fetchall())
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    the visual shape of the series (x ascending, no NaN in y).
+
+    The first and last points are always kept. Every other point is picked
+    from one of threshold - 2 equal buckets as the one forming the largest
+    triangle with the previously picked point and the mean of the next
+    bucket. The work per bucket is vectorized, so the cost is O(n) in NumPy
+    plus O(threshold) Python steps.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    bounds = (np.floor(np.arange(threshold - 1) * ((n - 2) / (threshold - 2))) + 1).astype(np.int64)
+    bounds[-1] = n - 1
+
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        next_hi = bounds[i + 2] if i + 2 < len(bounds) else n
+        mean_x = x[hi:next_hi].mean()
+        mean_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - mean_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def _shares(lengths, budget) -> np.ndarray:
+    """
+    Split a point budget between runs of the given lengths: one point each,
+    the rest in proportion to their length (largest remainders first).
+    """
+    lengths = np.asarray(lengths)
+    extra = budget - len(lengths)
+    exact = extra * (lengths - 1) / max(int((lengths - 1).sum()), 1)
+    shares = 1 + np.floor(exact).astype(np.int64)
+    remainder = extra - int((shares - 1).sum())
+    shares[np.argsort(np.floor(exact) - exact, kind="stable")[:remainder]] += 1
+    return np.minimum(shares, lengths)
+
+
+def _run_indices(x, y, threshold: int) -> np.ndarray:
+    if threshold >= 3:
+        return lttb_indices(x, y, threshold)
+    return np.array([0, len(x) - 1][:threshold])
+
+
+def downsample(points: dict, max_points: int) -> dict:
+    """
+    Reduce a {"date", "value"} series to at most max_points points with
+    LTTB. Series that already fit are returned unchanged.
+
+    Missing values split the series into runs that are downsampled on their
+    own, each with a share of the budget, and one NaN point is kept between
+    runs so that charts still show the gaps. Only when there are too many
+    runs for the budget are the missing values dropped instead.
+    """
+    dates, values = points["date"], points["value"]
+    if len(values) <= max_points:
+        return points
+    present = ~np.isnan(values)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], present.astype(np.int8), [0]))))
+    starts, ends = edges[::2], edges[1::2]
+    if 2 * len(starts) - 1 > max_points:
+        dates, values = dates[present], values[present]
+        keep = lttb_indices(dates.astype("float64"), values, max_points)
+        return {"date": dates[keep], "value": values[keep]}
+
+    budget = max_points - (len(starts) - 1)
+    shares = _shares(ends - starts, budget)
+    keep = []
+    for start, end, share in zip(starts, ends, shares):
+        if keep:
+            # The missing day just before the run breaks the line
+            keep.append(np.array([start - 1]))
+        keep.append(start + _run_indices(dates[start:end].astype("float64"), values[start:end], share))
+    keep = np.concatenate(keep) if keep else np.empty(0, dtype=np.int64)
+    return {"date": dates[keep], "value": values[keep]}
+
+
+def series(conn, value, start_date, end_date, column="daily_vaccinations", period="day",
+           window=None, max_points=None, key="country") -> dict:
+    """
+    One chart-ready series: daily values, a rolling mean over `window`
+    days, or sums per week/month, then optionally downsampled to at most
+    max_points points. The size of the result is bounded by max_points
+    however long the date range is.
+    """
+    if period == "day" and window:
+        points = rolling_mean(conn, value, start_date, end_date, window=window, column=column, key=key)
+    elif period == "day":
+        points = daily(conn, value, start_date, end_date, column=column, key=key)
+    elif window:
+        raise ValueError("window only applies to daily series")
+    else:
+        points = resample(conn, value, start_date, end_date, period=period, column=column, key=key)
+    if max_points is not None:
+        points = downsample(points, max_points)
+    return points
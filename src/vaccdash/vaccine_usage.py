@@ -0,0 +1,85 @@
+import pandas as pd
+
+from vaccdash.data_cleaning import tokenize_vaccines
+from vaccdash.schema import refresh_if_dirty
+
+INSERT_USAGE_SQL = "INSERT OR IGNORE INTO vaccine_usage (country, iso_code, vaccine) VALUES (?, ?, ?)"
+
+# The UNIQUE (vaccine, country, iso_code) index serves all three lookups
+COUNT_COUNTRIES_SQL = "SELECT COUNT(DISTINCT country) FROM vaccine_usage WHERE vaccine = ?"
+COUNTRIES_SQL = "SELECT DISTINCT country FROM vaccine_usage WHERE vaccine = ? ORDER BY country"
+VACCINES_SQL = "SELECT DISTINCT vaccine FROM vaccine_usage ORDER BY vaccine"
+
+
+def usage_rows(frame: pd.DataFrame) -> list:
+    """
+    Split the vaccines strings of a frame into (country, iso_code, vaccine)
+    rows, using the same tokenizer as clean_vaccination_data.
+    """
+    distinct = (
+        frame.reindex(columns=["country", "iso_code", "vaccines"])
+        .dropna(subset=["vaccines"])
+        .drop_duplicates()
+    )
+    codes, tokens = tokenize_vaccines(distinct["vaccines"])
+    return [
+        (country, iso_code, vaccine)
+        for country, iso_code, code in zip(distinct["country"].tolist(), distinct["iso_code"].tolist(), codes)
+        for vaccine in sorted(tokens[code])
+    ]
+
+
+def record_usage(conn, frame: pd.DataFrame) -> None:
+    """
+    Add the manufacturers used in a freshly ingested frame to vaccine_usage.
+    """
+    conn.executemany(INSERT_USAGE_SQL, usage_rows(frame))
+
+
+def _stored_usage(conn) -> pd.DataFrame:
+    return pd.read_sql_query("SELECT DISTINCT country, iso_code, vaccines FROM vaccinations", conn)
+
+
+def rebuild_vaccine_usage(conn) -> None:
+    """
+    Rebuild vaccine_usage from everything stored in vaccinations.
+    """
+    conn.execute("DELETE FROM vaccine_usage")
+    record_usage(conn, _stored_usage(conn))
+
+
+def _fresh(conn) -> bool:
+    return refresh_if_dirty(conn, "vaccine_usage", rebuild_vaccine_usage)
+
+
+def _scan(conn) -> pd.DataFrame:
+    return pd.DataFrame(usage_rows(_stored_usage(conn)), columns=["country", "iso_code", "vaccine"])
+
+
+def count_countries(conn, vaccine_name: str) -> int:
+    """
+    Number of distinct countries that used exactly this manufacturer.
+    """
+    if not _fresh(conn):
+        usage = _scan(conn)
+        return int(usage.loc[usage["vaccine"] == vaccine_name, "country"].nunique())
+    return conn.execute(COUNT_COUNTRIES_SQL, (vaccine_name,)).fetchone()[0]
+
+
+def countries(conn, vaccine_name: str) -> list:
+    """
+    Sorted list of countries that used exactly this manufacturer.
+    """
+    if not _fresh(conn):
+        usage = _scan(conn)
+        return sorted(usage.loc[usage["vaccine"] == vaccine_name, "country"].dropna().unique())
+    return [row[0] for row in conn.execute(COUNTRIES_SQL, (vaccine_name,))]
+
+
+def vaccines(conn) -> list:
+    """
+    Sorted list of every manufacturer recorded in the database.
+    """
+    if not _fresh(conn):
+        return sorted(_scan(conn)["vaccine"].unique())
+    return [row[0] for row in conn.execute(VACCINES_SQL)]
@@ -0,0 +1,195 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# Input row position of every record, carried through the cleaning stages
+# while a QualityReport is being filled and dropped before returning.
+ROW_COLUMN = "_row"
+
+PER_HUNDRED_BOUNDS = {
+    "total_vaccinations_per_hundred": (0.0, 500.0),
+    "people_vaccinated_per_hundred": (0.0, 100.0),
+    "people_fully_vaccinated_per_hundred": (0.0, 100.0),
+}
+
+COUNT_COLUMNS = ["total_vaccinations", "people_vaccinated", "people_fully_vaccinated",
+                 "daily_vaccinations_raw", "daily_vaccinations"]
+
+
+def _values(frame: pd.DataFrame, column):
+    """
+    A column as float64 (NaN for missing), or None if the frame lacks it.
+    """
+    if column not in frame.columns:
+        return None
+    return pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _unparsed(frame, before, missing):
+    # Only the rows left without a date are looked up in the raw strings,
+    # as isna over a whole string column costs more than the parsing check
+    violations = frame["date"].isna().to_numpy().copy()
+    positions = np.flatnonzero(violations)
+    violations[positions] = before["date"].iloc[positions].isna().to_numpy() == missing
+    return violations
+
+
+def missing_date(frame, before):
+    return _unparsed(frame, before, missing=True)
+
+
+def unparseable_date(frame, before):
+    return _unparsed(frame, before, missing=False)
+
+
+def negative_count(frame, before):
+    violations = np.zeros(len(frame), dtype=bool)
+    for column in COUNT_COLUMNS:
+        values = _values(frame, column)
+        if values is not None:
+            violations |= values < 0
+    return violations
+
+
+def fully_exceeds_people(frame, before):
+    fully = _values(frame, "people_fully_vaccinated")
+    people = _values(frame, "people_vaccinated")
+    if fully is None or people is None:
+        return np.zeros(len(frame), dtype=bool)
+    return fully > people
+
+
+def per_hundred_out_of_bounds(frame, before):
+    violations = np.zeros(len(frame), dtype=bool)
+    for column, (low, high) in PER_HUNDRED_BOUNDS.items():
+        values = _values(frame, column)
+        if values is not None:
+            violations |= (values < low) | (values > high)
+    return violations
+
+
+def non_monotonic_total(frame, before):
+    """
+    total_vaccinations lower than the previous reported total of the same
+    iso_code. Needs the frame sorted by iso_code then date.
+    """
+    total = _values(frame, "total_vaccinations")
+    violations = np.zeros(len(frame), dtype=bool)
+    if total is None:
+        return violations
+    reported = np.flatnonzero(~np.isnan(total) & frame["date"].notna().to_numpy())
+    values = total[reported]
+    # Decreases are rare, so iso_codes are only compared where one happens
+    # (between two countries or within one)
+    decreases = np.flatnonzero(values[1:] < values[:-1])
+    current, previous = reported[decreases + 1], reported[decreases]
+    iso = frame["iso_code"]
+    same = iso.iloc[current].to_numpy() == iso.iloc[previous].to_numpy()
+    violations[current[same & iso.iloc[current].notna().to_numpy()]] = True
+    return violations
+
+
+# Rule name -> (stage it runs after, check, description). Each check gets
+# the frame output by the stage and the frame it received, and returns a
+# boolean mask over the output rows.
+RULES = {
+    "missing_date": ("date_parse", missing_date, "date is missing"),
+    "unparseable_date": ("date_parse", unparseable_date, "date could not be parsed"),
+    "negative_count": ("date_parse", negative_count, "a vaccination count is negative"),
+    "fully_exceeds_people": ("date_parse", fully_exceeds_people,
+                             "people_fully_vaccinated is greater than people_vaccinated"),
+    "per_hundred_out_of_bounds": ("date_parse", per_hundred_out_of_bounds,
+                                  "a per-hundred value is outside PER_HUNDRED_BOUNDS"),
+    "non_monotonic_total": ("dedupe", non_monotonic_total,
+                            "total_vaccinations decreased since the previous report of the country"),
+}
+
+
+class QualityReport:
+    """
+    Data-quality findings collected while clean_vaccination_data runs
+    (pass it as quality=). After each cleaning stage the rules attached to
+    that stage are evaluated on the frame in hand, and the rows the stage
+    dropped are counted as dropped_by_<stage>. Each finding keeps a count
+    and up to `samples` index labels of the offending input rows.
+
+    rules limits the checks to some RULES names (all by default). Rules of
+    stages that did not run are not reported.
+    """
+
+    def __init__(self, rules=None, samples=5):
+        names = list(RULES) if rules is None else list(rules)
+        unknown = [name for name in names if name not in RULES]
+        if unknown:
+            raise ValueError(f"Unknown validation rules: {', '.join(unknown)}")
+        self.rules = names
+        self.samples = samples
+        self.findings = {}
+        self.rows_in = 0
+        self.rows_out = 0
+        self.seconds = 0.0
+        self._index = None
+
+    def start(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reset the report for df and return df tagged with ROW_COLUMN.
+        """
+        self.findings = {}
+        self.rows_in = len(df)
+        self.seconds = 0.0
+        self._index = df.index
+        return df.assign(**{ROW_COLUMN: np.arange(len(df))})
+
+    def _add(self, name, stage, description, positions) -> None:
+        # The first input rows, without sorting every violation
+        sample = positions
+        if len(sample) > self.samples:
+            sample = np.partition(sample, self.samples)[:self.samples]
+        labels = self._index[np.sort(sample)]
+        self.findings[name] = {
+            "stage": stage,
+            "description": description,
+            "count": int(len(positions)),
+            "rows": labels.tolist(),
+        }
+
+    def observe(self, stage: str, before: pd.DataFrame, after: pd.DataFrame) -> None:
+        start = time.perf_counter()
+        rows = after[ROW_COLUMN].to_numpy()
+        for name in self.rules:
+            rule_stage, check, description = RULES[name]
+            if rule_stage == stage:
+                violations = rows[check(after, before)]
+                self._add(name, stage, description, violations)
+        if len(after) < len(before):
+            kept = np.zeros(self.rows_in, dtype=bool)
+            kept[rows] = True
+            previous = before[ROW_COLUMN].to_numpy()
+            dropped = previous[~kept[previous]]
+            self._add(f"dropped_by_{stage}", stage, f"row dropped by the {stage} stage", dropped)
+        self.seconds += time.perf_counter() - start
+
+    def finish(self, cleaned: pd.DataFrame) -> pd.DataFrame:
+        """
+        Record the final row count and return cleaned without ROW_COLUMN.
+        """
+        self.rows_out = len(cleaned)
+        return cleaned.drop(columns=ROW_COLUMN)
+
+    @property
+    def ok(self) -> bool:
+        """
+        True when no rule found a violation (dropped rows are not violations).
+        """
+        return not any(finding["count"] for name, finding in self.findings.items() if name in RULES)
+
+    def to_dict(self) -> dict:
+        return {"rows_in": self.rows_in, "rows_out": self.rows_out, "seconds": self.seconds,
+                "findings": dict(self.findings)}
+
+    def __str__(self) -> str:
+        lines = [f"{self.rows_in} rows in, {self.rows_out} rows out"]
+        for name, finding in self.findings.items():
+            lines.append(f"  {name:28s} {finding['count']:8d}  e.g. rows {finding['rows']}")
+        return "\n".join(lines)
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vaccdash.data_access_module import init_db, load_csv_to_sqlite
+
+
+def build_vaccinations_frame(countries=1, days=4, iso_code="C{i}", country="Country{i}", dates=None, **columns):
+    """
+    Rows for `days` consecutive days from 2021-01-01 (or the given dates)
+    for each of `countries` countries, country by country. iso_code and
+    country are formatted with the country number i. Other columns are
+    scalars or full-length sequences; daily_vaccinations defaults to
+    0, 1, 2, ...
+    """
+    if dates is None:
+        dates = pd.date_range("2021-01-01", periods=days).strftime("%Y-%m-%d")
+    frame = pd.DataFrame({
+        "iso_code": np.repeat([iso_code.format(i=i) for i in range(countries)], len(dates)),
+        "country": np.repeat([country.format(i=i) for i in range(countries)], len(dates)),
+        "date": np.tile(dates, countries),
+    })
+    columns.setdefault("daily_vaccinations", np.arange(len(frame)))
+    return frame.assign(**columns)
+
+
+@pytest.fixture
+def vaccinations_frame():
+    """Factory building a vaccinations frame, see build_vaccinations_frame."""
+    return build_vaccinations_frame
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    """
+    Factory writing a frame (or a dict of columns) to a CSV in tmp_path and
+    returning its path.
+    """
+    def write(data, name="data.csv"):
+        path = tmp_path / name
+        pd.DataFrame(data).to_csv(path, index=False)
+        return path
+    return write
+
+
+@pytest.fixture
+def make_db(tmp_path, write_csv):
+    """
+    Factory creating a database in tmp_path with init_db and loading a
+    frame, a dict of columns or a CSV path into it (keyword arguments go to
+    load_csv_to_sqlite). Returns the database path.
+    """
+    def make(data=None, name="test.db", **load_options):
+        db_path = tmp_path / name
+        init_db(db_path)
+        if data is not None:
+            csv_path = data if isinstance(data, (str, os.PathLike)) else write_csv(data)
+            load_csv_to_sqlite(csv_path, db_path, **load_options)
+        return db_path
+    return make
@@ -0,0 +1,67 @@
+import sqlite3
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from vaccdash.aggregates import source_distribution, vaccine_totals
+from vaccdash.data_access_module import init_db, load_csv_to_sqlite, plot_vaccine_split
+
+
+def load_cleaned(tmp_path):
+    df = pd.DataFrame({
+        "iso_code": ["AAA", "AAA", "BBB"],
+        "country": ["CountryA", "CountryA", "CountryB"],
+        "date": ["2021-01-01", "2021-01-02", "2021-01-01"],
+        "total_vaccinations": [100.0, 200.0, 300.0],
+        "people_vaccinated": [50.0, 150.0, 250.0],
+        "people_fully_vaccinated": [20.0, 70.0, 120.0],
+        "vaccines": ["Moderna, Pfizer/BioNTech", "Moderna", "Sputnik V"],
+        "source_name": ["Source1", "Source1", "Source2"],
+    })
+    csv_path = tmp_path / "vaccinations.csv"
+    df.to_csv(csv_path, index=False)
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path, clean=True)
+    return db_path, df
+
+
+# Acceptance: Per-vaccine totals are computed in SQL and match summing the flags client-side.
+def test_vaccine_totals_match_client_side_sum(tmp_path):
+    db_path, _ = load_cleaned(tmp_path)
+    conn = sqlite3.connect(db_path)
+
+    totals = vaccine_totals(conn)
+    frame = pd.read_sql_query("SELECT * FROM vaccinations", conn)
+    sources = source_distribution(conn)
+    conn.close()
+
+    expected = frame[[col for col in frame.columns if col.startswith("vaccine_")]].sum().sort_values(ascending=False)
+    assert totals.to_dict() == expected.to_dict()
+    assert totals.index[0] == "vaccine_Moderna"
+    assert dict(zip(sources["source_name"], sources["count"])) == {"Source1": 2, "Source2": 1}
+
+
+# Acceptance: Without vaccine_* columns no totals are returned and the chart is skipped.
+def test_vaccine_totals_without_split_columns(tmp_path, monkeypatch, capsys):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    assert vaccine_totals(conn).empty
+    conn.close()
+
+    monkeypatch.setattr(plt, "show", lambda: None)
+    plot_vaccine_split(db_path)
+    assert "No split vaccine columns found." in capsys.readouterr().out
+
+
+# Acceptance: The vaccine split chart is drawn from the SQL aggregates.
+def test_plot_vaccine_split(tmp_path, monkeypatch):
+    db_path, _ = load_cleaned(tmp_path)
+    shown = []
+    monkeypatch.setattr(plt, "show", lambda: shown.append(plt.gcf()))
+
+    plot_vaccine_split(db_path)
+
+    legend = shown[0].axes[0].get_legend()
+    assert [text.get_text() for text in legend.get_texts()][0] == "Moderna (50.0%)"
@@ -0,0 +1,54 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vaccdash.data_access_module import (
+    iter_country_arrays,
+    query_country,
+    query_country_arrays,
+    query_country_by_ISO_arrays,
+)
+
+
+@pytest.fixture
+def conn(make_db, vaccinations_frame):
+    days = 9
+    frame = vaccinations_frame(days=days, iso_code="AAA", country="CountryA", vaccines="Moderna",
+                               daily_vaccinations=[None if d == 2 else d * 10 for d in range(days)])
+    conn = sqlite3.connect(make_db(frame))
+    yield conn
+    conn.close()
+
+
+# Acceptance: The array fetch returns only the requested columns, typed, with the same values as the pandas path.
+def test_query_country_arrays_projection_and_types(conn):
+    expected = query_country(conn, "CountryA", "2021-01-02", "2021-01-08")
+    arrays = query_country_arrays(conn, "CountryA", "2021-01-02", "2021-01-08",
+                                  columns=["date", "daily_vaccinations", "vaccines"])
+
+    assert list(arrays) == ["date", "daily_vaccinations", "vaccines"]
+    assert arrays["date"].dtype == "datetime64[D]"
+    assert arrays["daily_vaccinations"].dtype == "float64"
+    assert np.isnan(arrays["daily_vaccinations"][1])
+    np.testing.assert_array_equal(arrays["date"], pd.to_datetime(expected["date"]).to_numpy().astype("datetime64[D]"))
+    np.testing.assert_array_equal(arrays["daily_vaccinations"], expected["daily_vaccinations"].to_numpy(dtype=float))
+    assert arrays["vaccines"].tolist() == expected["vaccines"].tolist()
+
+    full = query_country_by_ISO_arrays(conn, "AAA", "2021-01-02", "2021-01-08")
+    assert "source_website" in full and len(full["iso_code"]) == len(expected)
+    empty = query_country_arrays(conn, "Nowhere", "2021-01-01", "2021-01-09", columns=["date"])
+    assert empty["date"].dtype == "datetime64[D]" and len(empty["date"]) == 0
+    with pytest.raises(ValueError):
+        query_country_arrays(conn, "CountryA", "2021-01-01", "2021-01-09", columns=["date; DROP TABLE x"])
+
+
+# Acceptance: The iterator streams a long range in bounded batches that add up to the full result.
+def test_iter_country_arrays_streams_batches(conn):
+    batches = list(iter_country_arrays(conn, "CountryA", "2021-01-01", "2021-01-09",
+                                       columns=["date", "daily_vaccinations"], batch_size=4))
+    whole = query_country_arrays(conn, "CountryA", "2021-01-01", "2021-01-09", columns=["date", "daily_vaccinations"])
+
+    assert [len(batch["date"]) for batch in batches] == [4, 4, 1]
+    np.testing.assert_array_equal(np.concatenate([batch["date"] for batch in batches]), whole["date"])
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+from vaccdash.async_queries import AsyncQueryService
+from vaccdash.data_access_module import query_country
+from vaccdash.connection import get_pool
+
+# Never finishes on its own; only Connection.interrupt() stops it
+ENDLESS_SQL = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+@pytest.fixture
+def db_path(make_db):
+    return make_db({
+        "iso_code": ["AAA", "AAA", "BBB"],
+        "country": ["CountryA", "CountryA", "CountryB"],
+        "date": ["2021-01-01", "2021-01-02", "2021-01-01"],
+        "daily_vaccinations": [10, 20, 30],
+        "vaccines": ["Moderna", "Moderna, Sputnik V", "Sputnik V"],
+    })
+
+
+# Acceptance: Async queries return the same results as the blocking functions, and concurrent identical queries share one execution.
+def test_async_queries_match_and_coalesce(db_path):
+    release = threading.Event()
+
+    def slow_count(conn, iso_code):
+        release.wait(5)
+        return conn.execute("SELECT COUNT(*) FROM vaccinations WHERE iso_code = ?", (iso_code,)).fetchone()[0]
+
+    async def main():
+        async with AsyncQueryService(db_path, workers=2) as service:
+            frame = await service.query_country("CountryA", "2021-01-01", "2021-01-31")
+            countries = await service.countries_using_vaccine("Sputnik V")
+            waiting = [asyncio.create_task(service.run(slow_count, "AAA")) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            release.set()
+            counts = await asyncio.gather(*waiting)
+            return frame, countries, counts, service.stats()
+
+    frame, countries, counts, stats = asyncio.run(main())
+    with get_pool(db_path).connection() as conn:
+        expected = query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+    pd.testing.assert_frame_equal(frame, expected)
+    assert countries == ["CountryA", "CountryB"]
+    assert counts == [2] * 5
+    assert stats["executed"] == 3 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+
+
+# Acceptance: A query that exceeds its timeout raises TimeoutError, is interrupted in SQLite, and frees its reader for later queries.
+def test_async_query_timeout_interrupts(db_path):
+
+    def endless(conn):
+        return conn.execute(ENDLESS_SQL).fetchone()
+
+    async def main():
+        async with AsyncQueryService(db_path, workers=1) as service:
+            with pytest.raises(asyncio.TimeoutError):
+                await service.run(endless, timeout=0.1)
+            vaccines = await service.list_vaccines(timeout=5)
+
+            task = asyncio.create_task(service.run(endless))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            after_cancel = await service.count_countries_using_vaccine("Moderna", timeout=5)
+            return vaccines, after_cancel, service.stats()
+
+    vaccines, after_cancel, stats = asyncio.run(main())
+    assert vaccines == ["Moderna", "Sputnik V"]
+    assert after_cancel == 1
+    assert stats["timeouts"] == 1 and stats["cancelled"] == 1 and stats["interrupted"] == 2
@@ -0,0 +1,53 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import vaccdash.queries as queries
+from vaccdash.data_access_module import (
+    query_countries,
+    query_countries_by_ISO,
+    query_country,
+)
+
+
+@pytest.fixture
+def db_path(make_db, vaccinations_frame):
+    return make_db(vaccinations_frame(countries=6, days=4))
+
+
+# Acceptance: A batch query returns, per country, exactly what query_country returns, as a long frame or a dict in request order.
+def test_query_countries_matches_single_queries(db_path):
+    conn = sqlite3.connect(db_path)
+    requested = ["Country3", "Country0", "Nowhere", "Country3"]
+
+    long = query_countries(conn, requested, "2021-01-02", "2021-01-03")
+    parts = query_countries(conn, requested, "2021-01-02", "2021-01-03", as_dict=True)
+    by_iso = query_countries_by_ISO(conn, ["C0", "C3"], "2021-01-02", "2021-01-03", as_dict=True)
+
+    assert long["country"].tolist() == ["Country0"] * 2 + ["Country3"] * 2
+    assert list(parts) == ["Country3", "Country0", "Nowhere"]
+    for country in ["Country3", "Country0", "Nowhere"]:
+        expected = query_country(conn, country, "2021-01-02", "2021-01-03")
+        pd.testing.assert_frame_equal(parts[country], expected, check_dtype=country != "Nowhere")
+    pd.testing.assert_frame_equal(by_iso["C0"], parts["Country0"])
+    conn.close()
+
+
+# Acceptance: Key lists longer than the IN-list limit go through a temporary table, also on read-only connections, with the same result.
+def test_query_countries_large_batch_uses_temp_table(db_path, monkeypatch):
+    requested = [f"Country{i}" for i in range(6)]
+    conn = sqlite3.connect(db_path)
+    expected = query_countries(conn, requested, "2021-01-01", "2021-01-04")
+    conn.close()
+
+    monkeypatch.setattr(queries, "BATCH_IN_LIMIT", 2)
+    readonly = sqlite3.connect(db_path.resolve().as_uri() + "?mode=ro", uri=True)
+    result = query_countries(readonly, requested, "2021-01-01", "2021-01-04")
+    again = query_countries(readonly, requested[:3] * 2, "2021-01-01", "2021-01-04")
+
+    assert not readonly.in_transaction
+    assert readonly.execute("SELECT COUNT(*) FROM temp.batch_keys").fetchone()[0] == 0
+    pd.testing.assert_frame_equal(result, expected)
+    assert again["country"].unique().tolist() == requested[:3]
+    readonly.close()
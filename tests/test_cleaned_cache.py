@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from vaccdash import data_cleaning
+from vaccdash.cleaned_cache import load_cleaned
+from vaccdash.compact import vaccine_flag
+from vaccdash.data_cleaning import clean_vaccination_data
+
+
+def raw_rows(total=300.0):
+    return {
+        "country": ["Aland", "Aland", "Bland"],
+        "iso_code": ["ALA", "ALA", "BLA"],
+        "date": ["2021-01-02", "2021-01-01", "2021-01-01"],
+        "vaccines": ["Moderna", "Moderna, Pfizer/BioNTech", None],
+        "total_vaccinations": [200.0, 100.0, total],
+        "people_vaccinated": [150.0, 50.0, None],
+        "people_fully_vaccinated": [70.0, 20.0, 120.0],
+        "source_website": ["site1", "site1", None],
+    }
+
+
+# Acceptance: The cached columns round-trip to exactly what clean_vaccination_data returns.
+def test_cache_round_trip(tmp_path, write_csv):
+    csv_path = write_csv(raw_rows(), "vaccinations.csv")
+    cache_dir = tmp_path / "cache"
+
+    first = load_cleaned(csv_path, cache_dir)
+    second = load_cleaned(csv_path, cache_dir)
+
+    expected = clean_vaccination_data(pd.read_csv(csv_path))
+    pd.testing.assert_frame_equal(second.to_frame(), expected)
+    assert first.directory == second.directory
+    assert second.columns == list(expected.columns)
+
+
+# Acceptance: Individual columns load lazily through memory-mapping.
+def test_columns_are_memory_mapped(tmp_path, write_csv):
+    cached = load_cleaned(write_csv(raw_rows(), "vaccinations.csv"), tmp_path / "cache")
+
+    values = cached.column("total_vaccinations").to_numpy()
+    codes = cached.column("iso_code", categorical=True)
+
+    base = values
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+    assert codes.dtype == "category"
+    assert list(codes) == ["ALA", "ALA", "BLA"]
+
+
+# Acceptance: A changed CSV or cleaner version is detected and the stale entry replaced.
+def test_stale_cache_detected(tmp_path, write_csv, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    first = load_cleaned(write_csv(raw_rows(), "vaccinations.csv"), cache_dir)
+
+    changed = load_cleaned(write_csv(raw_rows(total=9999.0), "vaccinations.csv"), cache_dir)
+    assert changed.directory != first.directory
+    assert not first.directory.exists()
+    assert list(changed.column("total_vaccinations")) == [100.0, 200.0, 9999.0]
+
+    monkeypatch.setattr(data_cleaning, "CLEANER_VERSION", data_cleaning.CLEANER_VERSION + 1)
+    bumped = load_cleaned(write_csv(raw_rows(total=9999.0), "vaccinations.csv"), cache_dir)
+    assert bumped.directory != changed.directory
+
+
+# Acceptance: Entries cleaned with different options are kept apart.
+def test_cleaning_options_keyed(tmp_path, write_csv):
+    csv_path = write_csv(raw_rows(), "vaccinations.csv")
+    cache_dir = tmp_path / "cache"
+
+    plain = load_cleaned(csv_path, cache_dir)
+    compact = load_cleaned(csv_path, cache_dir, compact=True)
+
+    assert compact.directory != plain.directory and plain.directory.exists()
+    assert "vaccine_mask" in compact.columns and "vaccine_mask" not in plain.columns
+    assert load_cleaned(csv_path, cache_dir, compact=True).directory == compact.directory
+
+
+# Acceptance: A compact frame round-trips with its nullable counts, categoricals and vaccine_bits.
+def test_compact_round_trip(tmp_path, write_csv):
+    csv_path = write_csv(raw_rows(), "vaccinations.csv")
+    load_cleaned(csv_path, tmp_path / "cache", compact=True)
+    cached = load_cleaned(csv_path, tmp_path / "cache", compact=True)
+
+    expected = clean_vaccination_data(pd.read_csv(csv_path), compact=True)
+    frame = cached.to_frame()
+    pd.testing.assert_frame_equal(frame, expected)
+    assert frame.attrs["vaccine_bits"] == expected.attrs["vaccine_bits"]
+    assert str(frame["people_vaccinated"].dtype) == "Int32" and frame["people_vaccinated"].isna().sum() == 1
+    for column in expected.attrs["vaccine_bits"]:
+        pd.testing.assert_series_equal(vaccine_flag(frame, column), vaccine_flag(expected, column))
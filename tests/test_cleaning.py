@@ -1,7 +1,8 @@
 import pandas as pd
 import pytest
 
-from vaccdash.data_cleaning import clean_vaccination_data
+from vaccdash.data_cleaning import (DEFAULT_STAGES, FILTER_FIRST_STAGES, clean_incremental, clean_vaccination_data,
+                                    manufacturer_vocabulary)
 
 # Requirement: Date time should be in the format datetime.
 # Acceptance: Unit test should test whether the data is datetime and sorted by date within each iso_code.
@@ -182,4 +183,124 @@ def test_credible_sources():
 
     # Check that no records have 'twitter' or 'facebook' in source_website
     assert not result["source_website"].str.contains("twitter", case=False, na=False).any()
-    assert not result["source_website"].str.contains("facebook", case=False, na=False).any()
\ No newline at end of file
+    assert not result["source_website"].str.contains("facebook", case=False, na=False).any()
+
+#Acceptance: The tokenized manufacturer split should produce the same columns, in the same order, as splitting row by row.
+def test_vaccine_split_matches_row_wise_split():
+    df = pd.DataFrame(
+        {
+            "country": ["Aland"] * 4,
+            "iso_code": ["ALA"] * 4,
+            "date": ["2021-01-01", "2021-01-02", "2021-01-03", "2021-01-04"],
+            "vaccines": ["Sputnik V, Moderna", None, "Moderna", "Pfizer/BioNTech, Sputnik Light"],
+            "total_vaccinations": [100.0, 200.0, 300.0, 400.0],
+            "people_vaccinated": [50.0, 150.0, 250.0, 350.0],
+            "people_fully_vaccinated": [20.0, 70.0, 120.0, 170.0],
+        }
+    )
+    result = clean_vaccination_data(df)
+
+    vaccine_cols = [col for col in result.columns if col.startswith("vaccine_")]
+    assert vaccine_cols == ["vaccine_Moderna", "vaccine_Pfizer_BioNTech", "vaccine_Sputnik_Light", "vaccine_Sputnik_V"]
+    assert list(result.columns[-5:-1]) == vaccine_cols
+    for vaccine, col_name in zip(["Moderna", "Pfizer/BioNTech", "Sputnik Light", "Sputnik V"], vaccine_cols):
+        expected = [pd.notna(x) and vaccine in x.split(", ") for x in result["vaccines"]]
+        assert result[col_name].dtype == bool
+        assert list(result[col_name]) == expected
+
+
+def _raw_rows(iso_codes, dates, vaccines, websites=None):
+    n = len(iso_codes)
+    return pd.DataFrame(
+        {
+            "country": iso_codes,
+            "iso_code": iso_codes,
+            "date": dates,
+            "total_vaccinations": [100.0 * (i + 1) for i in range(n)],
+            "people_vaccinated": [50.0] * n,
+            "people_fully_vaccinated": [None if i % 3 == 0 else 20.0 for i in range(n)],
+            "vaccines": vaccines,
+            "source_website": websites or ["https://example.org"] * n,
+        }
+    )
+
+
+# Acceptance: Incremental cleaning of a daily delta (appended dates, a new manufacturer and a new country) equals a full re-clean.
+def test_clean_incremental_appends_daily_delta():
+    history = _raw_rows(
+        ["ALA", "BRA", "ALA", "BRA"],
+        ["2021-01-01", "2021-01-01", "2021-01-02", "2021-01-02"],
+        ["Moderna", "Pfizer/BioNTech", "Moderna", "Pfizer/BioNTech"],
+    )
+    delta = _raw_rows(
+        ["ALA", "BRA", "CAN", "BRA"],
+        ["2021-01-03", "2021-01-03", "2021-01-03", "2021-01-03"],
+        ["Moderna, Sputnik V", "Pfizer/BioNTech", "Moderna", "Moderna"],
+        ["https://example.org", "https://example.org", "https://twitter.com/x", "https://example.org"],
+    )
+    baseline = clean_vaccination_data(history)
+    result = clean_incremental(baseline, delta)
+    expected = clean_vaccination_data(pd.concat([history, delta], ignore_index=True))
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert not result.loc[result["date"] < "2021-01-03", "vaccine_Sputnik_V"].any()
+
+
+# Acceptance: Backfilled and revised rows inside an existing partition are merged as a full re-clean would, keeping history rows for repeated dates.
+def test_clean_incremental_backfill_matches_full_clean():
+    history = _raw_rows(
+        ["ALA", "ALA", "BRA", None],
+        ["2021-01-01", "2021-01-04", "2021-01-02", "2021-01-01"],
+        ["Moderna", "Moderna", "Pfizer/BioNTech", None],
+    )
+    delta = _raw_rows(
+        ["ALA", "ALA", "ALA", None],
+        ["2021-01-02", "2021-01-04", "not a date", "2021-01-02"],
+        ["Moderna", "Sputnik V", "Moderna", "Moderna"],
+    )
+    result = clean_incremental(clean_vaccination_data(history), delta)
+    expected = clean_vaccination_data(pd.concat([history, delta], ignore_index=True))
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+# Acceptance: Every cleaning stage reports its wall time, rows in and out and memory change through the hooks.
+def test_stage_hooks_report_each_stage():
+    df = _raw_rows(
+        ["ALA", "ALA", "BRA", "BRA"],
+        ["2021-01-02", "2021-01-02", "2021-01-01", "2021-01-03"],
+        ["Moderna", "Moderna", "Pfizer/BioNTech", "Sputnik V"],
+        ["https://example.org", "https://example.org", "https://twitter.com/x", "https://example.org"],
+    )
+    reports = []
+    clean_vaccination_data(df, hooks=[reports.append])
+
+    assert [report.stage for report in reports] == list(DEFAULT_STAGES)
+    rows = {report.stage: (report.rows_in, report.rows_out) for report in reports}
+    assert rows["dedupe"] == (4, 3)
+    assert rows["source_filter"] == (3, 2)
+    split = reports[DEFAULT_STAGES.index("manufacturer_split")]
+    assert split.memory_delta == 3 * 4 and split.seconds >= 0
+    assert all(report.rows_in == previous.rows_out for previous, report in zip(reports, reports[1:]))
+
+
+# Acceptance: Stages can be reordered or skipped; filtering before the split gives the same result for a fixed vocabulary.
+def test_stages_can_be_reordered_and_skipped():
+    df = _raw_rows(
+        ["BRA", "ALA", "ALA", "BRA"],
+        ["2021-01-01", "2021-01-02", "2021-01-02", "2021-01-03"],
+        ["Sputnik V", "Moderna", "Pfizer/BioNTech", "Moderna"],
+        ["https://www.facebook.com/x", "https://example.org", "https://example.org", "https://example.org"],
+    )
+    vocabulary = manufacturer_vocabulary(df["vaccines"])
+    expected = clean_vaccination_data(df, vocabulary=vocabulary)
+    reordered = clean_vaccination_data(df, vocabulary=vocabulary, stages=FILTER_FIRST_STAGES)
+    pd.testing.assert_frame_equal(reordered, expected)
+
+    unsplit = clean_vaccination_data(df, stages=[s for s in DEFAULT_STAGES if s != "manufacturer_split"])
+    assert not any(col.startswith("vaccine_") for col in unsplit.columns)
+    assert list(unsplit["iso_code"]) == ["ALA", "BRA"]
+
+    assert clean_vaccination_data(df, stages=[]).equals(df)
+    with pytest.raises(ValueError, match="split"):
+        clean_vaccination_data(df, stages=["split"])
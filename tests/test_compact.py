@@ -0,0 +1,60 @@
+import pandas as pd
+
+from vaccdash.compact import (
+    MASK_COLUMN,
+    compact_frame,
+    memory_report,
+    unpack_vaccine_flags,
+    vaccine_flag,
+)
+from vaccdash.data_cleaning import clean_vaccination_data
+
+
+def _raw_frame():
+    return pd.DataFrame(
+        {
+            "country": ["China", "China", "Aland", "Aland"],
+            "iso_code": ["CHN", "CHN", "ALA", "ALA"],
+            "date": ["2021-01-01", "2021-01-02", "2021-01-01", "2021-01-02"],
+            "total_vaccinations": [3.2e9, 3.3e9, 100.0, None],
+            "people_vaccinated": [1.2e9, None, 50.0, 60.0],
+            "people_fully_vaccinated": [1.0e9, 1.1e9, 20.0, 30.0],
+            "vaccines": ["Sinovac, Sinopharm/Beijing", "Sinovac", "Moderna, Pfizer/BioNTech", "Moderna"],
+            "source_name": ["NHC", "NHC", "Aland Health", "Aland Health"],
+            "source_website": ["https://example.org/chn"] * 2 + ["https://example.org/ala"] * 2,
+        }
+    )
+
+
+# Acceptance: The compact layout uses categories, Int32/Int64 counts and a vaccine bitmask that unpacks back to the boolean columns.
+def test_compact_cleaning_round_trips():
+    standard = clean_vaccination_data(_raw_frame())
+    compact = clean_vaccination_data(_raw_frame(), compact=True)
+
+    assert isinstance(compact["iso_code"].dtype, pd.CategoricalDtype)
+    assert str(compact["total_vaccinations"].dtype) == "Int64"
+    assert str(compact["people_fully_vaccinated"].dtype) == "Int32"
+    assert not any(col.startswith("vaccine_") and col != MASK_COLUMN for col in compact.columns)
+    assert compact[MASK_COLUMN].dtype == "uint8"
+
+    flag = vaccine_flag(compact, "vaccine_Sinovac")
+    assert flag.tolist() == standard["vaccine_Sinovac"].tolist()
+
+    restored = unpack_vaccine_flags(compact)
+    vaccine_cols = [col for col in standard.columns if col.startswith("vaccine_")]
+    assert list(restored.columns) == list(standard.columns)
+    pd.testing.assert_frame_equal(restored[vaccine_cols], standard[vaccine_cols])
+    assert restored["total_vaccinations"].astype("float64").equals(standard["total_vaccinations"])
+
+
+# Acceptance: The memory report compares both layouts per column, and the compact layout is smaller per row.
+def test_memory_report_compares_layouts():
+    standard = clean_vaccination_data(pd.concat([_raw_frame()] * 50, ignore_index=True))
+    small = compact_frame(standard.assign(total_vaccinations=standard["total_vaccinations"] // 1e3))
+    report = memory_report(standard, small)
+
+    assert str(small["total_vaccinations"].dtype) == "Int32"
+    assert list(report.columns) == ["standard", "compact"]
+    assert report.loc["vaccine_Moderna", "compact"] == 0
+    assert report.loc[MASK_COLUMN, "standard"] == 0
+    assert report.loc["per_row", "compact"] < report.loc["per_row", "standard"]
@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from vaccdash.connection import ConnectionPool, get_pool, close_all_pools
+from vaccdash.data_access_module import init_db
+
+
+# Acceptance: Pooled connections are reused and opened with the configured PRAGMAs.
+def test_pool_reuses_connections_with_pragmas(tmp_path):
+    db_path = tmp_path / "test.db"
+    pool = ConnectionPool(db_path, size=2)
+
+    with pool.connection() as conn:
+        first = conn
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    with pool.connection() as conn:
+        second = conn
+    pool.close()
+
+    assert first is second
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+
+
+# Acceptance: Connections checked out for the query path are read-only.
+def test_read_only_connections(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    pool = ConnectionPool(db_path)
+
+    with pool.connection(read_only=True) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM vaccinations").fetchone()[0] == 0
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO vaccinations (iso_code, date) VALUES ('AAA', '2021-01-01')")
+    pool.close()
+
+
+# Acceptance: The pool caps concurrent checkouts and is safe to share between threads.
+def test_pool_is_thread_safe(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    pool = ConnectionPool(db_path, size=2)
+    active, peak, errors = [0], [0], []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            for _ in range(20):
+                with pool.connection(read_only=True) as conn:
+                    with lock:
+                        active[0] += 1
+                        peak[0] = max(peak[0], active[0])
+                    conn.execute("SELECT COUNT(*) FROM vaccinations").fetchone()
+                    with lock:
+                        active[0] -= 1
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.close()
+
+    assert not errors
+    assert peak[0] <= 2
+
+
+# Acceptance: Functions taking a db_path share one pool per database file.
+def test_get_pool_is_shared_per_database(tmp_path):
+    db_path = tmp_path / "test.db"
+
+    assert get_pool(db_path) is get_pool(str(db_path))
+    close_all_pools()
+    assert get_pool(db_path) is not None
+    close_all_pools()
+
+
+# Acceptance: A database file deleted (or replaced) behind a shared pool is recreated on next use.
+def test_get_pool_replaces_pool_of_deleted_file(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    first = get_pool(db_path)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(f"{db_path}{suffix}"):
+            os.remove(f"{db_path}{suffix}")
+
+    init_db(db_path)
+    assert os.path.exists(db_path)
+    assert get_pool(db_path) is not first
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'vaccinations'").fetchone()
+    conn.close()
+    close_all_pools()
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from vaccdash.derived_metrics import safe_ratio, per_hundred, daily_delta, fully_vaccinated_ratio
+
+
+# Acceptance: The vectorized ratio should be bit-for-bit equal to the previous row-wise apply.
+def test_fully_vaccinated_ratio_matches_row_wise_apply():
+    df = pd.DataFrame(
+        {
+            "country": ["Aland"] * 6,
+            "total_vaccinations": [100.0, 0.0, None, 3.0, 7.0, 200.0],
+            "people_fully_vaccinated": [20.0, 5.0, 10.0, 1.0, None, 70.0],
+        }
+    )
+    expected = df.apply(
+        lambda row: row["people_fully_vaccinated"] / row["total_vaccinations"]
+        if pd.notna(row["total_vaccinations"]) and row["total_vaccinations"] != 0
+        else None,
+        axis=1
+    )
+    result = fully_vaccinated_ratio(df)
+
+    assert result.dtype == "float64"
+    assert np.array_equal(result.to_numpy(), expected.to_numpy(dtype="float64"), equal_nan=True)
+
+
+# Acceptance: Zero and missing denominators should be masked to NaN.
+def test_safe_ratio_masks_zero_and_missing_denominators():
+    result = safe_ratio(pd.Series([1, 2, 3]), pd.Series([0, None, 4]))
+
+    assert pd.isna(result[0])
+    assert pd.isna(result[1])
+    assert result[2] == 0.75
+
+
+# Acceptance: Per-hundred values and daily deltas can be recomputed from the raw columns.
+def test_per_hundred_and_daily_delta():
+    values = pd.Series([100.0, 150.0, 10.0, 40.0])
+    groups = pd.Series(["AAA", "AAA", "BBB", "BBB"])
+
+    assert list(per_hundred(values, pd.Series([1000.0, 1000.0, 0.0, 200.0])).fillna(-1)) == [10.0, 15.0, -1, 20.0]
+    assert list(daily_delta(values, groups).fillna(-1)) == [-1, 50.0, -1, 30.0]
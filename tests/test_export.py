@@ -0,0 +1,93 @@
+import gzip
+import io
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from vaccdash.data_access_module import query_country
+from vaccdash.export import CsvWriter, _infer, export_vaccinations, main
+from vaccdash.synthetic import write_vaccinations_csv
+
+
+@pytest.fixture
+def db_path(tmp_path, make_db):
+    csv_path = tmp_path / "data.csv"
+    write_vaccinations_csv(csv_path, countries=4, days=50, nan_rate=0.1, seed=1)
+    return make_db(csv_path, clean=True)
+
+
+# Acceptance: A CSV extract written in small batches holds the same rows as query_country.
+def test_export_csv_matches_query(tmp_path, db_path):
+    conn = sqlite3.connect(db_path)
+
+    rows = export_vaccinations(conn, tmp_path / "out.csv", values=["Country AAB"], start_date="2021-01-10",
+                               end_date="2021-02-10", batch_size=7)
+    exported = pd.read_csv(tmp_path / "out.csv")
+    expected = query_country(conn, "Country AAB", "2021-01-10", "2021-02-10")
+    conn.close()
+
+    assert rows == len(expected) == 32
+    assert list(exported.columns) == list(expected.columns)
+    populated = expected.columns[expected.notna().any()]
+    pd.testing.assert_frame_equal(exported[populated], expected[populated], check_dtype=False)
+
+
+# Acceptance: JSONL extracts support column projection, gzip compression and file-like outputs.
+def test_export_jsonl_gzip_projection(db_path):
+    conn = sqlite3.connect(db_path)
+
+    buffer = io.BytesIO()
+    rows = export_vaccinations(conn, buffer, fmt="jsonl", key="iso_code", values=["AAA", "AAC"],
+                               columns=["iso_code", "date", "daily_vaccinations"], compression="gzip", batch_size=9)
+    records = [json.loads(line) for line in gzip.decompress(buffer.getvalue()).splitlines()]
+    assert rows == len(records) == 100
+    assert list(records[0]) == ["iso_code", "date", "daily_vaccinations"]
+    assert records[0]["date"] == "2021-01-01" and records[-1]["iso_code"] == "AAC"
+    assert not buffer.closed
+
+    with pytest.raises(ValueError, match="Unknown"):
+        export_vaccinations(conn, io.BytesIO(), columns=["population"])
+    with pytest.raises(ValueError, match="fmt"):
+        export_vaccinations(conn, io.BytesIO(), fmt="xlsx")
+    conn.close()
+
+
+# Acceptance: An export that fails part way does not leave a truncated file behind.
+def test_export_failure_removes_file(tmp_path, db_path, monkeypatch):
+    conn = sqlite3.connect(db_path)
+
+    def fail(self, rows):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(CsvWriter, "write", fail)
+    with pytest.raises(OSError):
+        export_vaccinations(conn, tmp_path / "bad.csv")
+    assert not (tmp_path / "bad.csv").exists()
+    conn.close()
+
+
+# Acceptance: The command line infers format and compression from the output name.
+def test_export_cli(tmp_path, db_path, capsys):
+    out = tmp_path / "extract.csv.gz"
+
+    assert main([str(db_path), str(out), "--country", "Country AAA", "--columns", "date,total_vaccinations"]) == 0
+    extract = pd.read_csv(out)
+    assert list(extract.columns) == ["date", "total_vaccinations"] and len(extract) == 50
+    assert "50 rows" in capsys.readouterr().err
+    assert _infer("a.jsonl.zst") == ("jsonl", "zstd") and _infer("a.parquet") == ("parquet", None)
+
+
+# Acceptance: Parquet extracts keep dates as dates and vaccine flags as booleans.
+def test_export_parquet(tmp_path, db_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    conn = sqlite3.connect(db_path)
+
+    rows = export_vaccinations(conn, tmp_path / "out.parquet", fmt="parquet", values=["Country AAA"],
+                               compression="zstd", batch_size=16)
+    conn.close()
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert rows == table.num_rows == 50
+    assert str(table.schema.field("date").type) == "date32[day]"
+    assert all(str(field.type) == "bool" for field in table.schema if field.name.startswith("vaccine_"))
@@ -0,0 +1,122 @@
+import sqlite3
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from vaccdash.data_access_module import load_csv_to_sqlite
+from vaccdash.data_cleaning import clean_vaccination_data
+from vaccdash.ingestion import ChunkCleaner, chunksize_for_memory
+from vaccdash.schema import data_version, dirty_derived_tables
+from vaccdash.synthetic import generate_vaccinations
+
+
+@pytest.fixture
+def raw(write_csv):
+    df = pd.DataFrame(
+        {
+            "iso_code": ["AAA", "AAA", "BBB", "AAA", "BBB", "BBB", "AAA"],
+            "country": ["CountryA", "CountryA", "CountryB", "CountryA", "CountryB", "CountryB", "CountryA"],
+            "date": ["2021-01-01", "2021-01-02", "2021-01-01", "2021-01-01", "2021-01-02", "2021-01-03", "2021-01-03"],
+            "total_vaccinations": [100.0, 200.0, 10.0, 999.0, 20.0, None, 300.0],
+            "people_vaccinated": [50.0, 150.0, 5.0, 999.0, 15.0, None, 250.0],
+            "people_fully_vaccinated": [20.0, 70.0, 1.0, 999.0, 5.0, None, 120.0],
+            "vaccines": ["Moderna", "Moderna", "Sputnik V", "Moderna", "Sputnik V", "Sputnik V", "Moderna, Novavax"],
+            "source_name": ["Source1"] * 7,
+            "source_website": ["site1", "site1", "site2", "site1", "https://twitter.com/b", "site2", "site1"],
+        }
+    )
+    return write_csv(df, "vaccinations.csv"), df
+
+
+# Acceptance: Chunked cleaning should give the same rows as cleaning the whole file, even when duplicates straddle chunks.
+def test_chunk_cleaner_matches_full_clean(raw):
+    csv_path, df = raw
+    expected = clean_vaccination_data(df)
+
+    cleaner = ChunkCleaner()
+    chunks = [cleaner.clean(chunk) for chunk in pd.read_csv(csv_path, chunksize=2)]
+    result = pd.concat(chunks).sort_values(["iso_code", "date"]).reset_index(drop=True)
+
+    assert list(zip(result["iso_code"], result["date"])) == list(zip(expected["iso_code"], expected["date"]))
+    assert list(result["total_vaccinations"]) == list(expected["total_vaccinations"])
+    # Chunks read before Novavax first appeared have no column for it
+    assert list(result["vaccine_Novavax"].eq(True)) == list(expected["vaccine_Novavax"])
+
+
+# Acceptance: Streaming ingestion writes every cleaned row and reports throughput.
+def test_streaming_load_csv_to_sqlite(raw, make_db):
+    csv_path, df = raw
+    db_path = make_db()
+
+    stats = load_csv_to_sqlite(csv_path, db_path, chunksize=3, clean=True)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT iso_code, date, total_vaccinations, vaccine_Moderna, vaccine_Novavax FROM vaccinations ORDER BY iso_code, date"
+    ).fetchall()
+    conn.close()
+
+    assert rows == [
+        ("AAA", "2021-01-01", 100, 1, 0),
+        ("AAA", "2021-01-02", 200, 1, 0),
+        ("AAA", "2021-01-03", 300, 1, 1),
+        ("BBB", "2021-01-01", 10, 0, 0),
+    ]
+    assert stats.rows_read == 7
+    assert stats.rows_written == 4
+    assert stats.chunks == 3
+    assert stats.rows_per_second > 0
+
+
+# Acceptance: A memory ceiling bounds the chunk size.
+def test_chunksize_for_memory(raw):
+    csv_path, _ = raw
+
+    assert chunksize_for_memory(csv_path, 0.001) < chunksize_for_memory(csv_path, 1)
+
+
+
+# Acceptance: Cross-chunk de-duplication stays exact for unsorted input, and its state does not grow with the file.
+def test_chunk_cleaner_unsorted_input_bounded_state():
+    df = generate_vaccinations(countries=20, days=400, duplicate_rate=0.05, seed=6)
+    df = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    expected = clean_vaccination_data(df)
+
+    cleaner = ChunkCleaner()
+    result = pd.concat([cleaner.clean(df.iloc[i:i + 1000]) for i in range(0, len(df), 1000)])
+    cleaner.close()
+    result = result.sort_values(["iso_code", "date"]).reset_index(drop=True)
+    assert list(zip(result["iso_code"], result["date"])) == list(zip(expected["iso_code"], expected["date"]))
+    assert list(result["total_vaccinations"].fillna(-1)) == list(expected["total_vaccinations"].fillna(-1))
+
+    cleaner = ChunkCleaner()
+    tracemalloc.start()
+    cleaner.clean(df.iloc[:1000])
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(1000, len(df), 1000):
+        cleaner.clean(df.iloc[i:i + 1000])
+    growth = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    cleaner.close()
+    assert growth < 256 * 1024
+
+
+# Acceptance: Chunk inserts leave the schema (and prepared statements) alone; the triggers still catch other writes.
+def test_chunk_inserts_keep_schema_and_triggers(make_db, write_csv):
+    df = generate_vaccinations(countries=3, days=20, duplicate_rate=0.0, social_rate=0.0, seed=6)
+    db_path = make_db(df.iloc[:30], chunksize=10)
+
+    conn = sqlite3.connect(db_path)
+    cookie = conn.execute("PRAGMA schema_version").fetchone()[0]
+    load_csv_to_sqlite(write_csv(df.iloc[30:], "b.csv"), db_path, chunksize=10)
+    assert conn.execute("PRAGMA schema_version").fetchone()[0] == cookie
+    assert dict(conn.execute("SELECT key, value FROM meta"))["bulk_load"] == 0
+    assert dirty_derived_tables(conn) == set()
+
+    version = data_version(conn)
+    conn.execute("DELETE FROM vaccinations WHERE rowid = 1")
+    conn.commit()
+    assert data_version(conn) == version + 1
+    assert dirty_derived_tables(conn) == {"vaccine_usage", "rollups"}
+    conn.close()
@@ -0,0 +1,123 @@
+import csv
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pandas as pd
+
+from vaccdash.instrumentation import QueryRecorder, CsvSink, JsonlSink, LoggingSink, instrumented
+
+
+def make_conn():
+    conn = sqlite3.connect(":memory:")
+    pd.DataFrame({"country": ["A", "A", "B"], "n": [1, 2, 3]}).to_sql("t", conn, index=False)
+    return conn
+
+
+# Acceptance: The recorder captures the SQL actually executed, its parameters, row counts and bytes.
+def test_records_actual_sql_rows_and_bytes():
+    recorder = QueryRecorder()
+
+    @instrumented(recorder)
+    def lookup(conn, country):
+        """Docstring that must not be mistaken for the query."""
+        return pd.read_sql_query("SELECT * FROM t WHERE country = ?", conn, params=[country])
+
+    conn = make_conn()
+    result = lookup(conn, "A")
+    conn.close()
+
+    record = recorder.snapshot()[0]
+    assert record.function == "lookup"
+    assert "SELECT * FROM t WHERE country = 'A'" in record.sql
+    assert record.params == "('A',)"
+    assert record.rows == len(result) == 2
+    assert record.bytes > 0
+    assert record.duration_ns > 0
+
+
+# Acceptance: The log is a bounded ring buffer with per-query percentiles.
+def test_ring_buffer_and_percentiles():
+    recorder = QueryRecorder(capacity=5)
+
+    @instrumented(recorder)
+    def count(conn):
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+    conn = make_conn()
+    for _ in range(20):
+        count(conn)
+    conn.close()
+
+    stats = recorder.percentiles()["count"]
+    assert len(recorder.snapshot()) == 5
+    assert stats["count"] == 20
+    assert 0 < stats["p50"] <= stats["p95"] <= stats["p99"]
+
+
+# Acceptance: Sinks write only when asked, to CSV, JSONL or logging.
+def test_sinks(tmp_path, caplog):
+    recorder = QueryRecorder()
+
+    @instrumented(recorder)
+    def count(conn):
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+    conn = make_conn()
+    count(conn)
+    conn.close()
+
+    recorder.export(CsvSink(tmp_path / "log.csv"))
+    recorder.export(JsonlSink(tmp_path / "log.jsonl"))
+    with caplog.at_level(logging.INFO):
+        recorder.export(LoggingSink())
+
+    with open(tmp_path / "log.csv") as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    with open(tmp_path / "log.jsonl") as jsonfile:
+        lines = [json.loads(line) for line in jsonfile]
+    assert rows[0]["function"] == "count"
+    assert lines[0]["sql"] == "SELECT COUNT(*) FROM t"
+    assert "SELECT COUNT(*) FROM t" in caplog.text
+
+
+# Acceptance: Both file sinks overwrite on export, or both append when asked to.
+def test_file_sinks_overwrite_or_append(tmp_path):
+    recorder = QueryRecorder()
+
+    @instrumented(recorder)
+    def count(conn):
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+    conn = make_conn()
+    count(conn)
+    conn.close()
+
+    for _ in range(2):
+        recorder.export(CsvSink(tmp_path / "log.csv"))
+        recorder.export(JsonlSink(tmp_path / "log.jsonl"))
+        recorder.export(CsvSink(tmp_path / "all.csv", append=True))
+        recorder.export(JsonlSink(tmp_path / "all.jsonl", append=True))
+
+    def read_csv(name):
+        with open(tmp_path / name) as csvfile:
+            return list(csv.DictReader(csvfile))
+
+    def read_jsonl(name):
+        with open(tmp_path / name) as jsonfile:
+            return [json.loads(line) for line in jsonfile]
+
+    assert len(read_csv("log.csv")) == len(read_jsonl("log.jsonl")) == 1
+    assert len(read_csv("all.csv")) == len(read_jsonl("all.jsonl")) == 2
+
+
+# Acceptance: Importing the data access module writes no files.
+def test_import_has_no_file_side_effects(tmp_path):
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(src), MPLBACKEND="Agg")
+    subprocess.run([sys.executable, "-c", "import vaccdash.data_access_module"], cwd=tmp_path, env=env, check=True)
+
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,48 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from vaccdash.data_cleaning import clean_vaccination_data
+from vaccdash.parallel_cleaning import clean_parallel, country_shards, shared_vocabulary
+
+
+def _raw_frame():
+    return pd.DataFrame(
+        {
+            "country": ["Brazil", "Aland", "Chad", "Aland", None, "Brazil", "Chad", "Aland"],
+            "iso_code": ["BRA", "ALA", "TCD", "ALA", None, "BRA", "TCD", "ALA"],
+            "date": ["2021-01-02", "2021-01-02", "2021-01-01", "2021-01-01",
+                     "2021-01-01", "2021-01-02", "2021-01-01", "2021-01-02"],
+            "total_vaccinations": [200.0, 100.0, None, 50.0, 10.0, 300.0, 40.0, 999.0],
+            "people_vaccinated": [150.0, 50.0, None, 25.0, 5.0, None, 20.0, 1.0],
+            "people_fully_vaccinated": [70.0, 20.0, None, None, 1.0, 60.0, 10.0, 1.0],
+            "vaccines": ["Pfizer/BioNTech", "Moderna", "Sputnik V", "Moderna, Pfizer/BioNTech",
+                         "Moderna", "Pfizer/BioNTech", "Sinovac", "Moderna"],
+            "source_website": ["https://example.org", "https://example.org", "https://example.org",
+                               "https://facebook.com/x", "https://example.org", "https://example.org",
+                               "https://example.org", "https://example.org"],
+        }
+    )
+
+
+# Acceptance: Shards hold whole countries in sorted order, and the vocabulary ignores rows the cleaner drops for missing figures.
+def test_country_shards_and_vocabulary():
+    df = _raw_frame()
+    shards = country_shards(df["iso_code"], 3)
+
+    countries = [df["iso_code"].take(rows).drop_duplicates().tolist() for rows in shards]
+    assert countries[:2] == [["ALA"], ["BRA", "TCD"]]
+    assert len(countries) == 3 and pd.isna(countries[2]).all()
+    assert sorted(int(i) for rows in shards for i in rows) == list(range(len(df)))
+    assert "Sputnik V" not in shared_vocabulary(df)
+
+
+# Acceptance: Parallel cleaning across a process pool gives output identical to the serial cleaner.
+def test_clean_parallel_matches_serial():
+    df = _raw_frame()
+    expected = clean_vaccination_data(df)
+
+    for shards in (1, 2, 5):
+        pd.testing.assert_frame_equal(clean_parallel(df, workers=1, shards=shards), expected)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pd.testing.assert_frame_equal(clean_parallel(df, shards=3, executor=pool), expected)
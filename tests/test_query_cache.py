@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import time
+
+from vaccdash.connection import close_all_pools
+from vaccdash.data_access_module import load_csv_to_sqlite, query_country
+from vaccdash.queries import query_recorder
+from vaccdash.query_cache import QueryResultCache, result_cache
+from vaccdash.schema import data_version
+
+
+def country_a(vaccinations_frame, dates, **columns):
+    return vaccinations_frame(iso_code="AAA", country="CountryA", dates=dates, **columns)
+
+
+# Acceptance: Repeated identical queries are served from the cache until new data is loaded.
+def test_query_country_cached_and_invalidated_on_ingest(make_db, write_csv, vaccinations_frame):
+    db_path = make_db(country_a(vaccinations_frame, ["2021-01-01", "2021-01-02"]))
+    conn = sqlite3.connect(db_path)
+    before = result_cache.stats()
+
+    first = query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+    second = query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+    second["extra"] = 1
+    third = query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+    load_csv_to_sqlite(write_csv(country_a(vaccinations_frame, ["2021-01-03"]), "b.csv"), db_path)
+    fourth = query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+    conn.close()
+
+    after = result_cache.stats()
+    assert len(first) == len(third) == 2
+    assert "extra" not in third.columns
+    assert len(fourth) == 3
+    assert after["hits"] - before["hits"] == 2
+    assert after["invalidations"] - before["invalidations"] == 1
+
+
+# Acceptance: The cache is bounded by entry count, memory size and age.
+def test_cache_bounds():
+    cache = QueryResultCache(max_entries=2, max_bytes=100, ttl=0.05)
+
+    cache.put("a", 1, "A", 10)
+    cache.put("b", 1, "B", 10)
+    cache.put("c", 1, "C", 10)
+    assert cache.get("a", 1) is None
+    assert cache.get("b", 1) == "B"
+
+    cache.put("big", 1, "BIG", 95)
+    assert cache.stats()["bytes"] <= 100
+
+    time.sleep(0.06)
+    assert cache.get("big", 1) is None
+    stats = cache.stats()
+    assert stats["evictions"] >= 2
+    assert stats["expirations"] == 1
+
+
+# Acceptance: Writes made outside load_csv_to_sqlite also invalidate cached results.
+def test_external_writes_invalidate(make_db):
+    db_path = make_db()
+    conn = sqlite3.connect(db_path)
+
+    assert query_country(conn, "CountryB", "2021-01-01", "2021-01-31").empty
+    conn.execute("INSERT INTO vaccinations (iso_code, country, date) VALUES ('BBB', 'CountryB', '2021-01-05')")
+    conn.commit()
+    result = query_country(conn, "CountryB", "2021-01-01", "2021-01-31")
+    conn.close()
+
+    assert list(result["date"]) == ["2021-01-05"]
+
+
+# Acceptance: Hits skip the instrumented call: they are recorded as cached, without the cache's own SQL, and are fast.
+def test_hits_recorded_as_cached(make_db, vaccinations_frame):
+    db_path = make_db(country_a(vaccinations_frame, [f"2021-01-{day:02d}" for day in range(1, 29)]))
+    conn = sqlite3.connect(db_path)
+    query_recorder.clear()
+
+    query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+    hits = []
+    for _ in range(50):
+        start = time.perf_counter()
+        query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+        hits.append(time.perf_counter() - start)
+    conn.close()
+
+    miss, *cached = query_recorder.snapshot()
+    assert not miss.cached and "FROM vaccinations" in miss.sql
+    for record in (miss, *cached):
+        assert "data_version" not in record.sql and "database_list" not in record.sql
+    assert len(cached) == 50 and all(record.cached and record.sql == "" for record in cached)
+    assert all(record.rows == 28 for record in cached)
+    assert min(hits) < 0.001
+    assert min(record.duration_ns for record in cached) < miss.duration_ns
+
+
+# Acceptance: A database rebuilt at the same path, at the same data version, does not get the old results.
+def test_rebuilt_database_not_served_from_cache(tmp_path, make_db, vaccinations_frame):
+    dates = ["2021-01-01", "2021-01-02"]
+    results = []
+    for daily in ([1, 2], [10, 20]):
+        if (tmp_path / "test.db").exists():
+            close_all_pools()
+            os.remove(tmp_path / "test.db")
+        db_path = make_db(country_a(vaccinations_frame, dates, daily_vaccinations=daily))
+        conn = sqlite3.connect(db_path)
+        results.append((data_version(conn), list(query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+                                                 ["daily_vaccinations"])))
+        conn.close()
+
+    (first_version, first), (second_version, second) = results
+    assert first_version == second_version
+    assert first == [1, 2] and second == [10, 20]
@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+
+from vaccdash.data_access_module import load_csv_to_sqlite
+from vaccdash.rendering import (RenderCache, render_country_charts, render_source_distribution,
+                                render_vaccine_split)
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def chart_data(vaccinations_frame, countries=3, days=60):
+    return vaccinations_frame(countries=countries, days=days, iso_code="C{i:02d}", country="Country {i}",
+                              source_name="Ministry of Health",
+                              daily_vaccinations=np.arange(days * countries) * 10.0)
+
+
+# Acceptance: Charts render headlessly to PNG and SVG bytes, and to files named after the country.
+def test_render_country_charts_formats(tmp_path, make_db, vaccinations_frame):
+    frame = chart_data(vaccinations_frame)
+    db_path, names = make_db(frame), frame["country"].unique().tolist()
+
+    images = render_country_charts(db_path, names, "2021-01-01", "2021-03-01")
+    assert list(images) == names
+    assert all(data.startswith(PNG_MAGIC) for data in images.values())
+
+    svgs = render_country_charts(db_path, names[:1], "2021-01-01", "2021-03-01", fmt="svg", window=7)
+    assert b"<svg" in svgs[names[0]]
+
+    paths = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", out_dir=tmp_path / "out")
+    assert paths[names[0]] == os.path.join(tmp_path / "out", "Country_0.png")
+    assert all(os.path.getsize(path) > 0 for path in paths.values())
+
+    assert render_source_distribution(db_path).startswith(PNG_MAGIC)
+    assert render_vaccine_split(db_path) is None
+
+
+# Acceptance: Several worker processes render the same charts as one process.
+def test_render_country_charts_workers(make_db, vaccinations_frame):
+    frame = chart_data(vaccinations_frame)
+    db_path, names = make_db(frame), frame["country"].unique().tolist()
+
+    single = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", dpi=80)
+    multi = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", dpi=80, workers=2)
+    assert list(multi) == list(single) == names
+    assert all(multi[name].startswith(PNG_MAGIC) for name in names)
+    # Same pixels and PNG encoding, whichever process drew the chart
+    assert multi == single
+    assert len(set(single.values())) == len(names)
+
+
+# Acceptance: Cached charts are reused until new data is loaded, then redrawn and the old copies removed.
+def test_render_cache_follows_data_version(tmp_path, make_db, write_csv, vaccinations_frame):
+    frame = chart_data(vaccinations_frame)
+    csv_path = write_csv(frame)
+    db_path, names = make_db(csv_path), frame["country"].unique().tolist()
+    cache_dir = tmp_path / "cache"
+
+    first = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", cache_dir=cache_dir)
+    files = sorted(os.listdir(cache_dir))
+    assert len(files) == len(names)
+
+    chart_id, _ = files[0].split("-v")
+    with open(cache_dir / files[0], "wb") as image:
+        image.write(b"cached")
+    again = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", cache_dir=cache_dir)
+    assert b"cached" in again.values()
+    assert RenderCache.chart_id("x", "k", [], "png", 100) != RenderCache.chart_id("x", "k", [], "png", 200)
+
+    # Reloading rows that are already stored keeps the data version
+    load_csv_to_sqlite(csv_path, db_path)
+    again = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", cache_dir=cache_dir)
+    assert b"cached" in again.values()
+
+    load_csv_to_sqlite(write_csv({
+        "iso_code": ["C00"], "country": [names[0]], "date": ["2021-03-02"],
+        "source_name": ["Ministry of Health"], "daily_vaccinations": [5.0],
+    }, "new.csv"), db_path)
+    redrawn = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", cache_dir=cache_dir)
+    assert b"cached" not in redrawn.values()
+    assert all(data.startswith(PNG_MAGIC) for data in redrawn.values())
+    refreshed = sorted(os.listdir(cache_dir))
+    assert len(refreshed) == len(names) and not set(refreshed) & set(files)
+    assert first.keys() == redrawn.keys()
+
+
+# Acceptance: Charts cached for a database are not served for another one rebuilt at the same path.
+def test_render_cache_not_shared_with_rebuilt_database(tmp_path, make_db, vaccinations_frame):
+    frame = chart_data(vaccinations_frame, countries=1)
+    db_path, names = make_db(frame), frame["country"].unique().tolist()
+    cache_dir = tmp_path / "cache"
+    first = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", cache_dir=cache_dir)
+
+    os.remove(db_path)
+    make_db(frame.assign(daily_vaccinations=5.0))
+    rebuilt = render_country_charts(db_path, names, "2021-01-01", "2021-03-01", cache_dir=cache_dir)
+
+    assert rebuilt != first
+    assert rebuilt == render_country_charts(db_path, names, "2021-01-01", "2021-03-01")
+    assert len(os.listdir(cache_dir)) == 1
@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from vaccdash import ingestion
+from vaccdash.data_access_module import load_csv_to_sqlite
+from vaccdash.rollups import check_rollups, latest_totals, period_totals, source_counts
+from vaccdash.schema import day_number, dirty_derived_tables
+
+
+def history_rows(iso_codes, dates, daily, source="Source1"):
+    return {
+        "iso_code": iso_codes,
+        "country": [f"Country{iso}" for iso in iso_codes],
+        "date": dates,
+        "total_vaccinations": [100.0 * (i + 1) for i in range(len(dates))],
+        "people_vaccinated": [None] * (len(dates) - 1) + [42.0],
+        "daily_vaccinations": daily,
+        "source_name": source,
+    }
+
+
+def rebuild_forbidden(conn):
+    raise AssertionError("derived tables were rebuilt")
+
+
+@pytest.fixture
+def history(make_db, write_csv):
+    db_path = make_db()
+    conn = sqlite3.connect(db_path)
+    latest_totals(conn)  # build the (empty) rollups so later loads are incremental
+    load_csv_to_sqlite(write_csv(history_rows(["AAA", "AAA", "BBB"], ["2021-01-01", "2021-01-04", "2021-01-04"], [10, 20, 5]), "a.csv"), db_path, chunksize=2)
+    load_csv_to_sqlite(write_csv(history_rows(["AAA", "AAA"], ["2021-01-05", "2021-02-01"], [30, 40], source="Source2"), "b.csv"), db_path)
+    return db_path, conn
+
+
+# Acceptance: Rollups are maintained incrementally on ingest and agree with a full recomputation.
+def test_rollups_maintained_incrementally(history):
+    db_path, conn = history
+
+    assert "rollups" not in dirty_derived_tables(conn)
+    assert check_rollups(conn) == []
+
+    sources = source_counts(conn)
+    weeks = period_totals(conn, "week", "AAA")
+    months = period_totals(conn, "month", "AAA")
+    latest = latest_totals(conn).set_index("iso_code")
+    conn.close()
+
+    assert dict(zip(sources["source_name"], sources["count"])) == {"Source1": 3, "Source2": 2}
+    # 2021-01-01 is a Friday; 2021-01-04 and 2021-01-05 fall in the following week
+    assert list(zip(weeks["period_start"], weeks["daily_vaccinations"])) == [
+        (day_number("2020-12-28"), 10), (day_number("2021-01-04"), 50), (day_number("2021-02-01"), 40),
+    ]
+    assert list(zip(months["period_start"], months["daily_vaccinations"])) == [
+        (day_number("2021-01-01"), 60), (day_number("2021-02-01"), 40),
+    ]
+    assert latest.loc["AAA", "date"] == "2021-02-01"
+    assert latest.loc["AAA", "total_vaccinations"] == 200
+    assert latest.loc["AAA", "people_vaccinated"] == 42
+
+
+# Acceptance: Chunks overlapping stored rows update the derived tables from their new rows only, without marking them dirty.
+def test_overlapping_chunks_stay_incremental(history, write_csv, monkeypatch):
+    db_path, conn = history
+    overlap = write_csv(history_rows(["AAA", "CCC", "CCC", "BBB"], ["2021-01-04", "2021-01-06", "2021-01-06", "2021-01-11"],
+                                     [99, 7, 8, 3], source="Source3"), "c.csv")
+    for name in ingestion.DERIVED_REBUILDERS:
+        monkeypatch.setitem(ingestion.DERIVED_REBUILDERS, name, rebuild_forbidden)
+    load_csv_to_sqlite(overlap, db_path, chunksize=3)
+
+    assert dirty_derived_tables(conn) == set()
+    assert check_rollups(conn) == []
+    sources = source_counts(conn)
+    assert dict(zip(sources["source_name"], sources["count"])) == {"Source1": 3, "Source2": 2, "Source3": 2}
+    weeks = period_totals(conn, "week", "AAA")
+    assert (day_number("2021-01-04"), 50) in list(zip(weeks["period_start"], weeks["daily_vaccinations"]))
+    conn.close()
+
+
+# Acceptance: Writes outside ingestion mark the rollups for rebuild, and the checker reports drift.
+def test_rollups_rebuild_and_consistency_check(history):
+    db_path, conn = history
+
+    conn.execute("INSERT INTO vaccinations (iso_code, country, date, daily_vaccinations, source_name) "
+                 "VALUES ('CCC', 'CountryC', '2021-01-06', 7, 'Source3')")
+    conn.commit()
+    assert "rollups" in dirty_derived_tables(conn)
+    sources = source_counts(conn)
+    assert "Source3" in set(sources["source_name"])
+    assert check_rollups(conn) == []
+
+    conn.execute("UPDATE rollup_source_counts SET count = 99 WHERE source_name = 'Source1'")
+    conn.execute("DELETE FROM rollup_country_latest WHERE iso_code = 'BBB'")
+    problems = check_rollups(conn)
+    conn.close()
+
+    assert any("Source1" in problem and "99" in problem for problem in problems)
+    assert any("'BBB'" in problem and "missing" in problem for problem in problems)
@@ -0,0 +1,148 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from vaccdash.data_access_module import (
+    init_db, load_csv_to_sqlite, query_country, query_country_by_ISO,
+    QUERY_COUNTRY_SQL, QUERY_COUNTRY_BY_ISO_SQL, SOURCE_DISTRIBUTION_SQL,
+)
+from vaccdash.schema import SCHEMA_VERSION, day_number, schema_version
+
+
+def insert_rows(conn, dates, iso_code="AAA", country="CountryA"):
+    df = pd.DataFrame({
+        "iso_code": [iso_code] * len(dates),
+        "country": [country] * len(dates),
+        "date": dates,
+        "daily_vaccinations": range(len(dates)),
+        "source_name": ["Source1"] * len(dates),
+    })
+    df.to_sql("vaccinations", conn, if_exists="append", index=False)
+
+
+def query_plan(conn, sql, params):
+    return " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+# Acceptance: The country query functions search through the composite (key, date_day) indexes.
+def test_query_functions_use_indexes(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+
+    iso_plan = query_plan(conn, QUERY_COUNTRY_BY_ISO_SQL.format(columns="*"), ["AAA", 1, 2])
+    country_plan = query_plan(conn, QUERY_COUNTRY_SQL.format(columns="*"), ["CountryA", 1, 2])
+    source_plan = query_plan(conn, SOURCE_DISTRIBUTION_SQL, [])
+    conn.close()
+
+    assert "USING INDEX idx_vaccinations_iso_day (iso_code=? AND date_day>? AND date_day<?)" in iso_plan
+    assert "USING INDEX idx_vaccinations_country_day (country=? AND date_day>? AND date_day<?)" in country_plan
+    assert "USING COVERING INDEX idx_vaccinations_source" in source_plan
+    assert "TEMP B-TREE" not in iso_plan + country_plan + source_plan
+
+
+# Acceptance: date_day is a sortable integer day number and range queries are inclusive.
+def test_date_day_range_queries(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    insert_rows(conn, ["2021-01-03", "2021-01-01", "2021-01-02", "2021-02-01"])
+
+    by_country = query_country(conn, "CountryA", "2021-01-01", "2021-01-31")
+    by_iso = query_country_by_ISO(conn, "AAA", "2021-01-02", "2021-02-01")
+    days = [row[0] for row in conn.execute("SELECT date_day FROM vaccinations ORDER BY date_day")]
+    conn.close()
+
+    assert list(by_country["date"]) == ["2021-01-01", "2021-01-02", "2021-01-03"]
+    assert list(by_iso["date"]) == ["2021-01-02", "2021-01-03", "2021-02-01"]
+    # The generated column is only used for filtering, not returned
+    assert "date_day" not in by_country.columns
+    assert days[:3] == [day_number("2021-01-01") + i for i in range(3)]
+    assert day_number("1970-01-02") == 1
+
+
+# Acceptance: Partial dates cover their whole month or year; other formats raise a clear error.
+def test_partial_and_invalid_dates(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    insert_rows(conn, ["2020-12-31", "2021-01-01", "2021-01-31", "2021-02-01"])
+
+    january = query_country(conn, "CountryA", "2021-01", "2021-01")
+    year = query_country(conn, "CountryA", "2021", "2021")
+    with pytest.raises(ValueError, match="Invalid date '2021/01/05'"):
+        query_country(conn, "CountryA", "2021/01/05", "2021-01-31")
+    conn.close()
+
+    assert list(january["date"]) == ["2021-01-01", "2021-01-31"]
+    assert list(year["date"]) == ["2021-01-01", "2021-01-31", "2021-02-01"]
+    assert day_number("2021-02", end=True) == day_number("2021-02-28")
+    with pytest.raises(ValueError, match="Invalid date"):
+        day_number("2021-02-30")
+
+
+# Acceptance: The table enforces one record per (iso_code, date), with or without a rowid.
+@pytest.mark.parametrize("without_rowid", [False, True])
+def test_unique_iso_code_and_date(tmp_path, without_rowid):
+    db_path = tmp_path / "test.db"
+    init_db(db_path, without_rowid=without_rowid)
+    conn = sqlite3.connect(db_path)
+    insert_rows(conn, ["2021-01-01"])
+
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO vaccinations (iso_code, country, date) VALUES ('AAA', 'CountryA', '2021-01-01')")
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'vaccinations'").fetchone()[0]
+    conn.close()
+
+    assert ddl.endswith("WITHOUT ROWID") == without_rowid
+
+
+# Acceptance: Rows missing iso_code are skipped with a warning by a WITHOUT ROWID table, and kept otherwise.
+@pytest.mark.parametrize("without_rowid", [False, True])
+def test_rows_without_iso_code(tmp_path, caplog, without_rowid):
+    db_path = tmp_path / "test.db"
+    csv_path = tmp_path / "data.csv"
+    pd.DataFrame({
+        "iso_code": ["AAA", None],
+        "country": ["CountryA", "World"],
+        "date": ["2021-01-01", "2021-01-01"],
+        "total_vaccinations": [1, 2],
+    }).to_csv(csv_path, index=False)
+    init_db(db_path, without_rowid=without_rowid)
+
+    load_csv_to_sqlite(csv_path, db_path)
+    conn = sqlite3.connect(db_path)
+    countries = [row[0] for row in conn.execute("SELECT country FROM vaccinations ORDER BY country")]
+    conn.close()
+
+    if without_rowid:
+        assert countries == ["CountryA"]
+        assert "Skipping 1 rows without iso_code or date" in caplog.text
+    else:
+        assert countries == ["CountryA", "World"]
+
+
+# Acceptance: An existing database created before the indexed schema is migrated in place.
+def test_migrates_existing_database(tmp_path):
+    db_path = tmp_path / "old.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE vaccinations (iso_code TEXT, country TEXT, date TEXT, daily_vaccinations INTEGER, vaccine_A INTEGER)")
+    conn.executemany(
+        "INSERT INTO vaccinations VALUES (?, ?, ?, ?, ?)",
+        [("AAA", "CountryA", "2021-01-01", 1, 1), ("AAA", "CountryA", "2021-01-01", 2, 0), ("AAA", "CountryA", "2021-01-02", 3, 1)],
+    )
+    conn.commit()
+    conn.close()
+
+    init_db(db_path)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT date, daily_vaccinations, vaccine_A, date_day FROM vaccinations ORDER BY date_day").fetchall()
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(vaccinations)")}
+    version = schema_version(conn)
+    conn.close()
+
+    assert rows == [("2021-01-01", 1, 1, 18628), ("2021-01-02", 3, 1, 18629)]
+    assert {"idx_vaccinations_iso_day", "idx_vaccinations_country_day"} <= indexes
+    assert version == SCHEMA_VERSION
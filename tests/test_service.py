@@ -0,0 +1,121 @@
+import gzip
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+from vaccdash.data_access_module import init_db, load_csv_to_sqlite
+from vaccdash.service import MODIFIED_HISTORY, DataService, make_server
+from vaccdash.synthetic import write_vaccinations_csv
+
+SERIES = "/series/Country%20AAB?start=2021-01-01&end=2021-06-30"
+
+
+@pytest.fixture
+def server(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    write_vaccinations_csv(csv_path, countries=5, days=200, seed=2)
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path)
+    server = make_server(db_path, port=0, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, csv_path, db_path
+    server.shutdown()
+    server.server_close()
+    server.RequestHandlerClass.service.close()
+
+
+def get(server, path, **headers):
+    conn = http.client.HTTPConnection(*server.server_address[:2])
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response.status, response, body
+
+
+# Acceptance: Country series, country rows, vaccine counts and the source distribution are served as JSON or CSV.
+def test_endpoints_json_and_csv(server):
+    server, _, _ = server
+
+    status, response, body = get(server, SERIES + "&period=week")
+    series = json.loads(body)
+    assert status == 200 and response.getheader("Content-Type") == "application/json"
+    assert series[0]["date"] == "2020-12-28" and len(series) == 27
+
+    status, response, body = get(server, "/countries/Country%20AAA?start=2021-01-01&end=2021-01-02"
+                                         "&columns=date,total_vaccinations&format=csv")
+    assert body.decode().splitlines()[0] == "date,total_vaccinations" and len(body.decode().splitlines()) == 3
+
+    vaccines = json.loads(get(server, "/vaccines")[2])
+    assert vaccines and all(entry["countries"] >= 1 for entry in vaccines)
+    countries = json.loads(get(server, "/vaccines/" + vaccines[0]["vaccine"].replace(" ", "%20"))[2])
+    assert len(countries) == vaccines[0]["countries"]
+    assert sum(entry["count"] for entry in json.loads(get(server, "/sources")[2])) == 1000
+
+    assert get(server, "/unknown")[0] == 404
+    assert get(server, "/series/Country%20AAB")[0] == 400
+
+
+# Acceptance: Responses carry ETag/Last-Modified; conditional requests get 304 until the data changes.
+def test_conditional_requests_follow_data_version(server):
+    server, csv_path, db_path = server
+    status, response, first = get(server, SERIES)
+    etag, modified = response.getheader("ETag"), response.getheader("Last-Modified")
+    assert status == 200 and etag and modified
+
+    assert get(server, SERIES, **{"If-None-Match": etag})[0] == 304
+    assert get(server, SERIES, **{"If-Modified-Since": modified})[0] == 304
+    assert get(server, SERIES, **{"If-None-Match": '"other"'})[0] == 200
+    assert server.RequestHandlerClass.service.cache.stats()["hits"] >= 1
+
+    # Reloading rows that are already stored is not a change
+    load_csv_to_sqlite(csv_path, db_path)
+    assert get(server, SERIES, **{"If-None-Match": etag})[0] == 304
+
+    new_path = csv_path.parent / "new.csv"
+    new_path.write_text("iso_code,country,date,daily_vaccinations\nAAB,Country AAB,2030-01-01,1\n")
+    load_csv_to_sqlite(new_path, db_path)
+    status, response, _ = get(server, SERIES, **{"If-None-Match": etag})
+    assert status == 200 and response.getheader("ETag") != etag
+
+
+# Acceptance: Clients accepting gzip get a compressed body with the same content.
+def test_gzip_responses(server):
+    server, _, _ = server
+    _, plain, body = get(server, SERIES)
+    status, response, compressed = get(server, SERIES, **{"Accept-Encoding": "gzip"})
+
+    assert status == 200 and response.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(compressed) == body and len(compressed) < len(body)
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert response.getheader("ETag") != plain.getheader("ETag")
+    assert get(server, SERIES, **{"If-None-Match": response.getheader("ETag")})[0] == 304
+    assert get(server, "/sources", **{"Accept-Encoding": "gzip"})[1].getheader("Content-Encoding") is None
+
+
+# Acceptance: A database rebuilt at the same path gets new ETags and no cached responses; Last-Modified history is bounded.
+def test_rebuilt_database_changes_etags(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    db_path = tmp_path / "test.db"
+    write_vaccinations_csv(csv_path, countries=5, days=200, seed=2)
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path)
+    service = DataService(db_path, workers=1)
+    _, first, body = service.handle(SERIES, {})
+
+    os.remove(db_path)
+    write_vaccinations_csv(csv_path, countries=5, days=200, seed=3)
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path)
+    status, second, rebuilt = service.handle(SERIES, {"If-None-Match": first["ETag"]})
+
+    assert status == 200 and second["ETag"] != first["ETag"] and rebuilt != body
+    for version in range(2 * MODIFIED_HISTORY):
+        service._last_modified(("id", version))
+    assert len(service._modified) == MODIFIED_HISTORY
+    service.close()
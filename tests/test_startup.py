@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def probe_import(module, cwd):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    env.pop("MPLBACKEND", None)
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        cwd=cwd, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out)
+
+
+# Acceptance: Importing data_access_module, queries or ingestion loads no plotting code, and the facade loads no pandas and stays fast.
+def test_entry_points_import_lazily(tmp_path):
+    facade = probe_import("vaccdash.data_access_module", tmp_path)
+    queries = probe_import("vaccdash.queries", tmp_path)
+    ingestion = probe_import("vaccdash.ingestion", tmp_path)
+
+    for result in (facade, queries, ingestion):
+        assert "matplotlib" not in result["modules"]
+    assert "pandas" not in facade["modules"] and "pandas" not in queries["modules"]
+    assert facade["seconds"] < 0.5
+    assert os.listdir(tmp_path) == []
+
+
+# Acceptance: Names are still importable from data_access_module and resolve to the split modules.
+def test_data_access_module_facade_resolves_names():
+    import vaccdash.data_access_module as dam
+    import vaccdash.ingestion
+    import vaccdash.plotting
+    import vaccdash.queries
+
+    assert dam.query_country is vaccdash.queries.query_country
+    assert dam.load_csv_to_sqlite is vaccdash.ingestion.load_csv_to_sqlite
+    assert dam.plot_vaccine_split is vaccdash.plotting.plot_vaccine_split
+    assert "init_db" in dir(dam)
+    with pytest.raises(AttributeError):
+        dam.not_a_function
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from vaccdash.data_cleaning import clean_vaccination_data
+from vaccdash.synthetic import COLUMNS, generate_vaccinations, iso_codes, write_vaccinations_csv
+
+
+# Acceptance: The same arguments always generate the same country_vaccinations.csv-shaped data.
+def test_generator_is_deterministic(tmp_path):
+    first = generate_vaccinations(countries=5, days=30, nan_rate=0.1, duplicate_rate=0.05, seed=3)
+    again = generate_vaccinations(countries=5, days=30, nan_rate=0.1, duplicate_rate=0.05, seed=3)
+    other = generate_vaccinations(countries=5, days=30, nan_rate=0.1, duplicate_rate=0.05, seed=4)
+
+    pd.testing.assert_frame_equal(first, again)
+    assert not first.equals(other)
+    assert list(first.columns) == COLUMNS
+    assert len(set(iso_codes(800))) == 800
+
+    rows = write_vaccinations_csv(tmp_path / "data.csv", countries=5, days=30, seed=3)
+    assert rows == 150 and len(pd.read_csv(tmp_path / "data.csv")) == 150
+
+
+# Acceptance: Scale, manufacturer mix, duplicate, NaN and social-source rates are honoured.
+def test_generator_rates():
+    clean = generate_vaccinations(countries=20, days=100, manufacturers={"Moderna": 1, "Sputnik V": 1})
+    assert len(clean) == 2000 and clean["iso_code"].nunique() == 20
+    assert not clean.duplicated(["iso_code", "date"]).any()
+    assert clean["total_vaccinations"].notna().all()
+    assert set(", ".join(clean["vaccines"].unique()).split(", ")) <= {"Moderna", "Sputnik V"}
+    assert (clean.groupby("iso_code")["total_vaccinations"].diff().dropna() >= 0).all()
+
+    dirty = generate_vaccinations(countries=20, days=100, duplicate_rate=0.1, nan_rate=0.2, social_rate=0.5)
+    duplicates = dirty.duplicated(["iso_code", "date"]).mean()
+    assert 0.05 < duplicates < 0.15
+    assert 0.15 < dirty["people_vaccinated"].isna().mean() < 0.25
+    assert dirty["source_website"].str.contains("twitter|facebook").any()
+
+    cleaned = clean_vaccination_data(dirty)
+    assert not cleaned.duplicated(["iso_code", "date"]).any()
+    assert not cleaned["source_website"].str.contains("twitter|facebook").any()
@@ -0,0 +1,87 @@
+import sqlite3
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from vaccdash.data_access_module import plot_daily_vaccinations
+from vaccdash.timeseries import downsample, lttb_indices, resample, rolling_mean, series
+
+DAYS = 400
+
+
+@pytest.fixture
+def country_a(make_db, vaccinations_frame):
+    values = (np.arange(DAYS) % 37) * 10.0
+    values[5] = np.nan
+    df = vaccinations_frame(days=DAYS, iso_code="AAA", country="CountryA", daily_vaccinations=values)
+    return make_db(df), df.assign(date=pd.to_datetime(df["date"])).set_index("date")["daily_vaccinations"]
+
+
+# Acceptance: Weekly/monthly resampling and rolling means computed in SQLite match pandas on the same data.
+def test_resample_and_rolling_match_pandas(country_a):
+    db_path, expected = country_a
+    conn = sqlite3.connect(db_path)
+
+    weekly = resample(conn, "CountryA", "2021-01-04", "2021-03-28", period="week")
+    monthly = resample(conn, "AAA", "2021-01-01", "2021-06-30", period="month", how="max", key="iso_code")
+    rolling = rolling_mean(conn, "CountryA", "2021-02-01", "2021-04-30", window=7)
+    conn.close()
+
+    want_weekly = expected["2021-01-04":"2021-03-28"].resample("W-MON", label="left", closed="left").sum()
+    np.testing.assert_array_equal(weekly["date"], want_weekly.index.to_numpy().astype("datetime64[D]"))
+    np.testing.assert_allclose(weekly["value"], want_weekly.to_numpy())
+    want_monthly = expected["2021-01-01":"2021-06-30"].resample("MS").max()
+    np.testing.assert_allclose(monthly["value"], want_monthly.to_numpy())
+    want_rolling = expected.rolling("7D").mean()["2021-02-01":"2021-04-30"]
+    np.testing.assert_allclose(rolling["value"], want_rolling.to_numpy())
+
+
+# Acceptance: LTTB keeps the endpoints and the peaks and returns exactly the point budget.
+def test_lttb_keeps_shape():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[500] = 100.0
+    keep = lttb_indices(x, y, 50)
+
+    assert len(keep) == 50 and keep[0] == 0 and keep[-1] == 999
+    assert 500 in keep
+    assert np.all(np.diff(keep) > 0)
+    assert len(lttb_indices(x, y, 2000)) == 1000
+
+
+# Acceptance: Plotted series respect the point budget however long the date range is.
+def test_plot_daily_vaccinations_respects_budget(country_a, monkeypatch):
+    db_path, _ = country_a
+    monkeypatch.setattr(plt, "show", lambda: None)
+    conn = sqlite3.connect(db_path)
+    full = series(conn, "CountryA", "2021-01-01", "2022-12-31")
+    reduced = downsample(full, 60)
+    weekly = series(conn, "CountryA", "2021-01-01", "2022-12-31", period="week", max_points=30)
+    conn.close()
+
+    assert len(full["date"]) == DAYS and len(reduced["date"]) == 60
+    assert len(weekly["date"]) == 30
+    plot_daily_vaccinations(db_path, "CountryA", "2021-01-01", "2022-12-31", max_points=80)
+    assert len(plt.gca().lines[0].get_xdata()) == 80
+    plt.close("all")
+
+
+# Acceptance: Short series are plotted as stored, and missing days stay gaps after downsampling.
+def test_downsample_keeps_gaps():
+    dates = np.arange(100).astype("datetime64[D]")
+    values = np.sin(np.arange(100) / 5.0)
+    values[[10, 11, 60]] = np.nan
+    points = {"date": dates, "value": values}
+
+    assert downsample(points, 100) is points
+    reduced = downsample(points, 30)
+    gaps = np.flatnonzero(np.isnan(reduced["value"]))
+    assert len(reduced["value"]) == 30 and len(gaps) == 2
+    assert list(reduced["date"][gaps]) == [dates[11], dates[60]]
+    assert reduced["date"][0] == dates[0] and reduced["date"][-1] == dates[-1]
+    assert np.all(np.diff(reduced["date"].astype("int64")) > 0)
+
+    scattered = np.where(np.arange(100) % 2 == 0, values, np.nan)
+    assert not np.isnan(downsample({"date": dates, "value": scattered}, 30)["value"]).any()
@@ -0,0 +1,119 @@
+import sqlite3
+
+import pandas as pd
+
+from vaccdash import rollups, vaccine_usage
+from vaccdash.aggregates import source_distribution
+from vaccdash.connection import ConnectionPool
+from vaccdash.data_access_module import (
+    init_db, load_csv_to_sqlite, count_countries_using_vaccine, countries_using_vaccine, list_vaccines,
+)
+from vaccdash.schema import dirty_derived_tables
+from vaccdash.vaccine_usage import COUNT_COUNTRIES_SQL
+
+
+def make_frame():
+    return pd.DataFrame({
+        "iso_code": ["AAA", "AAA", "BBB", "CCC"],
+        "country": ["CountryA", "CountryA", "CountryB", "CountryC"],
+        "date": ["2021-01-01", "2021-01-02", "2021-01-01", "2021-01-01"],
+        "total_vaccinations": [100, 200, 300, 400],
+        "vaccines": ["Sinopharm/Beijing", "Sinopharm/Beijing, Sputnik V", "Sinopharm/Wuhan", "Sputnik Light"],
+    })
+
+
+# Acceptance: Vaccine lookups match whole manufacturer names, not substrings.
+def test_exact_token_matches(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    make_frame().to_sql("vaccinations", conn, if_exists="append", index=False)
+
+    assert count_countries_using_vaccine(conn, "Sinopharm") == 0
+    assert count_countries_using_vaccine(conn, "Sinopharm/Beijing") == 1
+    assert count_countries_using_vaccine(conn, "Sputnik V") == 1
+    assert countries_using_vaccine(conn, "Sputnik Light") == ["CountryC"]
+    assert list_vaccines(conn) == ["Sinopharm/Beijing", "Sinopharm/Wuhan", "Sputnik Light", "Sputnik V"]
+    conn.close()
+
+
+# Acceptance: Ingestion keeps vaccine_usage current; writes outside it mark the table for rebuild.
+def test_usage_maintained_on_ingest(tmp_path):
+    db_path = tmp_path / "test.db"
+    csv_path = tmp_path / "vaccinations.csv"
+    make_frame().to_csv(csv_path, index=False)
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    assert count_countries_using_vaccine(conn, "Sputnik V") == 0
+
+    load_csv_to_sqlite(csv_path, db_path, chunksize=2)
+    assert "vaccine_usage" not in dirty_derived_tables(conn)
+    assert count_countries_using_vaccine(conn, "Sputnik V") == 1
+
+    conn.execute(
+        "INSERT INTO vaccinations (iso_code, country, date, vaccines) VALUES ('DDD', 'CountryD', '2021-01-01', 'Sputnik V')"
+    )
+    conn.commit()
+    assert "vaccine_usage" in dirty_derived_tables(conn)
+    assert count_countries_using_vaccine(conn, "Sputnik V") == 2
+    assert "vaccine_usage" not in dirty_derived_tables(conn)
+    conn.close()
+
+
+# Acceptance: Lookups are answered through an index, and stay exact on read-only connections.
+def test_usage_lookups_use_index_and_read_only_fallback(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    make_frame().to_sql("vaccinations", conn, if_exists="append", index=False)
+    plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + COUNT_COUNTRIES_SQL, ["X"]))
+    conn.close()
+
+    pool = ConnectionPool(db_path)
+    with pool.connection(read_only=True) as ro:
+        assert count_countries_using_vaccine(ro, "Sinopharm/Wuhan") == 1
+    pool.close()
+
+    assert "USING COVERING INDEX" in plan
+
+
+# Acceptance: A lookup that rebuilds vaccine_usage does not commit the caller's open transaction.
+def test_rebuild_keeps_caller_transaction(tmp_path):
+    db_path = tmp_path / "test.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    make_frame().to_sql("vaccinations", conn, if_exists="append", index=False)
+    assert count_countries_using_vaccine(conn, "Sputnik V") == 1
+
+    conn.execute(
+        "INSERT INTO vaccinations (iso_code, country, date, vaccines) VALUES ('DDD', 'CountryD', '2021-01-01', 'Sputnik V')"
+    )
+    assert count_countries_using_vaccine(conn, "Sputnik V") == 2
+    assert conn.in_transaction
+    conn.rollback()
+
+    assert conn.execute("SELECT COUNT(*) FROM vaccinations WHERE iso_code = 'DDD'").fetchone()[0] == 0
+    assert count_countries_using_vaccine(conn, "Sputnik V") == 1
+    conn.close()
+
+
+# Acceptance: After a fresh load, read-only connections are answered from the derived tables without scanning.
+def test_fresh_load_serves_read_only_from_derived_tables(tmp_path, caplog, monkeypatch):
+    db_path = tmp_path / "test.db"
+    csv_path = tmp_path / "vaccinations.csv"
+    make_frame().to_csv(csv_path, index=False)
+    init_db(db_path)
+    load_csv_to_sqlite(csv_path, db_path)
+
+    def scan(conn):
+        raise AssertionError("scanned vaccinations")
+
+    monkeypatch.setattr(vaccine_usage, "_scan", scan)
+    monkeypatch.setattr(rollups, "_full_source_counts", scan)
+    pool = ConnectionPool(db_path)
+    with pool.connection(read_only=True) as ro:
+        assert not dirty_derived_tables(ro)
+        assert count_countries_using_vaccine(ro, "Sputnik V") == 1
+        assert source_distribution(ro)["count"].sum() == 4
+    pool.close()
+    assert "stale" not in caplog.text
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from vaccdash.data_cleaning import clean_vaccination_data
+from vaccdash.synthetic import generate_vaccinations
+from vaccdash.validation import ROW_COLUMN, QualityReport
+
+
+def broken_frame():
+    df = generate_vaccinations(countries=3, days=20, duplicate_rate=0.1, social_rate=0.0, seed=4)
+    df.index = df.index + 1000
+    df.loc[1003, "date"] = "2021-02-30x"
+    df.loc[1004, "date"] = None
+    df.loc[1005, "people_fully_vaccinated"] = df.loc[1005, "people_vaccinated"] + 1
+    df.loc[1006, "people_vaccinated_per_hundred"] = 101.0
+    df.loc[1007, "daily_vaccinations"] = -5.0
+    df.loc[1010, "total_vaccinations"] = 1.0
+    return df
+
+
+# Acceptance: Each rule reports its violation count and the index labels of the offending input rows.
+def test_rules_report_counts_and_input_rows():
+    df = broken_frame()
+    quality = QualityReport()
+    cleaned = clean_vaccination_data(df, quality=quality)
+
+    findings = quality.findings
+    assert findings["unparseable_date"]["count"] == 1 and findings["unparseable_date"]["rows"] == [1003]
+    assert findings["missing_date"]["rows"] == [1004]
+    assert findings["fully_exceeds_people"]["rows"] == [1005]
+    assert findings["per_hundred_out_of_bounds"]["rows"] == [1006]
+    assert findings["negative_count"]["rows"] == [1007]
+    assert findings["non_monotonic_total"]["rows"] == [1010]
+    assert not quality.ok
+
+    # Dropped rows are accounted for per stage
+    assert quality.rows_in == len(df) and quality.rows_out == len(cleaned)
+    assert findings["dropped_by_dedupe"]["count"] == len(df) - len(cleaned)
+    assert "1003" in str(quality)
+
+
+# Acceptance: Validation leaves the cleaned frame unchanged and keeps only a few sample rows.
+def test_validation_does_not_change_cleaning():
+    df = generate_vaccinations(countries=4, days=30, duplicate_rate=0.2, nan_rate=0.1, social_rate=0.5, seed=5)
+    quality = QualityReport(rules=["missing_date"], samples=2)
+    cleaned = clean_vaccination_data(df, quality=quality, compact=True)
+
+    pd.testing.assert_frame_equal(cleaned, clean_vaccination_data(df, compact=True))
+    assert ROW_COLUMN not in cleaned.columns
+    assert set(quality.findings) >= {"missing_date", "dropped_by_dedupe", "dropped_by_source_filter"}
+    assert "unparseable_date" not in quality.findings and quality.ok
+    assert len(quality.findings["dropped_by_dedupe"]["rows"]) == 2
+
+    with pytest.raises(ValueError, match="Unknown validation rules"):
+        QualityReport(rules=["no_such_rule"])